@@ -0,0 +1,57 @@
+"""Moving parsed NOTAMs between processes: the binary format of pynotam.binary, pickle, and parsing the text
+again on the receiving side. Reports encoded sizes and per-NOTAM encode and decode times, both for NOTAMs sent
+one at a time and for whole lists.
+
+Run from the repository root with: python -m benchmarks.bench_binary"""
+from __future__ import annotations
+
+import pickle
+import time
+from typing import Any, Callable, List
+
+from pynotam import Notam, binary
+from pynotam.tests.test_helper import read_all_notams
+
+REPEAT = 5
+
+
+def per_notam(f: Callable[[], Any], count: int) -> float:
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            f()
+        best = min(best, (time.perf_counter() - start) / (REPEAT * count))
+    return best * 1e6
+
+
+def main() -> None:
+    notams = [Notam.from_str(t) for t in read_all_notams()]
+    texts = [n.full_text or '' for n in notams]
+    count = len(notams)
+    single_bin = [n.to_bytes() for n in notams]
+    single_pickle = [pickle.dumps(n, pickle.HIGHEST_PROTOCOL) for n in notams]
+    batch_bin = binary.encode_many(notams)
+    batch_pickle = pickle.dumps(notams, pickle.HIGHEST_PROTOCOL)
+
+    rows: List[Any] = [
+        ('binary, one at a time', sum(map(len, single_bin)),
+         per_notam(lambda: [n.to_bytes() for n in notams], count),
+         per_notam(lambda: [Notam.from_bytes(b) for b in single_bin], count)),
+        ('pickle, one at a time', sum(map(len, single_pickle)),
+         per_notam(lambda: [pickle.dumps(n, pickle.HIGHEST_PROTOCOL) for n in notams], count),
+         per_notam(lambda: [pickle.loads(b) for b in single_pickle], count)),
+        ('binary, batch', len(batch_bin), per_notam(lambda: binary.encode_many(notams), count),
+         per_notam(lambda: binary.decode_many(batch_bin), count)),
+        ('pickle, batch', len(batch_pickle), per_notam(lambda: pickle.dumps(notams, pickle.HIGHEST_PROTOCOL), count),
+         per_notam(lambda: pickle.loads(batch_pickle), count)),
+        ('text, reparsed', sum(len(t.encode()) for t in texts), None,
+         per_notam(lambda: [Notam.from_str(t) for t in texts], count)),
+    ]
+    print('{:<24} {:>10} {:>14} {:>14}'.format('', 'bytes', 'encode us/rec', 'decode us/rec'))
+    for (label, size, enc, dec) in rows:
+        print('{:<24} {:>10} {:>14} {:>14.1f}'.format(label, size, '-' if enc is None else '{:.1f}'.format(enc), dec))
+
+
+if __name__ == '__main__':
+    main()
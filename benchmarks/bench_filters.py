@@ -0,0 +1,70 @@
+"""Throughput of compiled filter expressions, against the equivalent lambda over Notam objects.
+
+Each filter runs over a list of NOTAMs made of copies of the test corpus, once as a plain lambda and once compiled
+with pynotam.filters (ordered for the list). The same filters also run over a shared-memory table of the list
+with Filter.indices, and as a lambda over the Notams materialized from it.
+
+Run from the repository root with: python -m benchmarks.bench_filters"""
+from __future__ import annotations
+
+import copy
+import os
+import time
+from typing import Any, Callable, List
+
+from pynotam import Notam
+from pynotam.filters import compile_filter
+from pynotam.shm import SharedNotamPublisher, SharedNotamReader
+from pynotam.tests.test_helper import read_all_notams
+
+COUNT = 200000
+
+FILTERS = (
+    ("fir == 'LLLL' and 'IFR' in traffic_type and notam_code.startswith('QMR')",
+     lambda n: n.fir == 'LLLL' and 'IFR' in n.traffic_type and n.notam_code.startswith('QMR')),
+    ("'IFR' in traffic_type and 'AERODROME' in scope and 'MISC' not in purpose",
+     lambda n: 'IFR' in n.traffic_type and 'AERODROME' in n.scope and 'MISC' not in n.purpose),
+    ("notam_code.startswith(('QMR', 'QFA', 'QOB')) and fl_upper <= 100",
+     lambda n: n.notam_code.startswith(('QMR', 'QFA', 'QOB')) and n.fl_upper <= 100),
+)
+
+
+def notams(count: int) -> List[Notam]:
+    corpus = [Notam.from_str(t) for t in read_all_notams()]
+    return [copy.copy(corpus[i % len(corpus)]) for i in range(count)]
+
+
+def timed(label: str, run: Callable[[], Any], count: int) -> float:
+    start = time.perf_counter()
+    matches = len(run())
+    elapsed = time.perf_counter() - start
+    print('  {:<18} {:>7} matches in {:7.3f} s: {:>10.0f} NOTAMs/s'.format(label, matches, elapsed,
+                                                                          count / elapsed))
+    return elapsed
+
+
+def main() -> None:
+    items = notams(COUNT)
+    publisher = SharedNotamPublisher('pynotam-bench-filters-{}'.format(os.getpid()))
+    reader = SharedNotamReader(publisher.name)
+    try:
+        _ = publisher.publish(items)
+        table = reader.snapshot()
+        for (expression, test) in FILTERS:
+            print(expression)
+            f = compile_filter(expression).ordered_for(items)
+            print('  steps: {}'.format(' -> '.join(f.steps)))
+            base = timed('lambda', lambda: [n for n in items if test(n)], COUNT)
+            compiled = timed('compiled', lambda: f.select(items), COUNT)
+            print('  {:<18} {:.2f}x'.format('speedup', base / compiled))
+            rows = COUNT // 10
+            materialized = timed('shm, materialized', lambda: [n for n in table[:rows] if test(n)], rows)
+            columns = timed('shm, columns', lambda: f.indices(table), COUNT) / COUNT * rows
+            print('  {:<18} {:.2f}x'.format('speedup', materialized / columns))
+    finally:
+        reader.close()
+        publisher.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Stress benchmark of the parser on huge and adversarial inputs.
+
+For each kind of input, parse time is measured at growing sizes; the "x prev" column shows the ratio to the
+previous size, which should stay close to the size ratio (4) if parsing is linear. A fuzzing pass then checks
+that randomly mutated NOTAMs either parse or fail with a parse error, without unexpected exceptions.
+
+Run from the repository root with: python -m benchmarks.bench_parse_stress"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from parsimonious.exceptions import ParseError, VisitationError
+
+from pynotam import Notam, ParseLimitExceeded
+from pynotam.tests.test_helper import read_all_notams, read_single_notam
+
+BASE = read_single_notam('A0623/91')
+
+CASES: Dict[str, Callable[[int], str]] = {
+    'huge body': lambda k: BASE.replace('DANGER AREA DXX IS ACTIVE', 'RWY 09/27 CLSD DUE WIP. ' * (2000 * k)),
+    'many locations': lambda k: BASE.replace('A) EGTT EGPX', 'A) ' + ' '.join(['EGTT'] * (1000 * k))),
+    'whitespace runs': lambda k: BASE.replace('E) DANGER', 'E) ' + ' \n' * (5000 * k) + 'DANGER'),
+    'unterminated body': lambda k: BASE[:-1] + 'X' * (20000 * k),
+    'clause-like body': lambda k: BASE.replace('DANGER AREA DXX IS ACTIVE', 'SEE A)B)C)D) ' * (2000 * k)),
+    'trailing whitespace': lambda k: '(A0623/91 NOTAMN' + ' ' * (20000 * k),
+    'near-miss trailers': lambda k: BASE.replace('DANGER AREA', 'CREATED SOURCE ) ' * (2000 * k)),
+}
+
+
+def parse_time(text: str, **limits: Optional[float]) -> Tuple[float, str]:
+    start = time.perf_counter()
+    try:
+        _ = Notam.from_str(text, **limits)  # type: ignore[arg-type]
+        outcome = 'ok'
+    except (ParseError, VisitationError, ParseLimitExceeded) as e:
+        outcome = type(e).__name__
+    return time.perf_counter() - start, outcome
+
+
+def scaling() -> None:
+    print('{:<20} {:>10} {:>10} {:>8}  {}'.format('input', 'chars', 'ms', 'x prev', 'outcome'))
+    for (name, make) in CASES.items():
+        prev = None
+        for k in (1, 4, 16, 64):
+            text = make(k)
+            elapsed, outcome = parse_time(text)
+            ratio = '{:.1f}'.format(elapsed / prev) if prev else ''
+            print('{:<20} {:>10} {:>10.2f} {:>8}  {}'.format(name, len(text), elapsed * 1000, ratio, outcome))
+            prev = elapsed
+
+
+def limits() -> None:
+    text = CASES['many locations'](64)
+    for (label, kwargs) in (('max_length=10000', {'max_length': 10000}), ('timeout=1ms', {'timeout': 0.001})):
+        elapsed, outcome = parse_time(text, **kwargs)
+        print('{} chars with {}: {} after {:.2f} ms'.format(len(text), label, outcome, elapsed * 1000))
+
+
+def fuzz(iterations: int = 2000, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    corpus = read_all_notams()
+    outcomes: Dict[str, int] = {}
+    worst = 0.0
+    for _ in range(iterations):
+        chars = list(rnd.choice(corpus))
+        for _ in range(rnd.randint(1, 8)):
+            pos = rnd.randrange(len(chars))
+            op = rnd.random()
+            if op < 0.3:
+                del chars[pos]
+            elif op < 0.6:
+                chars.insert(pos, rnd.choice('()/ \nABCEQZ0123456789:'))
+            else:  # duplicate a slice many times
+                chars[pos:pos] = chars[pos:pos + rnd.randint(1, 20)] * rnd.randint(1, 500)
+        text = ''.join(chars)
+        elapsed, outcome = parse_time(text)
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        worst = max(worst, elapsed / len(text))
+    print('fuzzed {} inputs: {}; worst {:.2f} us/char'.format(iterations, outcomes, worst * 1e6))
+
+
+if __name__ == '__main__':
+    scaling()
+    limits()
+    fuzz()
@@ -0,0 +1,57 @@
+"""Throughput of generating NOTAM text in bulk from structured fields, e.g. one NOTAM per facility.
+
+NOTAMs are built from the fields of the test corpus, with fresh ids and locations, and streamed into an in-memory
+file with write_notams(), with and without validating each text by parsing it again. Parsing the same number
+of NOTAMs is shown for comparison.
+
+Run from the repository root with: python -m benchmarks.bench_render"""
+from __future__ import annotations
+
+import copy
+import io
+import time
+from typing import List
+
+from pynotam import Notam
+from pynotam.render import write_notams
+from pynotam.tests.test_helper import read_all_notams
+
+COUNT = 20000
+
+
+def facilities(count: int) -> List[Notam]:
+    corpus = [Notam.from_str(t) for t in read_all_notams()]
+    result = []
+    for i in range(count):
+        n = copy.copy(corpus[i % len(corpus)])
+        n.notam_id = 'A{:04d}/24'.format(i % 10000)
+        n.location = [''.join(chr(ord('A') + i // 26 ** k % 26) for k in range(4))]
+        result.append(n)
+    return result
+
+
+def main() -> None:
+    notams = facilities(COUNT)
+    for validate in (False, True):
+        count = COUNT if not validate else COUNT // 10
+        out = io.StringIO()
+        start = time.perf_counter()
+        written = write_notams(notams[:count], out, validate=validate)
+        elapsed = time.perf_counter() - start
+        print('render{:<12} {:>8} NOTAMs in {:7.3f} s: {:>9.0f} NOTAMs/s, {:6.1f} MB/s'.format(
+            ' + validate' if validate else '', written, elapsed, written / elapsed,
+            len(out.getvalue()) / elapsed / 1e6))
+
+    sample = io.StringIO()
+    write_notams(notams[:COUNT // 10], sample)
+    texts = sample.getvalue().strip().split('\n\n')
+    start = time.perf_counter()
+    for t in texts:
+        Notam.from_str(t)
+    elapsed = time.perf_counter() - start
+    print('{:<18} {:>8} NOTAMs in {:7.3f} s: {:>9.0f} NOTAMs/s'.format('parse', len(texts), elapsed,
+                                                                    len(texts) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Latency of validating a NOTAM draft on every keystroke: parsing the whole text again with Notam.from_str,
+versus Notam.from_edit, which parses only the edited item again.
+
+Drafts are the longest NOTAMs of the test corpus, and versions of them whose E) item is padded to several
+thousand characters. Each keystroke inserts one character into the middle of the E) item.
+
+Run from the repository root with: python -m benchmarks.bench_reparse"""
+from __future__ import annotations
+
+import time
+from typing import Callable, List
+
+from pynotam import Notam
+from pynotam.tests.test_helper import read_all_notams
+
+KEYSTROKES = 200
+
+
+def typed(draft: str, edit: Callable[[Notam, int, str], Notam]) -> List[float]:
+    notam = Notam.from_str(draft)
+    latencies = []
+    for i in range(KEYSTROKES):
+        assert notam.indices_item_e is not None
+        (s, e) = notam.indices_item_e
+        start = time.perf_counter()
+        notam = edit(notam, (s + e) // 2, 'X' if i % 6 else ' ')
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def full(notam: Notam, pos: int, c: str) -> Notam:
+    assert notam.full_text is not None
+    return Notam.from_str(notam.full_text[:pos] + c + notam.full_text[pos:])
+
+
+def incremental(notam: Notam, pos: int, c: str) -> Notam:
+    return Notam.from_edit(notam, pos, pos, c)
+
+
+def padded(text: str, length: int) -> str:
+    n = Notam.from_str(text)
+    assert n.indices_item_e is not None
+    e = n.indices_item_e[1]
+    filler = ' AND RWY 09L/27R CLSD DUE TO WIP'
+    return text[:e] + filler * max(0, (length - len(text)) // len(filler)) + text[e:]
+
+
+def main() -> None:
+    longest = max(read_all_notams(), key=len)
+    print('{:>8} {:>16} {:>16} {:>16} {:>16}'.format('length', 'from_str p50 ms', 'from_str p99 ms',
+                                                     'from_edit p50 ms', 'from_edit p99 ms'))
+    for length in (len(longest), 2000, 5000, 20000):
+        draft = padded(longest, length)
+        a, b = typed(draft, full), typed(draft, incremental)
+        print('{:>8} {:>16.3f} {:>16.3f} {:>16.3f} {:>16.3f}'.format(
+            len(draft), a[len(a) // 2] * 1e3, a[-len(a) // 100] * 1e3, b[len(b) // 2] * 1e3,
+            b[-len(b) // 100] * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Bulk-load throughput of the SQLite NotamRepository at different batch sizes, and the time of a warm restart
+(loading the NOTAMs in effect back from the database) compared with parsing the archive again.
+
+The corpus is replicated under fresh notam_ids to reach a realistic archive size.
+
+Run from the repository root with: python -m benchmarks.bench_repository"""
+from __future__ import annotations
+
+import copy
+import os
+import tempfile
+import time
+from typing import List
+
+from pynotam import Notam
+from pynotam.repository import NotamRepository
+from pynotam.tests.test_helper import read_all_notams
+
+COPIES = 200
+
+
+def replicate(notams: List[Notam]) -> List[Notam]:
+    out = []
+    for k in range(COPIES):
+        for (i, n) in enumerate(notams):
+            c = copy.copy(n)
+            c.notam_id, c.ref_notam_id = 'X{:07d}'.format(k * len(notams) + i), None
+            c.notam_type = 'NEW'
+            out.append(c)
+    return out
+
+
+def main() -> None:
+    texts = read_all_notams()
+    notams = replicate([Notam.from_str(s) for s in texts])
+    print('{} NOTAMs'.format(len(notams)))
+    with tempfile.TemporaryDirectory() as d:
+        for batch_size in (1, 100, 1000, 10000):
+            path = os.path.join(d, 'notams-{}.db'.format(batch_size))
+            sample = notams if batch_size > 1 else notams[:2000]
+            with NotamRepository(path, batch_size=batch_size) as repo:
+                start = time.perf_counter()
+                repo.upsert(sample)
+                elapsed = time.perf_counter() - start
+            print('batch size {:>5}: {:>8.0f} NOTAMs/s'.format(batch_size, len(sample) / elapsed))
+
+        with NotamRepository(path) as repo:
+            start = time.perf_counter()
+            loaded = sum(1 for _ in repo.active())
+            restart = time.perf_counter() - start
+        start = time.perf_counter()
+        for s in texts:
+            _ = Notam.from_str(s)
+        reparse = (time.perf_counter() - start) * COPIES
+        print('warm restart: {} NOTAMs in {:.2f} s; reparsing them would take {:.2f} s'.format(
+            loaded, restart, reparse))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Load and query throughput of a single-process NotamStore against ShardedNotamStores of growing size.
+
+The corpus is replicated under fresh notam_ids (and spread over synthetic FIRs) to reach a realistic global
+NOTAM count. Queries combine a time window with either a FIR (sent to one shard when partitioning by FIR) or a
+NOTAM code prefix (sent to all shards).
+
+Run from the repository root with: python -m benchmarks.bench_store"""
+from __future__ import annotations
+
+import copy
+import time
+from datetime import datetime, timezone
+from typing import List, Union
+
+from pynotam import Notam
+from pynotam.store import NotamStore, Query, ShardedNotamStore
+from pynotam.tests.test_helper import read_all_notams
+
+COPIES = 500
+FIRS = ['F{:03d}'.format(i) for i in range(200)]
+
+
+def replicate(notams: List[Notam]) -> List[Notam]:
+    out = []
+    for k in range(COPIES):
+        for (i, n) in enumerate(notams):
+            c = copy.copy(n)
+            c.notam_id, c.notam_type, c.ref_notam_id = 'X{:07d}'.format(k * len(notams) + i), 'NEW', None
+            c.fir = FIRS[(k + i) % len(FIRS)]
+            out.append(c)
+    return out
+
+
+def run(store: Union[NotamStore, ShardedNotamStore], notams: List[Notam], label: str) -> None:
+    start = time.perf_counter()
+    store.apply_many(notams)
+    load = time.perf_counter() - start
+    window = dict(active_from=datetime(2023, 1, 1, tzinfo=timezone.utc),
+                  active_till=datetime(2023, 2, 1, tzinfo=timezone.utc))
+    for (kind, queries) in (('fir', [Query(firs=[f], **window) for f in FIRS[:50]]),
+                            ('code', [Query(code_prefix=p, **window) for p in ('QMR', 'QFA', 'QW', 'QOB', 'QR')])):
+        start = time.perf_counter()
+        hits = sum(len(store.query(q)) for q in queries)
+        elapsed = (time.perf_counter() - start) / len(queries)
+        print('{:<12} load {:6.2f} s   {:<4} query {:8.2f} ms ({:.0f} hits avg)'.format(
+            label, load, kind, elapsed * 1000, hits / len(queries)))
+
+
+def main() -> None:
+    notams = replicate([Notam.from_str(s) for s in read_all_notams()])
+    print('{} NOTAMs'.format(len(notams)))
+    run(NotamStore(), notams, 'single')
+    for shards in (2, 4, 8):
+        with ShardedNotamStore(shards=shards, by='fir') as store:
+            run(store, notams, '{} shards'.format(shards))
+
+
+if __name__ == '__main__':
+    main()
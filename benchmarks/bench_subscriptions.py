@@ -0,0 +1,78 @@
+"""Matching latency of incoming NOTAMs against 100k standing subscriptions, indexed vs. a linear scan.
+
+Subscriptions are spread over a world-wide network: A) locations drawn from several thousand aerodromes, circles
+anywhere on the globe, a few hundred FIRs and three- to five-letter NOTAM code prefixes. Some of them refer to
+the locations, FIRs and codes of the test corpus, so that matches do occur.
+
+Run from the repository root with: python -m benchmarks.bench_subscriptions"""
+from __future__ import annotations
+
+import random
+import string
+import time
+from typing import Any, Dict, List
+
+from pynotam import Notam
+from pynotam.subscriptions import Subscription, SubscriptionMatcher
+from pynotam.tests.test_helper import read_all_notams
+
+SUBSCRIPTIONS = 100_000
+
+
+def world_subscriptions(notams: List[Notam], count: int, seed: int = 0) -> List[Subscription]:
+    rnd = random.Random(seed)
+
+    def icao() -> str:
+        return ''.join(rnd.choice(string.ascii_uppercase) for _ in range(4))
+
+    aerodromes = [icao() for _ in range(5000)] + sorted({loc for n in notams for loc in n.location})
+    firs = [icao() for _ in range(300)] + sorted({n.fir for n in notams if n.fir})
+    codes = ['Q' + ''.join(rnd.choice(string.ascii_uppercase) for _ in range(4)) for _ in range(500)] + \
+        sorted({n.notam_code for n in notams if n.notam_code})
+    subs = []
+    for i in range(count):
+        r = rnd.random()
+        kwargs: Dict[str, Any] = {}
+        if r < 0.6:
+            kwargs['locations'] = rnd.sample(aerodromes, rnd.randint(1, 3))
+            if rnd.random() < 0.5:
+                kwargs['code_prefix'] = rnd.choice(codes)[:3]
+        elif r < 0.85:
+            kwargs['center'] = (rnd.uniform(-60, 70), rnd.uniform(-180, 180))
+            kwargs['radius_nm'] = rnd.choice([5, 20, 50])
+            kwargs['fl_lower'] = rnd.choice([None, 100])
+        elif r < 0.95:
+            kwargs['firs'] = [rnd.choice(firs)]
+            kwargs['code_prefix'] = rnd.choice(codes)[:rnd.randint(3, 5)]
+        else:
+            kwargs['code_prefix'] = rnd.choice(codes)
+        subs.append(Subscription(i, **kwargs))
+    return subs
+
+
+def main() -> None:
+    notams = [Notam.from_str(s) for s in read_all_notams()]
+    subs = world_subscriptions(notams, SUBSCRIPTIONS)
+
+    start = time.perf_counter()
+    matcher = SubscriptionMatcher(subs)
+    print('indexed {} subscriptions in {:.2f} s'.format(len(subs), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    matches = sum(len(matcher.match(n)) for n in notams)
+    indexed = (time.perf_counter() - start) / len(notams)
+    candidates = sum(len(matcher.candidates(n)) for n in notams) / len(notams)
+
+    sample = notams[::10]
+    start = time.perf_counter()
+    for n in sample:
+        _ = [s.id for s in subs if s.matches(n)]
+    linear = (time.perf_counter() - start) / len(sample)
+
+    print('indexed: {:.3f} ms/NOTAM ({:.0f} candidates verified and {:.1f} matches on average)'.format(
+        indexed * 1000, candidates, matches / len(notams)))
+    print('linear scan: {:.3f} ms/NOTAM; speedup {:.0f}x'.format(linear * 1000, linear / indexed))
+
+
+if __name__ == '__main__':
+    main()
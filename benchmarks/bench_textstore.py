@@ -0,0 +1,49 @@
+"""Compression ratio and per-record access latency of the CompressedTextStore with different codecs.
+
+Dictionaries are trained on every other NOTAM of the corpus and evaluated on the others, so that the ratios are
+not flattered by compressing the training data itself.
+
+Run from the repository root with: python -m benchmarks.bench_textstore"""
+from __future__ import annotations
+
+import time
+from typing import List, Tuple
+
+from pynotam.tests.test_helper import read_all_notams
+from pynotam.textstore import CompressedTextStore, TextCodec, ZlibCodec, ZstdCodec, is_zstd_available
+
+
+def codecs(training: List[str]) -> List[Tuple[str, TextCodec]]:
+    result: List[Tuple[str, TextCodec]] = [
+        ('zlib, no dictionary', ZlibCodec(b'')),
+        ('zlib, ICAO dictionary', ZlibCodec()),
+        ('zlib, trained dictionary', ZlibCodec.train(training)),
+    ]
+    if is_zstd_available():
+        result += [('zstd, no dictionary', ZstdCodec()), ('zstd, trained dictionary', ZstdCodec.train(training))]
+    return result
+
+
+def main() -> None:
+    texts = read_all_notams()
+    training, evaluation = texts[::2], texts[1::2]
+    keys = [str(i) for i in range(len(evaluation))]
+    print('{:<26} {:>7} {:>12} {:>12}'.format('codec', 'ratio', 'put us/rec', 'get us/rec'))
+    for (label, codec) in codecs(training):
+        store = CompressedTextStore(codec)
+        start = time.perf_counter()
+        for _ in range(10):
+            for (k, t) in zip(keys, evaluation):
+                store.put(k, t)
+        put = (time.perf_counter() - start) / (10 * len(keys))
+        start = time.perf_counter()
+        for _ in range(10):
+            for k in keys:
+                _ = store.get(k)
+        get = (time.perf_counter() - start) / (10 * len(keys))
+        print('{:<26} {:>7.2f} {:>12.1f} {:>12.1f}'.format(
+            label, store.raw_size / store.compressed_size, put * 1e6, get * 1e6))
+
+
+if __name__ == '__main__':
+    main()
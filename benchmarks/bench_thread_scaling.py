@@ -0,0 +1,39 @@
+"""Parsing throughput with a growing number of threads.
+
+On regular CPython builds the GIL keeps throughput roughly flat; on free-threaded builds (e.g. python3.13t) it
+should grow with the number of threads, up to the number of cores.
+
+Run from the repository root with: python -m benchmarks.bench_thread_scaling"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+from pynotam.batch import iter_parse
+from pynotam.tests.test_helper import read_all_notams
+
+ROUNDS = 20
+
+
+def main() -> None:
+    corpus = read_all_notams()
+    items = [('corpus', i, t) for (i, t) in enumerate(corpus * ROUNDS)]
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('Python {} ({}), {} CPUs, {} NOTAMs'.format(
+        sys.version.split()[0], 'GIL enabled' if gil else 'free-threaded', os.cpu_count(), len(items)))
+
+    baseline = None
+    for threads in (1, 2, 4, 8, 16):
+        start = time.perf_counter()
+        errors = sum(1 for r in iter_parse(items, workers=threads, chunk_size=32, use_threads=threads > 1)
+                     if r.error is not None)
+        elapsed = time.perf_counter() - start
+        rate = len(items) / elapsed
+        baseline = baseline or rate
+        print('{:>3} threads: {:>8.0f} NOTAMs/s  speedup {:.2f}  ({} errors)'.format(
+            threads, rate, rate / baseline, errors))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Cost of tokenizing the free text of NOTAMs, and of consumers reusing the cached tokens instead of rescanning.
+
+Each consumer is modelled as a pass over the free-text items: decoding the abbreviations, and collecting the
+numbers. Rescanning runs the abbreviation decoder and a number regex over the items on every pass; with tokens,
+the first pass tokenizes once and later passes only iterate over the cached token array.
+
+Run from the repository root with: python -m benchmarks.bench_tokens"""
+from __future__ import annotations
+
+import re
+import time
+from typing import Callable, List
+
+from pynotam import Notam
+from pynotam.abbreviations import ICAO
+from pynotam.tests.test_helper import read_all_notams
+from pynotam.tokens import NUMBER, item_ranges
+
+PASSES = 10
+_number_regex = re.compile(r"\b[0-9]+\b")
+
+
+def rescanning(notams: List[Notam]) -> None:
+    for n in notams:
+        assert n.full_text is not None
+        for (s, e) in item_ranges(n):
+            ICAO.decode(n.full_text[s:e])
+            _number_regex.findall(n.full_text, s, e)
+
+
+def with_tokens(notams: List[Notam]) -> None:
+    for n in notams:
+        assert n.full_text is not None
+        stream = n.tokens()
+        stream.decode(n.full_text)
+        [n.full_text[t.start:t.end] for t in stream.of_kind(NUMBER)]
+
+
+def timed(f: Callable[[List[Notam]], None], notams: List[Notam]) -> float:
+    start = time.perf_counter()
+    for _ in range(PASSES):
+        f(notams)
+    return (time.perf_counter() - start) / (PASSES * len(notams))
+
+
+def main() -> None:
+    notams = [Notam.from_str(t) for t in read_all_notams()]
+    start = time.perf_counter()
+    for n in notams:
+        n.tokens()
+    tokenize = (time.perf_counter() - start) / len(notams)
+    tokens = sum(len(n.tokens()) for n in notams)
+    size = sum(n.tokens().data.itemsize * len(n.tokens().data) for n in notams)
+    print('{} NOTAMs, {} tokens, {:.0f} bytes of tokens per NOTAM'.format(len(notams), tokens, size / len(notams)))
+    print('tokenize once:            {:8.1f} us/NOTAM'.format(tokenize * 1e6))
+    print('rescan, per pass:         {:8.1f} us/NOTAM'.format(timed(rescanning, notams) * 1e6))
+    print('cached tokens, per pass:  {:8.1f} us/NOTAM'.format(timed(with_tokens, notams) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
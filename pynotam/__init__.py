@@ -2,13 +2,18 @@ from __future__ import annotations
 from datetime import datetime
 
 import re as _re
-from io import StringIO as _StringIO
-from typing import Dict, List, Optional, Set, Tuple
+from hashlib import blake2b as _blake2b
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from typing_extensions import override
 
 from pynotam.timeutils import EstimatedDateTime
 
+from . import abbreviations as _abbreviations
+from . import binary as _binary
+from . import tokens as _tokens
 from ._abbr import ICAO_abbr
-from ._parser import NotamParseVisitor
+from ._parser import NotamParseVisitor, ParseLimitExceeded, looks_like_notam, reparse as _reparse
 
 
 class Notam(object):
@@ -55,9 +60,9 @@ class Notam(object):
     scope: Set[str] = set()
 
     """Lower vertical limit of NOTAM area of influence, expressed in flight levels (int)."""
-    fl_lower: Optional[str] = None
+    fl_lower: Optional[int] = None
     """Upper vertical limit of NOTAM area of influence, expressed in flight levels (int)."""
-    fl_upper: Optional[str] = None
+    fl_upper: Optional[int] = None
     """
     Approximate circle whose radius encompasses the NOTAM's whole area of influence.
     This is a dict with keys: 'lat', 'long', 'radius' (str, str, int respectively).
@@ -70,8 +75,16 @@ class Notam(object):
     """
     location: List[str] = []
 
+    """
+    For a NOTAM sent in several parts (A) ... PART n OF m), the number of this part (n, counting from 1) and
+    the total number of parts (m). Both are None for single-part NOTAMs. A NOTAM merged from all of its parts
+    (see multipart.PartReassembler) has part_count set but part_number None.
+    """
+    part_number: Optional[int] = None
+    part_count: Optional[int] = None
+
     """The date and time at which the NOTAM comes into force (datetime.datetime)."""
-    valid_from: Optional[str] = None
+    valid_from: Optional[datetime] = None
 
     """
     For anything except a 'CANCEL'-type NOTAM, a date and time indicating duration of
@@ -109,45 +122,133 @@ class Notam(object):
     indices_item_f: Optional[Tuple[int, int]] = None
     indices_item_g: Optional[Tuple[int, int]] = None
 
+    # (full text, dictionary version, tokens) of the last call to tokens().
+    _token_cache: Optional[Tuple[str, str, _tokens.TokenStream]] = None
+
+    def __init__(self) -> None:
+        # Give every instance its own containers, rather than sharing (and possibly mutating) the class-level
+        # defaults above across all instances and threads.
+        self.traffic_type = set()
+        self.purpose = set()
+        self.scope = set()
+        self.area = {}
+        self.location = []
+
+    # No longer used for decoding (see pynotam.abbreviations), kept for code that uses it directly.
     decode_abbr_regex = _re.compile(
         r"\b(" + "|".join([_re.escape(key) for key in ICAO_abbr.keys()]) + r")\b"
     )
 
-    def decoded(self) -> str:
-        """Returns the full text of the NOTAM, with ICAO abbreviations decoded into their un-abbreviated
-        form where appropriate."""
-
-        with _StringIO() as sb:
-            indices = [
-                getattr(self, "indices_item_{}".format(i)) for i in ("d", "e", "f", "g")
-            ]
-            indices = [i for i in indices if i is not None]
-            indices.sort()  # The items should already be listed in the order of their apperance in the text, but
-            # we sort them here just in case
-            indices = [(0, 0)] + indices + [(-1, -1)]
-
-            if self.full_text is not None:
-                for cur, nxt in zip(indices, indices[1:]):
-                    (cs, ce) = cur
-                    (ns, _) = nxt
-                    _ = sb.write(
-                        self.decode_abbr(self.full_text[cs:ce])
-                    )  # decode the text of this range
-                    _ = sb.write(
-                        self.full_text[ce:ns]
-                    )  # copy the text from end of current range to start
-                    # of next verbatim
-            return sb.getvalue()
+    def decoded(self, abbreviations: Union[None, str, _abbreviations.AbbreviationDictionary] = None) -> str:
+        """Returns the full text of the NOTAM, with abbreviations decoded into their un-abbreviated form where
+        appropriate. By default the ICAO abbreviations are decoded; 'abbreviations' selects another dictionary,
+        either directly or by its registered name (see pynotam.abbreviations)."""
+        if self.full_text is None:
+            return ''
+        # The text after the last item is copied up to, but excluding, the final character (normally the closing
+        # parenthesis of the NOTAM).
+        ranges = _tokens.item_ranges(self)
+        stop = max(len(self.full_text) - 1, ranges[-1][1] if ranges else 0)
+        return self.tokens(abbreviations).decode(self.full_text[:stop])
+
+    def tokens(self, abbreviations: Union[None, str, _abbreviations.AbbreviationDictionary] = None) \
+            -> _tokens.TokenStream:
+        """Returns the tokens of the NOTAM's free-text items D) to G) (see pynotam.tokens), with the abbreviations
+        of the given dictionary (default: ICAO) recognized. They are computed once and cached, until the full text
+        changes or another dictionary is asked for."""
+        dictionary = _abbreviations.resolve(abbreviations)
+        cached = self._token_cache
+        if cached is not None and cached[0] is self.full_text and cached[1] == dictionary.version:
+            return cached[2]
+        if self.full_text is None:
+            raise ValueError('cannot tokenize a NOTAM without its full text')
+        stream = _tokens.tokenize(self.full_text, _tokens.item_ranges(self), dictionary)
+        self._token_cache = (self.full_text, dictionary.version, stream)
+        return stream
+
+    def fingerprint(self) -> bytes:
+        """Returns a 16-byte digest identifying the content of this NOTAM, independently of how its text was
+        laid out. It covers the NOTAM's id and type, its Q-line and its items A) through G), with all runs of
+        whitespace in free text collapsed; the CREATED/SOURCE trailers and the raw full text are not part of it.
+        Two Notams compare (and hash) equal if and only if their fingerprints are equal."""
+        def norm(v: object) -> str:
+            if v is None:
+                return ''
+            if isinstance(v, (set, frozenset)):
+                return ','.join(sorted(v))
+            if isinstance(v, list):
+                return ' '.join(v)
+            if isinstance(v, dict):
+                return '{lat}{long}{radius}'.format(**v) if v else ''
+            if isinstance(v, datetime):
+                return v.strftime('%Y%m%d%H%M') + ('EST' if getattr(v, 'is_estimated', False) else '')
+            return ' '.join(str(v).split())
+
+        fields = (self.notam_id, self.notam_type, self.ref_notam_id,
+                  self.fir, self.notam_code, self.traffic_type, self.purpose, self.scope,
+                  self.fl_lower, self.fl_upper, self.area,
+                  self.location, self.part_number, self.part_count,
+                  self.valid_from, self.valid_till, self.schedule, self.body,
+                  self.limit_lower, self.limit_upper)
+        return _blake2b('\x1f'.join(map(norm, fields)).encode(), digest_size=16).digest()
+
+    @override
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Notam):
+            return NotImplemented
+        return self.fingerprint() == other.fingerprint()
+
+    @override
+    def __hash__(self) -> int:
+        return hash(self.fingerprint())
 
     @staticmethod
-    def from_str(s: str) -> Notam:
-        """Returns a Notam containing information parsed from within the provided string."""
+    def from_str(s: str, max_length: Optional[int] = None, timeout: Optional[float] = None) -> Notam:
+        """Returns a Notam containing information parsed from within the provided string.
+
+        Safe to call concurrently from several threads; each call parses into a fresh Notam.
+
+        Untrusted input can be bounded by a maximum text length and a parse timeout in seconds; exceeding
+        either raises ParseLimitExceeded."""
         n = Notam()
-        visitor = NotamParseVisitor(n)
+        visitor = NotamParseVisitor(n, max_length=max_length, timeout=timeout)
         visitor.parse(s)
         return n
 
+    @staticmethod
+    def from_edit(previous: Notam, start: int, end: int, replacement: str, max_length: Optional[int] = None,
+                  timeout: Optional[float] = None) -> Notam:
+        """Returns a Notam for the full text of 'previous' with the characters [start, end) replaced by
+        'replacement', e.g. to validate a draft on every keystroke. The result is the same as from_str on the
+        edited text, but when the edit lies within a single item (A to G), only that item is parsed again and
+        the indices_item_* of the others are shifted. 'previous' is left unchanged.
+
+        max_length and timeout are as for from_str."""
+        if previous.full_text is None:
+            raise ValueError('cannot edit a NOTAM without its full text')
+        if not 0 <= start <= end <= len(previous.full_text):
+            raise ValueError('invalid edit range [{}, {}) for a text of length {}'.format(
+                start, end, len(previous.full_text)))
+        if max_length is None or len(previous.full_text) + len(replacement) - (end - start) <= max_length:
+            n = _reparse(previous, start, end, replacement)
+            if n is not None:
+                return n
+        text = previous.full_text[:start] + replacement + previous.full_text[end:]
+        return Notam.from_str(text, max_length=max_length, timeout=timeout)
+
+    def to_bytes(self) -> bytes:
+        """Returns the NOTAM in a compact binary format (see pynotam.binary), e.g. to send it to another service.
+        Datetimes are stored in UTC, to the microsecond."""
+        return _binary.encode(self)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> Notam:
+        """Returns the Notam encoded by to_bytes. Raises ValueError if the data is not in that format."""
+        return _binary.decode(data)
+
     @classmethod
-    def decode_abbr(cls, txt: str) -> str:
-        """Decodes ICAO abbreviations in 'txt' to their un-abbreviated form."""
-        return cls.decode_abbr_regex.sub(lambda m: ICAO_abbr[m.group()], txt)
+    def decode_abbr(cls, txt: str, abbreviations: Union[None, str, _abbreviations.AbbreviationDictionary] = None) \
+            -> str:
+        """Decodes abbreviations in 'txt' to their un-abbreviated form, using the ICAO dictionary unless another
+        one is given (see decoded)."""
+        return _abbreviations.resolve(abbreviations).decode(txt)
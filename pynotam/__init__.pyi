@@ -1,7 +1,11 @@
 from _typeshed import Incomplete
 from datetime import datetime
+from pynotam.abbreviations import AbbreviationDictionary
+from pynotam.tokens import TokenStream
+from pynotam._parser import ParseLimitExceeded as ParseLimitExceeded, looks_like_notam as looks_like_notam
 from pynotam.timeutils import EstimatedDateTime as EstimatedDateTime
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
+from typing_extensions import override
 
 class Notam:
     full_text: Optional[str]
@@ -13,11 +17,13 @@ class Notam:
     traffic_type: Set[str]
     purpose: Set[str]
     scope: Set[str]
-    fl_lower: Optional[str]
-    fl_upper: Optional[str]
+    fl_lower: Optional[int]
+    fl_upper: Optional[int]
     area: Dict[str, str | int]
     location: List[str]
-    valid_from: Optional[str]
+    part_number: Optional[int]
+    part_count: Optional[int]
+    valid_from: Optional[datetime]
     valid_till: Optional[datetime | EstimatedDateTime]
     schedule: Optional[str]
     body: Optional[str]
@@ -33,8 +39,21 @@ class Notam:
     indices_item_f: Optional[Tuple[int, int]]
     indices_item_g: Optional[Tuple[int, int]]
     decode_abbr_regex: Incomplete
-    def decoded(self) -> str: ...
+    def __init__(self) -> None: ...
+    def decoded(self, abbreviations: Union[None, str, AbbreviationDictionary] = ...) -> str: ...
+    def tokens(self, abbreviations: Union[None, str, AbbreviationDictionary] = ...) -> TokenStream: ...
+    def fingerprint(self) -> bytes: ...
+    @override
+    def __eq__(self, other: object) -> bool: ...
+    @override
+    def __hash__(self) -> int: ...
     @staticmethod
-    def from_str(s: str) -> Notam: ...
+    def from_str(s: str, max_length: Optional[int] = ..., timeout: Optional[float] = ...) -> Notam: ...
+    @staticmethod
+    def from_edit(previous: Notam, start: int, end: int, replacement: str, max_length: Optional[int] = ...,
+                  timeout: Optional[float] = ...) -> Notam: ...
+    def to_bytes(self) -> bytes: ...
+    @staticmethod
+    def from_bytes(data: bytes) -> Notam: ...
     @classmethod
-    def decode_abbr(cls, txt: str) -> str: ...
+    def decode_abbr(cls, txt: str, abbreviations: Union[None, str, AbbreviationDictionary] = ...) -> str: ...
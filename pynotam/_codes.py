@@ -0,0 +1,47 @@
+"""Meanings of the single-letter codes used in the traffic, purpose and scope fields of the Q-line, and a compact
+bitflag representation of the resulting sets."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Set, Tuple
+
+TRAFFIC_TYPES: Dict[str, str] = {'I': 'IFR',
+                                 'V': 'VFR',
+                                 'K': 'CHECKLIST'}
+
+PURPOSES: Dict[str, str] = {'N': 'IMMEDIATE ATTENTION',
+                            'B': 'OPERATIONAL SIGNIFICANCE',
+                            'O': 'FLIGHT OPERATIONS',
+                            'M': 'MISC',
+                            'K': 'CHECKLIST'}
+
+SCOPES: Dict[str, str] = {'A': 'AERODROME',
+                          'E': 'EN-ROUTE',
+                          'W': 'NAV WARNING',
+                          'K': 'CHECKLIST'}
+
+# Each (field, meaning) pair is assigned one bit; traffic type occupies bits 0-2, purpose 3-7 and scope 8-11.
+FLAG_BITS: Dict[Tuple[str, str], int] = {}
+for _field, _meanings in (('traffic_type', TRAFFIC_TYPES), ('purpose', PURPOSES), ('scope', SCOPES)):
+    for _meaning in _meanings.values():
+        FLAG_BITS[(_field, _meaning)] = 1 << len(FLAG_BITS)
+
+# Letter codes in their canonical order of appearance in a Q-line, for each field.
+FIELD_CODES: Dict[str, Dict[str, str]] = {'traffic_type': TRAFFIC_TYPES, 'purpose': PURPOSES, 'scope': SCOPES}
+
+
+def encode_flags(traffic_type: Iterable[str], purpose: Iterable[str], scope: Iterable[str]) -> int:
+    """Packs the decoded traffic type, purpose and scope sets of a NOTAM into a single int."""
+    flags = 0
+    for (field, values) in (('traffic_type', traffic_type), ('purpose', purpose), ('scope', scope)):
+        for v in values:
+            flags |= FLAG_BITS[(field, v)]
+    return flags
+
+
+def decode_flags(flags: int) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Inverse of encode_flags: returns the (traffic_type, purpose, scope) sets."""
+    out: Dict[str, Set[str]] = {'traffic_type': set(), 'purpose': set(), 'scope': set()}
+    for ((field, meaning), bit) in FLAG_BITS.items():
+        if flags & bit:
+            out[field].add(meaning)
+    return (out['traffic_type'], out['purpose'], out['scope'])
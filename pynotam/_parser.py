@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Callable, List, Sequence, Set, Tuple, cast
+import copy
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple, cast
 from typing_extensions import override
 import parsimonious
+from parsimonious.exceptions import IncompleteParseError, ParseError
 from parsimonious.nodes import Node, RegexNode
 
+import re
+import time
 from datetime import datetime, timezone
 
+from ._codes import PURPOSES, SCOPES, TRAFFIC_TYPES
 from .timeutils import EstimatedDateTime
 
 if TYPE_CHECKING:
@@ -31,9 +37,9 @@ grammar = parsimonious.Grammar(r"""
     upper_limit = int3
     area_of_effect = ~r"(?P<lat>[0-9]{4}[NS])(?P<long>[0-9]{5}[EW])(?P<radius>[0-9]{3})"
 
-    # TODO: needs improved multi-part handling
-    a_clause = "A)" _ location_icao (_ location_icao)* (_ "PART" _ int _ "OF" _ int)?
+    a_clause = "A)" _ location_icao (_ location_icao)* (_ part)?
     location_icao = !"PART" icao_id
+    part = "PART" _ part_number _ "OF" _ part_number
 
     b_clause = "B)" _ datetime
     c_clause = "C)" _ ((datetime _* estimated?) / permanent)
@@ -49,32 +55,137 @@ grammar = parsimonious.Grammar(r"""
     source = "SOURCE:" _ till_next_clause
 
     _ = " "
-    __ = (" " / "\n")+
+    __ = ~r"[ \n]+"
     icao_id = ~r"[A-Z]{4}"
     datetime = int2 int2 int2 int2 int2 # year month day hours minutes
-    int = ~r"[0-9]"
+    part_number = ~r"[0-9]{1,3}"
     int2 = ~r"[0-9]{2}"
     int3 = ~r"[0-9]{3}"
     month = ~r"[a-zA-Z]{3}"
     year = ~r"[0-9]{4}"
-    till_next_clause = ~r".*?(?=(?:\)$)|(?:\s[A-Z]\))|(?:\s(?:CREATED|SOURCE):))"s
+    # Everything up to the next clause, the CREATED/SOURCE trailers, or the closing parenthesis at the very end.
+    # Written as an "unrolled loop" whose alternatives can never match at the same position, so that matching
+    # (and failing to match) takes linear time in the length of the text.
+    till_next_clause = ~r"[^\s)]*(?:(?:\s(?![A-Z]\)|(?:CREATED|SOURCE):)|\)(?!$))[^\s)]*)*(?=\)$|\s[A-Z]\)|\s(?:CREATED|SOURCE):)"
 """)
 
+# The start of every text matched by the grammar's root rule, up to the first A) location: the header and the
+# Q-line. Kept in step with the grammar, so that it never rejects a text the grammar would accept.
+_prefilter_regex = re.compile(
+    r"\(?[A-Z][0-9]{4}/[0-9]{2} NOTAM(?:(N)|([RC]) [A-Z][0-9]{4}/[0-9]{2})[ \n]+"
+    + r"Q\) [A-Z]{4}/Q[A-Z]{4}/(?=[IVK])I?V?K? */(?=[NBOMK])N?B?O?M?K? */(?=[AEWK])A?E?W?K? */[0-9]{3}/[0-9]{3}/"
+    + r"[0-9]{4}[NS][0-9]{5}[EW][0-9]{3}[ \n]+A\) (?!PART)[A-Z]{4}")
+
+_TYPES = {'N': 'NEW', 'R': 'REPLACE', 'C': 'CANCEL'}
+
+
+def looks_like_notam(s: str) -> Optional[str]:
+    """Checks, without parsing it, whether the text starts like a NOTAM: with a well-formed header, Q-line and A)
+    item. Returns the NOTAM's type ('NEW', 'REPLACE' or 'CANCEL') if so, and None otherwise. Texts for which this
+    returns None are certain to fail parsing; the others may still fail in later items."""
+    m = _prefilter_regex.match(s)
+    if m is None:
+        return None
+    return _TYPES[m.group(1) or m.group(2)[0]]
+
+
+_MONTHS = {m: i for (i, m) in enumerate(('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+                                          'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), start=1)}
+
+
+class ParseLimitExceeded(ValueError):
+    """Raised when a NOTAM is longer than the maximum length, or takes longer to parse than the timeout, that it
+    is being parsed with."""
+
+
+class _DeadlineCache(defaultdict[int, Dict[int, Any]]):
+    """A packrat cache for parsimonious that aborts the parse once a deadline has passed. Parsimonious consults
+    the cache on every attempt to match an expression, which makes it a convenient place to check the clock."""
+
+    def __init__(self, deadline: float, timeout: float):
+        super().__init__(dict)
+        self.deadline = deadline
+        self.timeout = timeout
+        self._lookups = 0
+
+    @override
+    def __getitem__(self, key: int) -> Dict[int, Any]:
+        self._lookups += 1
+        if not self._lookups % 1024 and time.monotonic() > self.deadline:
+            raise ParseLimitExceeded('parsing the NOTAM took longer than {} s'.format(self.timeout))
+        return super().__getitem__(key)
+
+
 class NotamParseVisitor(parsimonious.NodeVisitor):
-    def __init__(self, tgt: "Notam"):
+    """Assigns the information parsed from a NOTAM to a target object.
+
+    A visitor instance holds the state of a single parse and must not be shared between threads; create one per
+    parse (as Notam.from_str does). The grammar itself is immutable and each parse uses its own packrat cache,
+    so any number of visitors may parse concurrently."""
+
+    def __init__(self, tgt: "Notam", max_length: int | None = None, timeout: float | None = None):
         """tgt must be an instance of an object with a __dict__ attribute. All data attributes
-        resulting from the parsing of the NOTAM will be assigned to that object."""
+        resulting from the parsing of the NOTAM will be assigned to that object.
+
+        If max_length is given, longer texts are rejected before any parsing is attempted. If timeout (in
+        seconds) is given, parsing is abandoned once it has taken longer than that. The deadline is checked
+        between the steps of the parse, but a single step (e.g. matching the text of a huge E) item) cannot be
+        interrupted; since the grammar matches in time linear in the length of the text, combining timeout with
+        max_length bounds the time spent on any input. Both limits raise ParseLimitExceeded."""
         self.tgt = tgt
+        self.max_length = max_length
+        self.timeout = timeout
+        self._deadline: float | None = None
+        self._visited = 0
         super().__init__()
 
     grammar = grammar
+    unwrapped_exceptions = (ParseLimitExceeded,)
+
+    @override
+    def parse(self, text: str, pos: int = 0) -> Any:
+        if self.max_length is not None and len(text) - pos > self.max_length:
+            raise ParseLimitExceeded('NOTAM text of length {} exceeds the maximum length of {}'.format(
+                len(text) - pos, self.max_length))
+        if self.timeout is None:
+            return self.visit(self.grammar.parse(text, pos))
+
+        # Equivalent to self.grammar.parse(text, pos), but with a cache that enforces the deadline.
+        self._deadline = time.monotonic() + self.timeout
+        rule = self.grammar.default_rule
+        error = ParseError(text)
+        # The stubs type the cache as the flat {(id, pos): node} mapping of older parsimonious versions, whereas
+        # match_core indexes it by id, then by pos, which is what _DeadlineCache provides.
+        cache = cast(Mapping[Tuple[int, int], Node], _DeadlineCache(self._deadline, self.timeout))
+        tree = rule.match_core(text, pos, cache, error)
+        if tree is None:
+            raise error
+        if tree.end < len(text):
+            raise IncompleteParseError(text, tree.end, rule)
+        result = self.visit(tree)
+        self._check_deadline()
+        return result
+
+    def _check_deadline(self) -> None:
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise ParseLimitExceeded('parsing the NOTAM took longer than {} s'.format(self.timeout))
+
+    @override
+    def visit(self, node: Node) -> Any:
+        self._visited += 1
+        if not self._visited % 256:
+            self._check_deadline()
+        return super().visit(node)
 
     @staticmethod
     def has_descendant(node: Node, descnd_name: str) -> bool:
-        if node.expr_name == descnd_name:
-            return True
-        else:
-            return any([NotamParseVisitor.has_descendant(c,descnd_name) for c in node.children])
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if n.expr_name == descnd_name:
+                return True
+            stack.extend(n.children)
+        return False
 
     def visit_simple_regex(self, node: RegexNode, _: Sequence[Any]) -> str:
         return node.match.group(0)
@@ -91,11 +202,18 @@ class NotamParseVisitor(parsimonious.NodeVisitor):
         return int(v)
 
     visit_int2 = visit_intX
+    visit_part_number = visit_intX
     visit_int3 = visit_intX
     visit_year = visit_intX
 
     def visit_month(self, node: RegexNode, visited_children: list[Any]) -> int:
-        return datetime.strptime(node.match.group(0), '%b').month
+        # A fixed table rather than strptime('%b'), which depends on the current locale and is not safe to
+        # call concurrently from several threads.
+        name = node.match.group(0)
+        try:
+            return _MONTHS[name.lower()]
+        except KeyError:
+            raise ValueError('Unknown month name {!r}'.format(name)) from None
 
     @staticmethod
     def visit_notamX_header(notam_type: str) -> Callable[[NotamParseVisitor, Node, Sequence[str]], None]:
@@ -122,37 +240,39 @@ class NotamParseVisitor(parsimonious.NodeVisitor):
         self.tgt.notam_code = self.visit_simple_regex(*args) # TODO: Parse this into the code's meaning. One day...
 
     def visit_traffic_type(self, *args: RegexNode) -> None:
-        self.tgt.traffic_type = self.visit_code_node(*args, meanings={'I' : 'IFR',
-                                                                      'V' : 'VFR',
-                                                                      'K' : 'CHECKLIST'})
+        self.tgt.traffic_type = self.visit_code_node(*args, meanings=TRAFFIC_TYPES)
 
     def visit_purpose(self, *args: RegexNode) -> None:
-        self.tgt.purpose = self.visit_code_node(*args, meanings={'N' : 'IMMEDIATE ATTENTION',
-                                                                 'B' : 'OPERATIONAL SIGNIFICANCE',
-                                                                 'O' : 'FLIGHT OPERATIONS',
-                                                                 'M' : 'MISC',
-                                                                 'K' : 'CHECKLIST'})
+        self.tgt.purpose = self.visit_code_node(*args, meanings=PURPOSES)
 
     def visit_scope(self, *args: RegexNode) -> None:
-        self.tgt.scope = self.visit_code_node(*args, meanings={'A' : 'AERODROME',
-                                                               'E' : 'EN-ROUTE',
-                                                               'W' : 'NAV WARNING',
-                                                               'K' : 'CHECKLIST'})
+        self.tgt.scope = self.visit_code_node(*args, meanings=SCOPES)
 
     def visit_area_of_effect(self, node: RegexNode, _: Sequence[Any]) -> None:
         self.tgt.area = node.match.groupdict() # dictionary containing mappings for 'lat', 'long', and 'radius'
         self.tgt.area['radius'] = int(self.tgt.area['radius'])
 
     def visit_a_clause(self, node: RegexNode, _: Sequence[Any]) -> None:
-        def _dfs_icao_id(n: RegexNode | Node) -> List[str]:
-            if n.expr_name == "icao_id": return [self.visit_simple_regex(cast(RegexNode, n), [])]
-            return sum([_dfs_icao_id(c) for c in n.children], []) # flatten list-of-lists
+        def _dfs_icao_id(root: RegexNode | Node) -> List[str]:
+            found: List[str] = []
+            stack: List[Node] = [root]
+            while stack:
+                n = stack.pop()
+                if n.expr_name == "icao_id":
+                    found.append(self.visit_simple_regex(cast(RegexNode, n), []))
+                else:
+                    stack.extend(reversed(n.children)) # keep the locations in order of appearance
+            return found
 
         start = node.children[2].start
         end = node.children[-1].end
         self.tgt.location = _dfs_icao_id(node)
         self.tgt.indices_item_a = (start, end)
 
+    def visit_part(self, _: Node, visited_children: Sequence[Any]) -> None:
+        self.tgt.part_number = visited_children[2]
+        self.tgt.part_count = visited_children[6]
+
     def visit_b_clause(self, node: Node, visited_children: Sequence[Any]) -> None:
         self.tgt.valid_from = visited_children[2]
         content_child = node.children[2]
@@ -206,3 +326,70 @@ class NotamParseVisitor(parsimonious.NodeVisitor):
 
     def visit_root(self, node: Node, _: Sequence[Any]) -> None:
         self.tgt.full_text = node.full_text
+
+
+# Items in order of appearance. In the grammar, each item's content (indices_item_*) starts three characters after
+# its clause, behind the item letter, ')' and a space.
+_ITEMS = ('a', 'b', 'c', 'd', 'e', 'f', 'g')
+_FREE_TEXT_FIELDS = {'d': 'schedule', 'e': 'body', 'f': 'limit_lower', 'g': 'limit_upper'}
+
+# Where till_next_clause stops, other than before the closing parenthesis at the very end: it ends the item at
+# the first such position. Whether there is one at a position depends only on the 9 characters from there.
+_clause_end_regex = re.compile(r"\s(?:[A-Z]\)|CREATED:|SOURCE:)")
+_CLAUSE_END_WIDTH = 9
+
+
+def reparse(previous: "Notam", start: int, end: int, replacement: str) -> Optional["Notam"]:
+    """Returns the Notam for the text of 'previous' with [start, end) replaced by 'replacement', by parsing only
+    the item that contains the edit again, or None if that is not possible.
+
+    Only the item's clause is matched again, at its old position in the new text; if it then ends exactly where
+    the edited item ends, the rest of the text (which is unchanged) parses as before, and the other items are
+    merely shifted. Otherwise, e.g. if the edit touches the header, Q-line or trailers, spans several items,
+    or starts a new item, None is returned and the whole text must be parsed."""
+    old = previous.full_text
+    assert old is not None
+    for item in _ITEMS:
+        rng: Optional[Tuple[int, int]] = getattr(previous, 'indices_item_' + item)
+        if rng is not None and rng[0] <= start and end <= rng[1]:
+            break
+    else:
+        return None
+
+    text = old[:start] + replacement + old[end:]
+    delta = len(replacement) - (end - start)
+    new_end = rng[1] + delta
+    node: Optional[Node] = None
+    if item in _FREE_TEXT_FIELDS:
+        # Free text still ends at the same (shifted) position unless the edit made a new end, which can only be
+        # less than _CLAUSE_END_WIDTH characters before the end of the replacement; the rest of the item need not
+        # be scanned again.
+        stop = min(new_end, start + len(replacement))
+        m = _clause_end_regex.search(text, max(rng[0], start - _CLAUSE_END_WIDTH + 1),
+                                     min(len(text), stop + _CLAUSE_END_WIDTH - 1))
+        if m is not None and m.start() < stop:
+            return None
+    else:
+        try:
+            node = grammar[item + '_clause'].match(text, rng[0] - 3)
+        except ParseError:
+            return None
+        if node.end != new_end:
+            return None
+
+    n = copy.copy(previous)
+    n.full_text = text
+    n.traffic_type, n.purpose, n.scope = set(n.traffic_type), set(n.purpose), set(n.scope)
+    n.area, n.location = dict(n.area), list(n.location)
+    for other in _ITEMS:
+        r: Optional[Tuple[int, int]] = getattr(n, 'indices_item_' + other)
+        if r is not None and r[0] > rng[1]:
+            setattr(n, 'indices_item_' + other, (r[0] + delta, r[1] + delta))
+    if node is None:
+        setattr(n, _FREE_TEXT_FIELDS[item], text[rng[0]:new_end])
+        setattr(n, 'indices_item_' + item, (rng[0], new_end))
+    else:
+        if item == 'a':
+            n.part_number = n.part_count = None
+        NotamParseVisitor(n).visit(node)
+    return n
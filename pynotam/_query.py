@@ -0,0 +1,67 @@
+"""Cost- and selectivity-based ordering of predicates over NOTAMs.
+
+Predicates usually test Notam objects, but may test any representation of them (e.g. row numbers of a columnar
+table), as long as the sample is of the same kind."""
+from __future__ import annotations
+
+from typing import Any, Callable, List, NamedTuple, Sequence
+
+SAMPLE_SIZE = 64
+
+
+class Predicate(NamedTuple):
+    name: str
+    test: Callable[[Any], bool]
+    """Relative cost of a single evaluation (1 for a simple attribute comparison)."""
+    cost: float = 1.0
+
+
+def sample(notams: Sequence[Any], size: int = SAMPLE_SIZE) -> Sequence[Any]:
+    """A deterministic sample spread evenly over 'notams', used to estimate predicate selectivities."""
+    step = max(1, len(notams) // size)
+    return notams[::step][:size]
+
+
+def pass_rate(p: Predicate, sampled: Sequence[Any]) -> float:
+    if not sampled:
+        return 0.5
+    # Laplace smoothing keeps predicates that pass nothing (or everything) in the sample from looking free.
+    return (sum(1 for n in sampled if p.test(n)) + 1) / (len(sampled) + 2)
+
+
+def order_conjuncts(preds: Sequence[Predicate], sampled: Sequence[Any]) -> List[Predicate]:
+    """Orders predicates that are to be and-ed together so as to minimize the expected evaluation cost: cheap
+    predicates that reject most items come first."""
+    return sorted(preds, key=lambda p: p.cost / (1 - pass_rate(p, sampled)))
+
+
+def order_disjuncts(preds: Sequence[Predicate], sampled: Sequence[Any]) -> List[Predicate]:
+    """Orders predicates that are to be or-ed together: cheap predicates that accept most items come first."""
+    return sorted(preds, key=lambda p: p.cost / pass_rate(p, sampled))
+
+
+def all_of(preds: Sequence[Predicate]) -> Callable[[Any], bool]:
+    tests = [p.test for p in preds]
+    # Short conjunctions are unrolled, as calling all() on a generator costs more than the tests themselves.
+    if len(tests) == 1:
+        return tests[0]
+    if len(tests) == 2:
+        (a, b) = tests
+        return lambda n: a(n) and b(n)
+    if len(tests) == 3:
+        (a, b, c) = tests
+        return lambda n: a(n) and b(n) and c(n)
+    return lambda n: all(t(n) for t in tests)
+
+
+def any_of(preds: Sequence[Predicate]) -> Callable[[Any], bool]:
+    tests = [p.test for p in preds]
+    if len(tests) == 1:
+        return tests[0]
+    if len(tests) == 2:
+        (a, b) = tests
+        return lambda n: a(n) or b(n)
+    if len(tests) == 3:
+        (a, b, c) = tests
+        return lambda n: a(n) or b(n) or c(n)
+    return lambda n: any(t(n) for t in tests)
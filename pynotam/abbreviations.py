@@ -0,0 +1,185 @@
+"""Abbreviation dictionaries used to decode the free text of NOTAMs, and a registry of them by name.
+
+Rather than compiling every dictionary into a regular expression with one alternative per abbreviation, a
+dictionary is decoded by scanning the text for words (and words joined by '/' or '-', as in 'A/G' or
+'CLIMB-OUT') with a single fixed expression and looking them up in a table. That table is built once per
+dictionary version and cached, and dictionaries serialize to a compact form (to_bytes/from_bytes) that can be
+shipped to other processes and loaded without any compilation."""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from hashlib import blake2b
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from typing_extensions import override
+
+from ._abbr import ICAO_abbr
+
+_FORMAT = 1
+
+# Words, possibly joined by single separators. Abbreviations can start after and end before any separator.
+TOKEN_REGEX = re.compile(r"\w+(?:[/-]\w+)*")
+_separator_regex = re.compile(r"[/-]")
+
+# dictionary version -> (abbreviation -> (rank, expansion), largest number of separators in an abbreviation,
+# (abbreviation, expansion) by rank)
+_Table = Tuple[Dict[str, Tuple[int, str]], int, List[Tuple[str, str]]]
+_tables: Dict[str, _Table] = {}
+_tables_lock = threading.Lock()
+
+
+def split_compound(token: str, lookup: Dict[str, Tuple[int, str]], max_seps: int
+                   ) -> Iterator[Tuple[int, int, Optional[Tuple[int, str]]]]:
+    """Splits a compound token (words joined by separators) into the abbreviations it contains and its other
+    words, as (start, end, (rank, expansion) or None) in order. An abbreviation spans one or more consecutive
+    words; where several start at the same word, the one of lowest rank wins. lookup and max_seps are those of
+    AbbreviationDictionary.table()."""
+    bounds = [0] + [s.end() for s in _separator_regex.finditer(token)]
+    ends = [s.start() for s in _separator_regex.finditer(token)] + [len(token)]
+    i = 0
+    while i < len(bounds):
+        best: Optional[Tuple[int, Tuple[int, str]]] = None
+        for j in range(i, min(len(ends), i + max_seps + 1)):
+            hit = lookup.get(token[bounds[i]:ends[j]])
+            if hit is not None and (best is None or hit[0] < best[1][0]):
+                best = (j, hit)
+        if best is None:
+            yield (bounds[i], ends[i], None)
+            i += 1
+        else:
+            yield (bounds[i], ends[best[0]], best[1])
+            i = best[0] + 1
+
+
+class AbbreviationDictionary(Mapping[str, str]):
+    """An immutable mapping of abbreviations to their un-abbreviated form.
+
+    Where several abbreviations could be decoded at the same position of a text (e.g. 'G/A' and 'G/A/G'), the
+    one listed first wins. Abbreviations must start and end with a letter or digit, and may contain '/' or '-'.
+    The version is a digest of the dictionary's content, so equal dictionaries share their cached tables."""
+
+    def __init__(self, entries: Mapping[str, str], name: str = 'custom'):
+        for key in entries:
+            if not TOKEN_REGEX.fullmatch(key):
+                raise ValueError('Invalid abbreviation: {!r}'.format(key))
+        self.name = name
+        self._entries = dict(entries)
+        digest = blake2b(digest_size=8)
+        for (k, v) in self._entries.items():
+            digest.update('{}\x1f{}\x1e'.format(k, v).encode())
+        self.version = digest.hexdigest()
+
+    @override
+    def __getitem__(self, key: str) -> str:
+        return self._entries[key]
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    @override
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @override
+    def __repr__(self) -> str:
+        return '<AbbreviationDictionary {!r} ({} entries, version {})>'.format(self.name, len(self), self.version)
+
+    def extend(self, entries: Mapping[str, str], name: Optional[str] = None) -> AbbreviationDictionary:
+        """Returns a new dictionary with the given entries added, replacing existing entries for the same
+        abbreviations. New abbreviations are ranked after the existing ones."""
+        merged = dict(self._entries)
+        merged.update(entries)
+        return AbbreviationDictionary(merged, name or self.name)
+
+    def table(self) -> _Table:
+        """The lookup table of the dictionary: (abbreviation -> (rank, expansion), the largest number of separators
+        in an abbreviation, [(abbreviation, expansion)] by rank). Built once per version and shared."""
+        table = _tables.get(self.version)
+        if table is None:
+            ranked = list(self._entries.items())
+            lookup = {k: (rank, v) for (rank, (k, v)) in enumerate(ranked)}
+            max_seps = max((len(_separator_regex.findall(k)) for k in lookup), default=0)
+            with _tables_lock:
+                table = _tables.setdefault(self.version, (lookup, max_seps, ranked))
+        return table
+
+    def entry(self, rank: int) -> Tuple[str, str]:
+        """The (abbreviation, expansion) listed at position 'rank' of the dictionary (as in the abbreviation ids of
+        a pynotam.tokens.TokenStream)."""
+        return self.table()[2][rank]
+
+    def decode(self, txt: str) -> str:
+        """Decodes the abbreviations in 'txt' to their un-abbreviated form."""
+        (lookup, max_seps, _) = self.table()
+        out: List[str] = []
+        last = 0
+        for m in TOKEN_REGEX.finditer(txt):
+            token = m.group()
+            if '/' not in token and '-' not in token:
+                hit = lookup.get(token)
+                if hit is not None:
+                    out.append(txt[last:m.start()])
+                    out.append(hit[1])
+                    last = m.end()
+                continue
+            for (start, end, hit) in split_compound(token, lookup, max_seps):
+                if hit is not None:
+                    out.append(txt[last:m.start() + start])
+                    out.append(hit[1])
+                    last = m.start() + end
+        out.append(txt[last:])
+        return ''.join(out)
+
+    def to_bytes(self) -> bytes:
+        """Serializes the dictionary, e.g. to store it alongside data or to send it to worker processes."""
+        return json.dumps([_FORMAT, self.name, self.version, list(self._entries.items())],
+                          separators=(',', ':')).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> AbbreviationDictionary:
+        """Loads a dictionary serialized with to_bytes. The entries are validated and the version is computed
+        from them again, so that the data cannot claim the cached table of another dictionary."""
+        (fmt, name, version, items) = json.loads(data)
+        if fmt != _FORMAT:
+            raise ValueError('Unsupported abbreviation dictionary format: {}'.format(fmt))
+        d = cls(dict(items), name)
+        if d.version != version:
+            raise ValueError('Abbreviation dictionary data does not match its version {}'.format(version))
+        return d
+
+
+ICAO = AbbreviationDictionary(ICAO_abbr, 'icao')
+
+_registry: Dict[str, AbbreviationDictionary] = {ICAO.name: ICAO}
+
+
+def register(dictionary: AbbreviationDictionary, name: Optional[str] = None) -> None:
+    """Makes a dictionary available by name (default: its own name), replacing any dictionary registered
+    under that name before."""
+    _registry[name or dictionary.name] = dictionary
+
+
+def get(name: str) -> AbbreviationDictionary:
+    """Returns the dictionary registered under 'name'. Raises KeyError if there is none."""
+    try:
+        return _registry[name]
+    except KeyError:
+        raise KeyError('No abbreviation dictionary registered as {!r}'.format(name)) from None
+
+
+def registered() -> List[str]:
+    """Names of all registered dictionaries."""
+    return sorted(_registry)
+
+
+def resolve(abbreviations: Union[None, str, AbbreviationDictionary]) -> AbbreviationDictionary:
+    """Returns the dictionary to use for an 'abbreviations' argument: the ICAO dictionary for None, the
+    registered dictionary of that name for a string, and the dictionary itself otherwise."""
+    if abbreviations is None:
+        return ICAO
+    if isinstance(abbreviations, str):
+        return get(abbreviations)
+    return abbreviations
@@ -0,0 +1,154 @@
+"""Export of parsed NOTAMs into Apache Arrow record batches, and from there into Parquet or Arrow IPC files.
+
+Requires the optional 'pyarrow' dependency (install with the 'arrow' extra)."""
+from __future__ import annotations
+
+from datetime import datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as _ipc
+    import pyarrow.parquet as _pq
+except ImportError as e:  # pragma: no cover
+    raise ImportError("pynotam.arrow requires the optional 'pyarrow' dependency (pip install 'pynotam[arrow]')") from e
+
+if TYPE_CHECKING:
+    from . import Notam
+
+DEFAULT_BATCH_SIZE = 4096
+
+_timestamp = pa.timestamp('s', tz='UTC')
+_item_range = pa.struct([pa.field('start', pa.int32(), nullable=False),
+                         pa.field('end', pa.int32(), nullable=False)])
+_ITEMS = ('a', 'b', 'c', 'd', 'e', 'f', 'g')
+
+SCHEMA = pa.schema([
+    pa.field('notam_id', pa.string()),
+    pa.field('notam_type', pa.string()),
+    pa.field('ref_notam_id', pa.string()),
+    # Q-line
+    pa.field('fir', pa.string()),
+    pa.field('notam_code', pa.string()),
+    pa.field('traffic_type', pa.list_(pa.string())),
+    pa.field('purpose', pa.list_(pa.string())),
+    pa.field('scope', pa.list_(pa.string())),
+    pa.field('fl_lower', pa.int16()),
+    pa.field('fl_upper', pa.int16()),
+    pa.field('area_lat', pa.string()),
+    pa.field('area_long', pa.string()),
+    pa.field('area_radius', pa.int16()),
+    # A) - G)
+    pa.field('location', pa.list_(pa.string())),
+    pa.field('part_number', pa.int16()),
+    pa.field('part_count', pa.int16()),
+    pa.field('valid_from', _timestamp),
+    pa.field('valid_till', _timestamp),
+    pa.field('valid_till_estimated', pa.bool_()),
+    pa.field('valid_till_permanent', pa.bool_()),
+    pa.field('schedule', pa.string()),
+    pa.field('body', pa.string()),
+    pa.field('limit_lower', pa.string()),
+    pa.field('limit_upper', pa.string()),
+    pa.field('source', pa.string()),
+    pa.field('created', _timestamp),
+] + [pa.field('indices_item_{}'.format(i), _item_range) for i in _ITEMS])
+"""Arrow schema of the record batches produced by this module. One row per NOTAM. The indices_item_*
+columns hold [start,end) offsets into the NOTAM's full text, which is appended as a last 'full_text'
+column when requested (see FULL_TEXT_SCHEMA)."""
+
+FULL_TEXT_SCHEMA = SCHEMA.append(pa.field('full_text', pa.string()))
+
+
+def _sorted_or_none(s: Optional[Iterable[str]]) -> Optional[List[str]]:
+    return sorted(s) if s else None
+
+
+def _columns(notams: List["Notam"], include_full_text: bool) -> Dict[str, List[Any]]:
+    cols: Dict[str, List[Any]] = {name: [] for name in (FULL_TEXT_SCHEMA if include_full_text else SCHEMA).names}
+    for n in notams:
+        area = n.area or {}
+        till = n.valid_till
+        cols['notam_id'].append(n.notam_id)
+        cols['notam_type'].append(n.notam_type)
+        cols['ref_notam_id'].append(n.ref_notam_id)
+        cols['fir'].append(n.fir)
+        cols['notam_code'].append(n.notam_code)
+        cols['traffic_type'].append(_sorted_or_none(n.traffic_type))
+        cols['purpose'].append(_sorted_or_none(n.purpose))
+        cols['scope'].append(_sorted_or_none(n.scope))
+        cols['fl_lower'].append(n.fl_lower)
+        cols['fl_upper'].append(n.fl_upper)
+        cols['area_lat'].append(area.get('lat'))
+        cols['area_long'].append(area.get('long'))
+        cols['area_radius'].append(area.get('radius'))
+        cols['location'].append(list(n.location) if n.location else None)
+        cols['part_number'].append(n.part_number)
+        cols['part_count'].append(n.part_count)
+        cols['valid_from'].append(n.valid_from)
+        cols['valid_till'].append(till)
+        cols['valid_till_estimated'].append(getattr(till, 'is_estimated', False) if till is not None else None)
+        cols['valid_till_permanent'].append(till.year == datetime.max.year if till is not None else None)
+        cols['schedule'].append(n.schedule)
+        cols['body'].append(n.body)
+        cols['limit_lower'].append(n.limit_lower)
+        cols['limit_upper'].append(n.limit_upper)
+        cols['source'].append(n.source)
+        cols['created'].append(n.created)
+        for i in _ITEMS:
+            rng = getattr(n, 'indices_item_{}'.format(i))
+            cols['indices_item_{}'.format(i)].append({'start': rng[0], 'end': rng[1]} if rng is not None else None)
+        if include_full_text:
+            cols['full_text'].append(n.full_text)
+    return cols
+
+
+def to_record_batch(notams: Iterable["Notam"], include_full_text: bool = False) -> pa.RecordBatch:
+    """Converts the given NOTAMs into a single record batch conforming to SCHEMA (or FULL_TEXT_SCHEMA)."""
+    schema = FULL_TEXT_SCHEMA if include_full_text else SCHEMA
+    cols = _columns(list(notams), include_full_text)
+    return pa.RecordBatch.from_arrays([pa.array(cols[f.name], type=f.type) for f in schema], schema=schema)
+
+
+def iter_record_batches(notams: Iterable["Notam"], batch_size: int = DEFAULT_BATCH_SIZE,
+                        include_full_text: bool = False) -> Iterator[pa.RecordBatch]:
+    """Lazily converts a (possibly unbounded) stream of NOTAMs into record batches of at most batch_size rows.
+    At most one batch worth of NOTAMs is held in memory at any time."""
+    if batch_size <= 0:
+        raise ValueError('batch_size must be positive')
+    it = iter(notams)
+    while True:
+        chunk = list(islice(it, batch_size))
+        if not chunk:
+            return
+        yield to_record_batch(chunk, include_full_text)
+
+
+def write_parquet(notams: Iterable["Notam"], where: Any, batch_size: int = DEFAULT_BATCH_SIZE,
+                  include_full_text: bool = False, **kwargs: Any) -> int:
+    """Streams the given NOTAMs into a Parquet file at 'where' (a path or writable file object), one row group
+    per batch. Additional keyword arguments are passed on to pyarrow.parquet.ParquetWriter. Returns the
+    number of rows written."""
+    schema = FULL_TEXT_SCHEMA if include_full_text else SCHEMA
+    rows = 0
+    with _pq.ParquetWriter(where, schema, **kwargs) as writer:
+        for batch in iter_record_batches(notams, batch_size, include_full_text):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_ipc(notams: Iterable["Notam"], where: Any, batch_size: int = DEFAULT_BATCH_SIZE,
+              include_full_text: bool = False, stream: bool = False) -> int:
+    """Streams the given NOTAMs into an Arrow IPC file at 'where' (a path or writable file object). If 'stream'
+    is True the IPC streaming format is used instead of the random-access file format. Returns the number of
+    rows written."""
+    schema = FULL_TEXT_SCHEMA if include_full_text else SCHEMA
+    new_writer = _ipc.new_stream if stream else _ipc.new_file
+    rows = 0
+    with new_writer(where, schema) as writer:
+        for batch in iter_record_batches(notams, batch_size, include_full_text):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,134 @@
+"""Bulk parsing of many NOTAMs, optionally spread across several worker processes or threads."""
+from __future__ import annotations
+
+import os as _os
+import re as _re
+import time as _time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import Notam, looks_like_notam
+
+DEFAULT_CHUNK_SIZE = 64
+
+# A NOTAM starts with its series and number/year followed by the NOTAM type, optionally preceded by an opening
+# parenthesis, at the start of a line.
+_notam_start_regex = _re.compile(r"^\(?[A-Z][0-9]{4}/[0-9]{2} NOTAM[NRC]\b", _re.MULTILINE)
+
+
+class ParseResult(NamedTuple):
+    """The outcome of parsing a single NOTAM text as part of a batch."""
+
+    """Name of the input the text came from (e.g. a file name)."""
+    source: str
+    """Position of the text within its source."""
+    position: int
+    """The parsed NOTAM (or whatever the batch's transform returned for it), or None if parsing failed."""
+    value: Any
+    """Description of the parse failure, or None on success."""
+    error: Optional[str]
+    """Time spent parsing (and transforming) the text, in seconds."""
+    elapsed: float
+
+
+def split_notams(text: str) -> List[str]:
+    """Splits a string containing one or more consecutive NOTAMs into the individual NOTAM texts. Anything
+    preceding the first NOTAM is discarded, as is surrounding whitespace. If no NOTAM header can be found the
+    whole (stripped) string is returned as a single item, so that the failure is reported by the parser."""
+    starts = [m.start() for m in _notam_start_regex.finditer(text)]
+    if not starts:
+        stripped = text.strip()
+        return [stripped] if stripped else []
+    ends = starts[1:] + [len(text)]
+    return [text[s:e].strip() for (s, e) in zip(starts, ends)]
+
+
+NOT_A_NOTAM = 'NotANotam: no NOTAM header and Q-line found'
+
+
+def _parse_chunk(chunk: List[Tuple[str, int, str]], transform: Optional[Callable[[Notam], Any]],
+                 max_length: Optional[int], timeout: Optional[float]) -> List[ParseResult]:
+    results = []
+    for (source, index, text) in chunk:
+        start = _time.perf_counter()
+        if looks_like_notam(text) is None:  # don't spend a full parse on texts that are certain to fail
+            results.append(ParseResult(source, index, None, NOT_A_NOTAM, _time.perf_counter() - start))
+            continue
+        try:
+            value: Any = Notam.from_str(text, max_length=max_length, timeout=timeout)
+            if transform is not None:
+                value = transform(value)
+            error = None
+        except Exception as e:
+            value = None
+            error = '{}: {}'.format(type(e).__name__, e)
+        results.append(ParseResult(source, index, value, error, _time.perf_counter() - start))
+    return results
+
+
+def _chunked(it: Iterable[Tuple[str, int, str]], size: int) -> Iterator[List[Tuple[str, int, str]]]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_parse(texts: Iterable[Tuple[str, int, str]], workers: Optional[int] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, strict: bool = False,
+               transform: Optional[Callable[[Notam], Any]] = None, max_length: Optional[int] = None,
+               timeout: Optional[float] = None, use_threads: bool = False) -> Iterator[ParseResult]:
+    """Parses a stream of (source, index, text) triples, yielding a ParseResult for each of them in input order.
+
+    Texts are handed out to a pool of 'workers' processes (default: one per CPU) in chunks of 'chunk_size'.
+    Only a bounded number of chunks is in flight at any time, so arbitrarily long streams can be processed in
+    bounded memory. With workers=1 everything runs in the calling process.
+
+    With use_threads=True, a pool of threads is used instead of processes. This avoids the cost of starting
+    processes and of pickling results back, and scales across cores on free-threaded (no-GIL) Python builds;
+    'transform' then need not be picklable.
+
+    If 'transform' is given it is applied to every parsed Notam inside the worker, and its return value is
+    reported instead of the Notam. It must be picklable (e.g. a module-level function).
+
+    max_length and timeout bound the work spent on each individual text, see Notam.from_str. Texts that do not
+    even start like a NOTAM (see looks_like_notam) are rejected without being parsed, with error NOT_A_NOTAM.
+
+    In strict mode, a ValueError is raised on the first text that fails to parse; otherwise failures are
+    reported through ParseResult.error and processing continues."""
+    if chunk_size <= 0:
+        raise ValueError('chunk_size must be positive')
+    chunks = _chunked(texts, chunk_size)
+
+    if workers == 1:
+        results: Iterator[List[ParseResult]] = (_parse_chunk(c, transform, max_length, timeout) for c in chunks)
+        return _check_strict(results, strict)
+    if workers is None:
+        workers = _os.cpu_count() or 1
+    pool: Executor = ThreadPoolExecutor(workers) if use_threads else ProcessPoolExecutor(workers)
+    return _check_strict(_pooled(pool, workers, chunks, transform, max_length, timeout), strict)
+
+
+def _pooled(executor: Executor, workers: int, chunks: Iterator[List[Tuple[str, int, str]]],
+            transform: Optional[Callable[[Notam], Any]], max_length: Optional[int],
+            timeout: Optional[float]) -> Iterator[List[ParseResult]]:
+    with executor:
+        window = 4 * workers
+        pending: Deque[Future[List[ParseResult]]] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_parse_chunk, chunk, transform, max_length, timeout))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _check_strict(results: Iterator[List[ParseResult]], strict: bool) -> Iterator[ParseResult]:
+    for chunk in results:
+        for r in chunk:
+            if strict and r.error is not None:
+                raise ValueError('Failed to parse NOTAM #{} of {}: {}'.format(r.position, r.source, r.error))
+            yield r
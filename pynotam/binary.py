@@ -0,0 +1,261 @@
+"""A compact, versioned binary format for parsed NOTAMs, for moving them between processes or services.
+
+Each NOTAM is encoded as a fixed-size header, packed with a single struct call, followed by its strings as one
+UTF-8 blob. The header holds, in a fixed order: a bitmap of the fields that are None, the NOTAM type and its
+traffic type, purpose and scope sets as bitflags (see _codes), the integer fields, the datetimes (as microseconds
+since the epoch, in UTC), the indices_item_* and the length of every string. Decoding thus takes one struct call,
+one UTF-8 decode and a few slices per NOTAM, with no per-field parsing or class lookups as in pickle.
+
+Lists of NOTAMs are encoded as a batch: a small batch header followed by the records back to back."""
+from __future__ import annotations
+
+import struct
+from itertools import accumulate
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from ._codes import FLAG_BITS, PURPOSES, SCOPES, TRAFFIC_TYPES, decode_flags
+from .timeutils import EstimatedDateTime
+
+if TYPE_CHECKING:
+    from . import Notam
+
+VERSION = 1
+
+_MAGIC = b'NT'
+_BATCH_MAGIC = b'NTB'
+_PREFIX = struct.Struct('<2sB')  # magic, version
+_BATCH_PREFIX = struct.Struct('<3sBI')  # magic, version, number of NOTAMs
+
+STRING_FIELDS = ('notam_id', 'ref_notam_id', 'fir', 'notam_code', 'area_lat', 'area_long', 'location',
+                 'schedule', 'body', 'limit_lower', 'limit_upper', 'source', 'full_text')
+INT_FIELDS = ('fl_lower', 'fl_upper', 'area_radius', 'part_number', 'part_count')
+DATETIME_FIELDS = ('valid_from', 'valid_till', 'created')
+_ITEMS = ('a', 'b', 'c', 'd', 'e', 'f', 'g')
+
+# nulls, flags, INT_FIELDS, DATETIME_FIELDS, (start, end) of each item, length (in characters) of each string,
+# size of the UTF-8 blob of all strings
+_RECORD = struct.Struct('<II{}i{}q{}I{}II'.format(
+    len(INT_FIELDS), len(DATETIME_FIELDS), 2 * len(_ITEMS), len(STRING_FIELDS)))
+
+# Bits 0-11 of the flags are the traffic type, purpose and scope bits of _codes.FLAG_BITS.
+_CODE_MASK = (1 << 12) - 1
+_TYPE_SHIFT = 12
+_TYPES = (None, 'NEW', 'REPLACE', 'CANCEL')
+_TYPE_CODES = {t: i for (i, t) in enumerate(_TYPES)}
+FLAG_ESTIMATED = 1 << 14
+FLAG_PERMANENT = 1 << 15
+# Set if schedule, body, limit_lower and limit_upper are the text of items D) to G) in full_text, as they are for
+# parsed NOTAMs; they are then not stored again.
+FLAG_ITEMS_FROM_TEXT = 1 << 16
+
+_TRAFFIC_BITS = {m: FLAG_BITS[('traffic_type', m)] for m in TRAFFIC_TYPES.values()}
+_PURPOSE_BITS = {m: FLAG_BITS[('purpose', m)] for m in PURPOSES.values()}
+_SCOPE_BITS = {m: FLAG_BITS[('scope', m)] for m in SCOPES.values()}
+
+# Bit i of 'nulls' is set if the i'th of these is None.
+_NULLABLE = STRING_FIELDS + INT_FIELDS + DATETIME_FIELDS + tuple('indices_item_{}'.format(i) for i in _ITEMS)
+_NULL_BIT = {f: 1 << i for (i, f) in enumerate(_NULLABLE)}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+_PERM = datetime.max.replace(tzinfo=timezone.utc)
+
+# flags & _CODE_MASK -> decoded (traffic_type, purpose, scope); copied for every NOTAM, as the sets are mutable.
+_code_sets: Dict[int, Tuple[Set[str], Set[str], Set[str]]] = {}
+
+
+def _microseconds(dt: Optional[datetime]) -> int:
+    if dt is None:
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _US
+
+
+def _item_text(text: Optional[str], rng: Optional[Tuple[int, int]], value: Optional[str]) -> bool:
+    return value is None if rng is None else (text is not None and text[rng[0]:rng[1]] == value)
+
+
+def _encode(n: "Notam", out: List[bytes]) -> None:
+    area = n.area or {}
+    text = n.full_text
+    (a, b, c, d, e, f, g) = (n.indices_item_a, n.indices_item_b, n.indices_item_c, n.indices_item_d,
+                             n.indices_item_e, n.indices_item_f, n.indices_item_g)
+    (schedule, body, limit_lower, limit_upper) = (n.schedule, n.body, n.limit_lower, n.limit_upper)
+
+    flags = _TYPE_CODES[n.notam_type] << _TYPE_SHIFT
+    for traffic_type in n.traffic_type:
+        flags |= _TRAFFIC_BITS[traffic_type]
+    for purpose in n.purpose:
+        flags |= _PURPOSE_BITS[purpose]
+    for scope in n.scope:
+        flags |= _SCOPE_BITS[scope]
+    till = n.valid_till
+    if till is not None:
+        if getattr(till, 'is_estimated', False):
+            flags |= FLAG_ESTIMATED
+        if till.year == datetime.max.year:
+            flags |= FLAG_PERMANENT
+            till = None
+    if (_item_text(text, d, schedule) and _item_text(text, e, body) and _item_text(text, f, limit_lower)
+            and _item_text(text, g, limit_upper)):
+        flags |= FLAG_ITEMS_FROM_TEXT
+        schedule = body = limit_lower = limit_upper = None
+
+    (lat, long) = (area.get('lat'), area.get('long'))
+    strings: Tuple[Optional[str], ...] = (
+        n.notam_id, n.ref_notam_id, n.fir, n.notam_code,
+        str(lat) if lat is not None else None, str(long) if long is not None else None,
+        ' '.join(n.location) if n.location else None, schedule, body, limit_lower, limit_upper, n.source, text)
+    values = (n.fl_lower, n.fl_upper, area.get('radius'), n.part_number, n.part_count,
+              n.valid_from, till, n.created, a, b, c, d, e, f, g)
+    nulls = 0
+    bit = 1
+    for field in (*strings, *values):  # in the order of _NULLABLE
+        if field is None:
+            nulls |= bit
+        bit <<= 1
+    blob = ''.join([s for s in strings if s is not None]).encode()
+    out.append(_RECORD.pack(
+        nulls, flags, *[int(v) if v is not None else 0 for v in values[:5]],
+        _microseconds(n.valid_from), _microseconds(till), _microseconds(n.created),
+        *(a or _NO_RANGE), *(b or _NO_RANGE), *(c or _NO_RANGE), *(d or _NO_RANGE), *(e or _NO_RANGE),
+        *(f or _NO_RANGE), *(g or _NO_RANGE),
+        *[len(s) if s is not None else 0 for s in strings], len(blob)))
+    out.append(blob)
+
+
+_NO_RANGE = (0, 0)
+_STRINGS_NULL_MASK = (1 << len(STRING_FIELDS)) - 1
+_DATETIME_NULL_SHIFT = len(STRING_FIELDS) + len(INT_FIELDS)
+_ITEMS_NULL_SHIFT = _DATETIME_NULL_SHIFT + len(DATETIME_FIELDS)
+_LENGTHS = slice(-1 - len(STRING_FIELDS), -1)
+# What _decode raises for corrupt data: bad UTF-8 is a ValueError, out of range datetimes an OverflowError.
+_CORRUPT = (struct.error, ValueError, OverflowError, IndexError)
+
+
+def _decode(cls: Type["Notam"], data: bytes, pos: int) -> Tuple["Notam", int]:
+    fields = _RECORD.unpack_from(data, pos)
+    pos += _RECORD.size
+    size = fields[-1]
+    raw = data[pos:pos + size]
+    if len(raw) != size:
+        raise ValueError('truncated')
+    blob = raw.decode()
+    pos += size
+
+    nulls, flags = fields[0], fields[1]
+    offsets = list(accumulate(fields[_LENGTHS], initial=0))
+    strings: List[Optional[str]] = list(map(blob.__getitem__, map(slice, offsets, offsets[1:])))
+    null_strings = nulls & _STRINGS_NULL_MASK
+    while null_strings:
+        bit = null_strings & -null_strings
+        strings[bit.bit_length() - 1] = None
+        null_strings ^= bit
+    (notam_id, ref_notam_id, fir, notam_code, lat, long, location, schedule, body, limit_lower, limit_upper,
+     source, text) = strings
+
+    (fl_lower, fl_upper, radius, part_number, part_count, valid_from, valid_till, created,
+     a0, a1, b0, b1, c0, c1, d0, d1, e0, e1, f0, f1, g0, g1) = fields[2:24]
+    if nulls >> len(STRING_FIELDS) & 31:
+        (fl_lower, fl_upper, radius, part_number, part_count) = [
+            None if nulls & _NULL_BIT[f] else v
+            for (f, v) in zip(INT_FIELDS, (fl_lower, fl_upper, radius, part_number, part_count))]
+    times = nulls >> _DATETIME_NULL_SHIFT
+    valid_from = None if times & 1 else _EPOCH + valid_from * _US
+    valid_till = None if times & 2 else _EPOCH + valid_till * _US
+    created = None if times & 4 else _EPOCH + created * _US
+    if flags & FLAG_PERMANENT:
+        valid_till = _PERM
+    if flags & FLAG_ESTIMATED and valid_till is not None:
+        valid_till = EstimatedDateTime(valid_till)
+    items = nulls >> _ITEMS_NULL_SHIFT
+    (a, b, c, d, e, f, g) = (None if items & 1 else (a0, a1), None if items & 2 else (b0, b1),
+                             None if items & 4 else (c0, c1), None if items & 8 else (d0, d1),
+                             None if items & 16 else (e0, e1), None if items & 32 else (f0, f1),
+                             None if items & 64 else (g0, g1))
+    if flags & FLAG_ITEMS_FROM_TEXT and text is not None:
+        schedule = text[d0:d1] if d is not None else None
+        body = text[e0:e1] if e is not None else None
+        limit_lower = text[f0:f1] if f is not None else None
+        limit_upper = text[g0:g1] if g is not None else None
+
+    codes = _code_sets.get(flags & _CODE_MASK)
+    if codes is None:
+        codes = _code_sets.setdefault(flags & _CODE_MASK, decode_flags(flags & _CODE_MASK))
+
+    n = cls.__new__(cls)
+    n.__dict__ = {
+        'full_text': text, 'notam_id': notam_id, 'notam_type': _TYPES[flags >> _TYPE_SHIFT & 3],
+        'ref_notam_id': ref_notam_id, 'fir': fir, 'notam_code': notam_code,
+        'traffic_type': set(codes[0]), 'purpose': set(codes[1]), 'scope': set(codes[2]),
+        'fl_lower': fl_lower, 'fl_upper': fl_upper,
+        'area': {'lat': lat or '', 'long': long or '', 'radius': radius} if radius is not None else {},
+        'location': location.split(' ') if location is not None else [],
+        'part_number': part_number, 'part_count': part_count,
+        'valid_from': valid_from, 'valid_till': valid_till, 'schedule': schedule, 'body': body,
+        'limit_lower': limit_lower, 'limit_upper': limit_upper, 'source': source, 'created': created,
+        'indices_item_a': a, 'indices_item_b': b, 'indices_item_c': c, 'indices_item_d': d,
+        'indices_item_e': e, 'indices_item_f': f, 'indices_item_g': g,
+    }
+    return n, pos
+
+
+def _check_prefix(prefix: struct.Struct, magic: bytes, data: bytes) -> Tuple[int, ...]:
+    if len(data) < prefix.size:
+        raise ValueError('truncated NOTAM data')
+    header = prefix.unpack_from(data)
+    if header[0] != magic:
+        raise ValueError('not {} NOTAM data'.format('a batch of' if magic == _BATCH_MAGIC else 'binary'))
+    if header[1] != VERSION:
+        raise ValueError('unsupported NOTAM data version {} (expected {})'.format(header[1], VERSION))
+    return header
+
+
+def encode(notam: "Notam") -> bytes:
+    """Encodes a single NOTAM."""
+    out = [_PREFIX.pack(_MAGIC, VERSION)]
+    _encode(notam, out)
+    return b''.join(out)
+
+
+def decode(data: bytes) -> "Notam":
+    """Decodes a NOTAM encoded with encode(). Raises ValueError for data not in this format."""
+    from . import Notam
+    _ = _check_prefix(_PREFIX, _MAGIC, data)
+    try:
+        (n, end) = _decode(Notam, data, _PREFIX.size)
+    except _CORRUPT as e:
+        raise ValueError('corrupt NOTAM data: {}'.format(e)) from None
+    if end != len(data):
+        raise ValueError('corrupt NOTAM data: {} trailing bytes'.format(len(data) - end))
+    return n
+
+
+def encode_many(notams: Iterable["Notam"]) -> bytes:
+    """Encodes a list of NOTAMs into a single batch."""
+    out = [b'']
+    count = 0
+    for n in notams:
+        _encode(n, out)
+        count += 1
+    out[0] = _BATCH_PREFIX.pack(_BATCH_MAGIC, VERSION, count)
+    return b''.join(out)
+
+
+def decode_many(data: bytes) -> List["Notam"]:
+    """Decodes a batch encoded with encode_many(). Raises ValueError for data not in this format."""
+    from . import Notam
+    (_, _, count) = _check_prefix(_BATCH_PREFIX, _BATCH_MAGIC, data)
+    pos = _BATCH_PREFIX.size
+    result = []
+    try:
+        for _ in range(count):
+            (n, pos) = _decode(Notam, data, pos)
+            result.append(n)
+    except _CORRUPT as e:
+        raise ValueError('corrupt NOTAM data: {}'.format(e)) from None
+    if pos != len(data):
+        raise ValueError('corrupt NOTAM data: {} trailing bytes'.format(len(data) - pos))
+    return result
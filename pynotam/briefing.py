@@ -0,0 +1,100 @@
+"""Selection of the NOTAMs relevant to a flight ("pre-flight briefing")."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import _query
+from .geo import Position, area_center, distance_to_path_nm
+
+if TYPE_CHECKING:
+    from . import Notam
+
+
+class Route(NamedTuple):
+    """A flight's route, as far as NOTAM relevance is concerned."""
+
+    """ICAO location indicators of the departure and destination aerodromes."""
+    departure: str
+    destination: str
+    """ICAO location indicators of the FIRs crossed."""
+    firs: Sequence[str] = ()
+    """The route's waypoints, from departure to destination, as (lat, long) in decimal degrees."""
+    waypoints: Sequence[Position] = ()
+    """Half-width of the corridor around the route in which NOTAM areas are relevant, in nautical miles."""
+    corridor_nm: float = 25.0
+    """ICAO location indicators of alternate aerodromes."""
+    alternates: Sequence[str] = ()
+
+
+class BriefingPlan(object):
+    """An ordered plan for evaluating a briefing query over a NOTAM collection; see brief_plan()."""
+
+    def __init__(self, conjuncts: List[_query.Predicate], disjuncts: List[_query.Predicate]):
+        self.conjuncts = conjuncts
+        self.disjuncts = disjuncts
+        self._test = _query.all_of(conjuncts)
+
+    @property
+    def steps(self) -> List[str]:
+        """Names of the filters in the order in which they are applied."""
+        return [p.name for p in self.conjuncts]
+
+    def run(self, notams: Iterable["Notam"]) -> List["Notam"]:
+        test = self._test
+        return [n for n in notams if test(n)]
+
+
+def brief_plan(notams: Sequence["Notam"], route: Route,
+               window: Optional[Tuple[datetime, datetime]] = None,
+               fl_band: Optional[Tuple[int, int]] = None) -> BriefingPlan:
+    """Builds the plan used by brief(), ordering its filters by their estimated selectivity over 'notams'.
+
+    Useful to inspect the chosen filter order, or to run the same query over several collections of similar
+    composition."""
+    aerodromes = frozenset((route.departure, route.destination) + tuple(route.alternates))
+    firs = frozenset(route.firs)
+    path = list(route.waypoints)
+
+    spatial = [_query.Predicate('location', lambda n: not aerodromes.isdisjoint(n.location)),
+               _query.Predicate('fir', lambda n: n.fir in firs or not firs.isdisjoint(n.location))]
+    if path:
+        def in_corridor(n: "Notam") -> bool:
+            center = area_center(n)
+            if center is None:
+                return False
+            return distance_to_path_nm(center, path) <= route.corridor_nm + int(n.area['radius'])
+        spatial.append(_query.Predicate('corridor', in_corridor, cost=10.0 * len(path)))
+
+    sampled = _query.sample(notams)
+    disjuncts = _query.order_disjuncts(spatial, sampled)
+    conjuncts = [_query.Predicate('space', _query.any_of(disjuncts), cost=sum(p.cost for p in disjuncts))]
+
+    if window is not None:
+        start, end = window
+
+        def in_window(n: "Notam") -> bool:
+            return (n.valid_from is None or n.valid_from <= end) and (n.valid_till is None or n.valid_till >= start)
+        conjuncts.append(_query.Predicate('time', in_window))
+
+    if fl_band is not None:
+        lower, upper = fl_band
+
+        def in_band(n: "Notam") -> bool:
+            return (n.fl_lower is None or n.fl_lower <= upper) and (n.fl_upper is None or n.fl_upper >= lower)
+        conjuncts.append(_query.Predicate('altitude', in_band))
+
+    return BriefingPlan(_query.order_conjuncts(conjuncts, sampled), disjuncts)
+
+
+def brief(notams: Sequence["Notam"], route: Route,
+          window: Optional[Tuple[datetime, datetime]] = None,
+          fl_band: Optional[Tuple[int, int]] = None) -> List["Notam"]:
+    """Returns the NOTAMs relevant to a flight along 'route', in their original order.
+
+    A NOTAM is relevant if it concerns one of the route's aerodromes (A) location), one of the FIRs crossed
+    (Q-line FIR or A) location), or an area reaching into the route corridor (Q-line area); and, if given, its
+    validity period overlaps the time 'window' (start, end) and its vertical limits overlap 'fl_band'
+    (lower, upper flight levels). The query runs as a single pass over 'notams', applying the filters in the
+    order estimated to be cheapest from a sample of the collection (see brief_plan)."""
+    return brief_plan(notams, route, window, fl_band).run(notams)
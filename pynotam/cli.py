@@ -0,0 +1,272 @@
+"""The 'pynotam' command-line tool."""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import importlib
+import io
+import json
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from . import Notam
+from .batch import DEFAULT_CHUNK_SIZE, iter_parse, split_notams
+from .render import render
+from .replay import ReplaySample, replay, synthesize
+from .timeutils import EstimatedDateTime
+
+_FIELDS = ('notam_id', 'notam_type', 'ref_notam_id', 'fir', 'notam_code', 'traffic_type', 'purpose', 'scope',
+           'fl_lower', 'fl_upper', 'area', 'location', 'part_number', 'part_count', 'valid_from', 'valid_till',
+           'schedule', 'body', 'limit_lower', 'limit_upper', 'source', 'created')
+
+
+def _jsonable(v: Any) -> Any:
+    if isinstance(v, (set, frozenset)):
+        return sorted(v)
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v
+
+
+def _as_dict(n: Notam) -> Dict[str, Any]:
+    d = {f: _jsonable(getattr(n, f)) for f in _FIELDS}
+    d['valid_till_estimated'] = getattr(n.valid_till, 'is_estimated', False)
+    return d
+
+
+def _from_dict(d: Dict[str, Any]) -> Notam:
+    """The inverse of _as_dict, e.g. for NDJSON records written by 'pynotam parse' or by a producer."""
+    n = Notam()
+    for f in _FIELDS:
+        v = d.get(f)
+        if v is None:
+            continue
+        if f in ('traffic_type', 'purpose', 'scope'):
+            v = set(v)
+        elif f in ('valid_from', 'valid_till', 'created'):
+            v = datetime.fromisoformat(v)
+        setattr(n, f, v)
+    if d.get('valid_till_estimated') and n.valid_till is not None:
+        n.valid_till = EstimatedDateTime(n.valid_till)
+    return n
+
+
+def format_ndjson(n: Notam) -> str:
+    return json.dumps(_as_dict(n), ensure_ascii=False) + '\n'
+
+
+def format_csv(n: Notam) -> str:
+    d = _as_dict(n)
+    area = d.pop('area') or {}
+    d.update({'area_{}'.format(k): area.get(k) for k in ('lat', 'long', 'radius')})
+    row = [' '.join(v) if isinstance(v, list) else v for v in d.values()]
+    with io.StringIO() as sb:
+        csv.writer(sb).writerow(row)
+        return sb.getvalue()
+
+
+def _csv_header() -> str:
+    cols = [f for f in _FIELDS if f != 'area'] + ['valid_till_estimated', 'area_lat', 'area_long', 'area_radius']
+    with io.StringIO() as sb:
+        csv.writer(sb).writerow(cols)
+        return sb.getvalue()
+
+
+def format_decoded(n: Notam) -> str:
+    return n.decoded() + '\n\n'
+
+
+_FORMATTERS: Dict[str, Callable[[Notam], str]] = {
+    'ndjson': format_ndjson,
+    'csv': format_csv,
+    'decoded': format_decoded,
+}
+
+
+def _iter_inputs(paths: Sequence[str], stdin: TextIO) -> Iterator[Tuple[str, int, str]]:
+    """Yields (source, index, text) for every NOTAM found in the given files and directories ('-' is stdin)."""
+    for p in paths or ['-']:
+        if p == '-':
+            sources: List[Tuple[str, Callable[[], str]]] = [('<stdin>', stdin.read)]
+        else:
+            path = Path(p)
+            files = sorted(f for f in path.rglob('*') if f.is_file()) if path.is_dir() else [path]
+            sources = [(str(f), f.read_text) for f in files]
+        for (name, read) in sources:
+            for (i, text) in enumerate(split_notams(read())):
+                yield (name, i, text)
+
+
+def _cmd_parse(args: argparse.Namespace, stdout: TextIO, stderr: TextIO) -> int:
+    out: TextIO = open(args.output, 'w') if args.output else stdout
+    ok = errors = 0
+    per_file: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+    start = time.perf_counter()
+    try:
+        if args.format == 'csv':
+            _ = out.write(_csv_header())
+        results = iter_parse(_iter_inputs(args.paths, sys.stdin), workers=args.workers,
+                             chunk_size=args.chunk_size, transform=_FORMATTERS[args.format],
+                             max_length=args.max_length, timeout=args.timeout, use_threads=args.threads)
+        for r in results:
+            stats = per_file[r.source]
+            stats[0] += 1
+            stats[1] += r.elapsed
+            if r.error is not None:
+                errors += 1
+                _ = stderr.write('{}#{}: {}\n'.format(r.source, r.position, r.error))
+                if args.strict:
+                    break
+            else:
+                ok += 1
+                _ = out.write(r.value)
+    finally:
+        if out is not stdout:
+            out.close()
+    wall = time.perf_counter() - start
+
+    if args.timings:
+        for (source, (count, elapsed)) in per_file.items():
+            _ = stderr.write('{}: {} NOTAMs, {:.3f} ms parse time\n'.format(source, int(count), elapsed * 1000))
+    if not args.quiet:
+        _ = stderr.write('Parsed {} NOTAMs ({} errors) in {:.3f} s: {:.0f} NOTAMs/s\n'.format(
+            ok, errors, wall, (ok + errors) / wall if wall > 0 else 0))
+    return 1 if (args.strict and errors) else 0
+
+
+def _iter_records(paths: Sequence[str], stdin: TextIO) -> Iterator[Tuple[str, int, str]]:
+    """Yields (source, line number, line) for every non-empty line of the given files ('-' is stdin)."""
+    for p in paths or ['-']:
+        with (contextlib.nullcontext(stdin) if p == '-' else open(p)) as f:
+            for (i, line) in enumerate(f, start=1):
+                if line.strip():
+                    yield ('<stdin>' if p == '-' else p, i, line)
+
+
+def _cmd_render(args: argparse.Namespace, stdout: TextIO, stderr: TextIO) -> int:
+    out: TextIO = open(args.output, 'w') if args.output else stdout
+    ok = errors = 0
+    start = time.perf_counter()
+    try:
+        for (source, line_no, line) in _iter_records(args.paths, sys.stdin):
+            try:
+                text = render(_from_dict(json.loads(line)), validate=args.validate)
+            except (ValueError, TypeError, KeyError) as e:
+                errors += 1
+                _ = stderr.write('{}:{}: {}\n'.format(source, line_no, e))
+                if args.strict:
+                    break
+                continue
+            _ = out.write(text + '\n\n')
+            ok += 1
+    finally:
+        if out is not stdout:
+            out.close()
+    wall = time.perf_counter() - start
+    if not args.quiet:
+        _ = stderr.write('Rendered {} NOTAMs ({} errors) in {:.3f} s: {:.0f} NOTAMs/s\n'.format(
+            ok, errors, wall, (ok + errors) / wall if wall > 0 else 0))
+    return 1 if (args.strict and errors) else 0
+
+
+def _load_pipeline(spec: str) -> Callable[[str], Any]:
+    """Resolves a 'module:function' specification to the function."""
+    (module, _, name) = spec.partition(':')
+    if not name:
+        raise SystemExit("pynotam: --pipeline must be given as 'module:function'")
+    return getattr(importlib.import_module(module), name)
+
+
+_SAMPLE_FORMAT = ('{:8.1f} s {:>9} msgs {:>6} errors {:>9.0f} msgs/s  p50 {:8.3f} p95 {:8.3f} p99 {:8.3f} ms  '
+                  + '{:7.1f} MiB\n')
+_REPLAY_FORMAT = ('Replayed {} messages ({} errors) in {:.3f} s: {:.0f} msgs/s; latency p50 {:.3f} ms, '
+                  + 'p95 {:.3f} ms, p99 {:.3f} ms, max {:.3f} ms\n')
+
+
+def _cmd_replay(args: argparse.Namespace, stdout: TextIO, stderr: TextIO) -> int:
+    sink = _load_pipeline(args.pipeline) if args.pipeline else Notam.from_str
+    items: Iterable[Any]
+    if args.synthesize:
+        paths = args.paths or [str(Path(__file__).parent / 'tests' / 'test_data')]
+        corpus = [text for (_, _, text) in _iter_inputs(paths, sys.stdin)]
+        items = islice(synthesize(corpus, seed=args.seed), args.synthesize)
+    else:
+        items = (text for (_, _, text) in _iter_inputs(args.paths, sys.stdin))
+
+    def report(s: ReplaySample) -> None:
+        _ = stdout.write(_SAMPLE_FORMAT.format(s.elapsed, s.processed, s.errors, s.throughput, s.p50 * 1000,
+                                               s.p95 * 1000, s.p99 * 1000, s.memory / 2 ** 20))
+
+    r = replay(items, sink, rate=args.rate, speedup=args.speedup, limit=args.limit, interval=args.interval,
+               on_sample=None if args.quiet else report)
+    _ = stderr.write(_REPLAY_FORMAT.format(r.processed, r.errors, r.elapsed, r.throughput, r.p50 * 1000,
+                                           r.p95 * 1000, r.p99 * 1000, r.max * 1000))
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='pynotam', description='Bulk NOTAM processing.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('parse', help='Parse NOTAMs from files, directories or stdin.')
+    _ = p.add_argument('paths', nargs='*', help="Files or directories to read ('-' or none for stdin). A file may "
+                                                + "contain several NOTAMs.")
+    _ = p.add_argument('-f', '--format', choices=sorted(_FORMATTERS), default='ndjson', help='Output format.')
+    _ = p.add_argument('-o', '--output', help='Write output to this file instead of stdout.')
+    _ = p.add_argument('-j', '--workers', type=int, default=None,
+                       help='Number of worker processes (default: number of CPUs; 1 parses in-process).')
+    _ = p.add_argument('--threads', action='store_true',
+                       help='Use worker threads instead of processes (scales on free-threaded Python builds).')
+    _ = p.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                       help='Number of NOTAMs handed to a worker at a time.')
+    _ = p.add_argument('--strict', action='store_true',
+                       help='Stop at the first NOTAM that fails to parse and exit with a non-zero status.')
+    _ = p.add_argument('--max-length', type=int, default=None,
+                       help='Reject NOTAMs longer than this many characters without parsing them.')
+    _ = p.add_argument('--timeout', type=float, default=None,
+                       help='Give up on NOTAMs that take longer than this many seconds to parse.')
+    _ = p.add_argument('--timings', action='store_true', help='Report per-file NOTAM counts and parse times.')
+    _ = p.add_argument('-q', '--quiet', action='store_true', help='Do not report throughput.')
+    p.set_defaults(func=_cmd_parse)
+
+    p = commands.add_parser('replay', help='Replay NOTAMs into a pipeline and report latency and throughput.')
+    _ = p.add_argument('paths', nargs='*', help="Files or directories to read ('-' or none for stdin). With "
+                                                + "--synthesize, the corpus to derive messages from (default: the "
+                                                + "bundled test corpus).")
+    _ = p.add_argument('--synthesize', type=int, metavar='N', default=0,
+                       help='Replay N synthetic messages derived from the inputs, instead of the inputs themselves.')
+    _ = p.add_argument('--seed', type=int, default=None, help='Random seed for --synthesize.')
+    _ = p.add_argument('--rate', type=float, default=None,
+                       help='Messages per second (default: as fast as possible).')
+    _ = p.add_argument('--speedup', type=float, default=None,
+                       help='With --synthesize, replay at the pace of the synthetic timestamps, this many times '
+                       + 'faster.')
+    _ = p.add_argument('--limit', type=int, default=None, help='Stop after this many messages.')
+    _ = p.add_argument('--interval', type=float, default=1.0, help='Seconds between progress reports.')
+    _ = p.add_argument('--pipeline', metavar='MODULE:FUNCTION',
+                       help='Function to feed each NOTAM text to (default: pynotam.Notam.from_str).')
+    _ = p.add_argument('-q', '--quiet', action='store_true', help='Only report the summary.')
+    p.set_defaults(func=_cmd_replay)
+
+    p = commands.add_parser('render', help='Render NOTAM text from NDJSON records (as written by parse).')
+    _ = p.add_argument('paths', nargs='*', help="NDJSON files to read ('-' or none for stdin).")
+    _ = p.add_argument('-o', '--output', help='Write output to this file instead of stdout.')
+    _ = p.add_argument('--validate', action='store_true',
+                       help='Check that every rendered text parses back to the same NOTAM.')
+    _ = p.add_argument('--strict', action='store_true',
+                       help='Stop at the first record that cannot be rendered and exit with a non-zero status.')
+    _ = p.add_argument('-q', '--quiet', action='store_true', help='Do not report throughput.')
+    p.set_defaults(func=_cmd_render)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None, stdout: Optional[TextIO] = None,
+         stderr: Optional[TextIO] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    return args.func(args, stdout or sys.stdout, stderr or sys.stderr)
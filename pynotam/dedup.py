@@ -0,0 +1,93 @@
+"""Streaming removal of duplicate NOTAMs, e.g. when the same NOTAMs are received from several providers.
+
+Duplicates are recognized by Notam.fingerprint(), so differences in whitespace, line wrapping, or the presence of
+CREATED/SOURCE trailers do not prevent a match."""
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    from . import Notam
+
+
+class BloomFilter(object):
+    """A fixed-size Bloom filter over 16-byte NOTAM fingerprints. Membership tests may yield false positives
+    (at roughly the configured error rate once 'capacity' items were added), but never false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError('capacity must be positive and error_rate within (0, 1)')
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, fp: bytes) -> Iterator[int]:
+        # Kirsch-Mitzenmacher double hashing, using the two halves of the (already uniformly distributed)
+        # fingerprint as the base hashes.
+        h1 = int.from_bytes(fp[:8], 'little')
+        h2 = int.from_bytes(fp[8:16], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, fp: bytes) -> bool:
+        """Adds a fingerprint to the filter. Returns True if it was (probably) present already."""
+        present = True
+        for pos in self._positions(fp):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        return present
+
+    def __contains__(self, fp: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fp))
+
+
+class Deduplicator(object):
+    """Remembers the fingerprints of the NOTAMs it has seen, in order to drop subsequent duplicates.
+
+    By default, fingerprints are kept in an exact set. If max_size is given, only the most recently first-seen
+    max_size fingerprints are remembered (older ones are evicted first), which bounds memory use for unbounded
+    streams at the cost of not recognizing duplicates that arrive long after the original. Alternatively, a
+    BloomFilter may be supplied, which uses constant memory but may drop a small fraction of unique NOTAMs.
+    All operations are O(1)."""
+
+    def __init__(self, max_size: Optional[int] = None, bloom: Optional[BloomFilter] = None):
+        if max_size is not None and bloom is not None:
+            raise ValueError('max_size and bloom are mutually exclusive')
+        if max_size is not None and max_size <= 0:
+            raise ValueError('max_size must be positive')
+        self.max_size = max_size
+        self.bloom = bloom
+        self._seen: OrderedDict[bytes, None] = OrderedDict()
+        self.duplicates = 0
+
+    def seen(self, notam: "Notam") -> bool:
+        """Records the NOTAM, returning True if it is a duplicate of one recorded before."""
+        fp = notam.fingerprint()
+        if self.bloom is not None:
+            dup = self.bloom.add(fp)
+        elif fp in self._seen:
+            dup = True
+        else:
+            dup = False
+            self._seen[fp] = None
+            if self.max_size is not None and len(self._seen) > self.max_size:
+                _ = self._seen.popitem(last=False)
+        if dup:
+            self.duplicates += 1
+        return dup
+
+    def filter(self, notams: Iterable["Notam"]) -> Iterator["Notam"]:
+        """Lazily yields the NOTAMs in the given stream that were not seen before."""
+        for n in notams:
+            if not self.seen(n):
+                yield n
+
+    def __len__(self) -> int:
+        """Number of fingerprints currently remembered (not available when backed by a Bloom filter)."""
+        if self.bloom is not None:
+            raise TypeError('the number of items in a Bloom filter-backed Deduplicator is unknown')
+        return len(self._seen)
@@ -0,0 +1,155 @@
+"""Eviction of NOTAMs from in-memory containers once their validity has ended.
+
+The ExpiryScheduler keeps the expiry times of the NOTAMs it is told about in a min-heap, so that finding the
+NOTAMs that have expired by a given time costs O(log n) per expired NOTAM, rather than a sweep over all of them.
+Expired NOTAMs are discarded from every registered container (anything with a discard(notam_id) method, such as
+a LocationIndex, NotamStore or NotamStats)."""
+from __future__ import annotations
+
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Protocol, Tuple
+
+if TYPE_CHECKING:
+    from . import Notam
+
+
+class Discardable(Protocol):
+    def discard(self, notam_id: str) -> object: ...
+
+
+class ExpiryEvent(NamedTuple):
+    """Notification that a NOTAM has expired and was evicted."""
+
+    notam_id: str
+    """The time at which the NOTAM expired: its end of validity, plus the grace period if that was estimated."""
+    expired_at: datetime
+    """Whether the end of validity was estimated (C) ... EST)."""
+    estimated: bool
+
+
+class SimulatedClock(object):
+    """A clock for tests and replays, which only moves when told to."""
+
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, delta: timedelta) -> datetime:
+        self.now += delta
+        return self.now
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ExpiryScheduler(object):
+    """Tracks when NOTAMs expire, and evicts them from the registered containers once they have.
+
+    A NOTAM expires at its valid_till. An estimated end of validity (an EstimatedDateTime) is extended by 'grace',
+    since such NOTAMs are normally replaced or cancelled around that time rather than simply ending. NOTAMs that
+    are permanent (PERM) or have no end of validity never expire.
+
+    Time is read from 'clock' (by default the current UTC time); pass a SimulatedClock to control it. Each
+    eviction is reported to on_expire, if given, as an ExpiryEvent."""
+
+    def __init__(self, grace: Optional[timedelta] = None, clock: Callable[[], datetime] = _utcnow,
+                 on_expire: Optional[Callable[[ExpiryEvent], None]] = None):
+        self.grace = grace if grace is not None else timedelta(0)
+        self.clock = clock
+        self.on_expire = on_expire
+        self._containers: List[Discardable] = []
+        # (expiry time, notam_id, estimated); entries whose time no longer matches _due are stale and skipped.
+        self._heap: List[Tuple[datetime, str, bool]] = []
+        self._due: Dict[str, datetime] = {}
+
+    def __len__(self) -> int:
+        """Number of NOTAMs scheduled to expire."""
+        return len(self._due)
+
+    def __contains__(self, notam_id: object) -> bool:
+        return notam_id in self._due
+
+    def register(self, container: Discardable) -> None:
+        """Has expired NOTAMs discarded from the container from now on."""
+        self._containers.append(container)
+
+    def expires_at(self, notam: "Notam") -> Optional[datetime]:
+        """The time at which the NOTAM expires, or None if it never does."""
+        till = notam.valid_till
+        if till is None or till.year == datetime.max.year:
+            return None
+        if getattr(till, 'is_estimated', False):
+            return till + self.grace
+        return till
+
+    def schedule(self, notam: "Notam") -> None:
+        """Schedules the expiry of the NOTAM, replacing any earlier schedule for the same notam_id."""
+        if notam.notam_id is None:
+            raise ValueError('cannot schedule a NOTAM without a notam_id')
+        at = self.expires_at(notam)
+        if at is None:
+            _ = self.unschedule(notam.notam_id)
+            return
+        self._due[notam.notam_id] = at
+        heapq.heappush(self._heap, (at, notam.notam_id, getattr(notam.valid_till, 'is_estimated', False)))
+        self._maybe_compact()
+
+    def unschedule(self, notam_id: str) -> bool:
+        """Stops tracking the NOTAM, e.g. because it has been removed by other means. Returns whether it was
+        scheduled."""
+        if self._due.pop(notam_id, None) is None:
+            return False
+        self._maybe_compact()
+        return True
+
+    def apply(self, notam: "Notam") -> None:
+        """Updates the schedule with a newly received NOTAM: a NOTAMR or NOTAMC unschedules the NOTAM it
+        references, and every NOTAM but a NOTAMC is scheduled itself."""
+        if notam.notam_type in ('REPLACE', 'CANCEL') and notam.ref_notam_id is not None:
+            _ = self.unschedule(notam.ref_notam_id)
+        if notam.notam_type != 'CANCEL':
+            self.schedule(notam)
+
+    def _maybe_compact(self) -> None:
+        """Drops stale entries once they make up most of the heap, which keeps the amortized cost logarithmic."""
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._heap[:] = [e for e in self._heap if self._due.get(e[1]) == e[0]]
+        heapq.heapify(self._heap)
+
+    def _pop_stale(self) -> None:
+        heap, due = self._heap, self._due
+        while heap and due.get(heap[0][1]) != heap[0][0]:
+            _ = heapq.heappop(heap)
+
+    def next_expiry(self) -> Optional[datetime]:
+        """The time at which the next NOTAM expires, e.g. to know how long to sleep; None if there is none."""
+        self._pop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def expire(self, now: Optional[datetime] = None) -> List[ExpiryEvent]:
+        """Evicts all NOTAMs that have expired by 'now' (default: the clock's time) from the registered
+        containers, in order of expiry. Returns the corresponding events."""
+        if now is None:
+            now = self.clock()
+        events: List[ExpiryEvent] = []
+        heap, due = self._heap, self._due
+        while True:
+            self._pop_stale()
+            if not heap or heap[0][0] > now:
+                break
+            (at, notam_id, estimated) = heapq.heappop(heap)
+            del due[notam_id]
+            for c in self._containers:
+                _ = c.discard(notam_id)
+            event = ExpiryEvent(notam_id, at, estimated)
+            events.append(event)
+            if self.on_expire is not None:
+                self.on_expire(event)
+        return events
@@ -0,0 +1,565 @@
+"""Filters over NOTAMs, written as expressions over their fields and compiled once into specialized predicates.
+
+A filter is written the way it would be as the body of a lambda over a Notam, e.g.
+
+    fir == 'EGTT' and 'IFR' in traffic_type and notam_code.startswith('QMR')
+
+compile_filter() parses it (with Python's own expression syntax, but only the forms listed below) and compiles
+it into a single function specialized for its fields and constants, rather than evaluating the expression as
+written for every NOTAM:
+
+- traffic type, purpose and scope tests become checks of the bits of _codes.FLAG_BITS, and all such tests of a
+  conjunction (or disjunction) are merged into a single mask check;
+- equality and 'in' tests of the string fields become lookups in a precomputed set, as do the prefixes of
+  startswith() tests, which look up the first characters of the value in the set of prefixes of that length;
+- the conjuncts (and disjuncts) are ordered by their cost and estimated selectivity (see _query), so that the
+  tests most likely to decide come first.
+
+The supported forms are: 'field == value', 'field != value', comparisons ('<', '<=', ...) of the flight levels
+and part numbers, 'field in (values)', 'field not in (values)', 'value in field' and 'value not in field' for the
+traffic_type, purpose, scope and location fields, 'field.startswith(prefix or (prefixes))', combined with 'and',
+'or', 'not' and parentheses. As for the lambda, a field that is None is unequal to every value; it fails ordering
+comparisons and startswith() instead of raising, though.
+
+A Filter applies to single NOTAMs, to lists of them (select), to streams of them (iter_select) and to the columns
+of a shared-memory NOTAM table (indices, see pynotam.shm), without materializing Notam objects."""
+from __future__ import annotations
+
+import ast
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, \
+    Sequence, Tuple, TypeVar, Union
+
+from typing_extensions import override
+
+from . import _query
+from ._codes import FLAG_BITS
+
+if TYPE_CHECKING:
+    from . import Notam
+    from .shm import SharedNotamSet
+
+STRING_FIELDS = ('notam_id', 'notam_type', 'ref_notam_id', 'fir', 'notam_code', 'schedule', 'body', 'limit_lower',
+                 'limit_upper', 'source')
+NUMBER_FIELDS = ('fl_lower', 'fl_upper', 'part_number', 'part_count')
+FLAG_FIELDS = ('traffic_type', 'purpose', 'scope')
+
+_SYMBOLS: Dict[type, str] = {ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=',
+                             ast.In: 'in', ast.NotIn: 'not in'}
+# The comparison with its operands swapped, e.g. '100 < fl_upper' is 'fl_upper > 100'.
+_SWAPPED = {'==': '==', '!=': '!=', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+Test = Callable[[Any], bool]
+
+_P = TypeVar('_P', str, bytes)
+
+
+class _Code(object):
+    """Python source of the tests of a filter, and the constants (and columns) it refers to by name."""
+
+    def __init__(self, table: Optional["SharedNotamSet"] = None):
+        self.table = table
+        self.namespace: Dict[str, Any] = {}
+
+    def const(self, value: Any) -> str:
+        name = '_c{}'.format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def column(self, name: str) -> str:
+        """The name under which a column of the table is referenced."""
+        assert self.table is not None
+        if name not in self.namespace:
+            self.namespace[name] = self.table.column(name)
+        return name
+
+    def heap(self) -> str:
+        assert self.table is not None
+        if '_heap' not in self.namespace:
+            self.namespace['_heap'] = self.table.heap
+        return '_heap'
+
+    def null(self, field: str) -> str:
+        """A test of whether 'field' is None in row i."""
+        assert self.table is not None
+        return '{}[i] & {}'.format(self.column('nulls'), self.table.null_bit(field))
+
+    def string(self, field: str, length: Optional[int] = None) -> str:
+        """The UTF-8 bytes of 'field' in row i (b'' if None); or its first 'length' bytes."""
+        offsets = self.column('{}_offsets'.format(field))
+        end = '{}[i + 1]'.format(offsets)
+        if length is not None:
+            end = 'min({}[i] + {}, {})'.format(offsets, length, end)
+        return '{}[{}[i]:{}].tobytes()'.format(self.heap(), offsets, end)
+
+    def compile(self, source: str) -> Test:
+        return eval('lambda {}: {}'.format('n' if self.table is None else 'i', source), self.namespace)
+
+
+class _Leaf(ABC):
+    """A test of a single field (or of the flag fields together); combined with _Not, _And and _Or."""
+
+    name: str
+    cost: float = 1.0
+
+    @abstractmethod
+    def source(self, code: _Code) -> str:
+        """A Python expression testing the Notam 'n'."""
+
+    @abstractmethod
+    def row_source(self, code: _Code) -> str:
+        """A Python expression testing row 'i' of the table of 'code'."""
+
+    def negated(self) -> Optional[_Leaf]:
+        """An equivalent of 'not self', where that is a test of the same kind."""
+        return None
+
+
+class _Mergeable(_Leaf):
+    """A test that can be combined with others of its kind into one, e.g. the union of several 'in' tests."""
+
+    @abstractmethod
+    def merge_key(self, conjunctive: bool) -> Optional[Hashable]:
+        """Tests with equal keys in the same conjunction (or disjunction) are combined with merged()."""
+
+    @abstractmethod
+    def merged(self, other: Any, conjunctive: bool) -> _Mergeable: ...
+
+
+def _joined(names: Iterable[str], conjunctive: bool) -> str:
+    return (' and ' if conjunctive else ' or ').join(names)
+
+
+def _by_length(prefixes: Iterable[_P]) -> Dict[int, FrozenSet[_P]]:
+    by_length: Dict[int, set[_P]] = defaultdict(set)
+    for p in prefixes:
+        by_length[len(p)].add(p)
+    return {length: frozenset(ps) for (length, ps) in sorted(by_length.items())}
+
+
+class _Flags(_Mergeable):
+    """Tests of the traffic type, purpose and scope sets, as a mask of FLAG_BITS: 'all' of its bits must be set,
+    'any' of them, or 'none'."""
+
+    def __init__(self, mask: int, mode: str, name: str):
+        self.mask, self.mode, self.name = mask, mode, name
+
+    def _mode(self, conjunctive: bool) -> str:
+        # For a single bit, 'all' and 'any' are the same test.
+        if self.mask.bit_count() == 1 and self.mode != 'none':
+            return 'all' if conjunctive else 'any'
+        return self.mode
+
+    @override
+    def merge_key(self, conjunctive: bool) -> Optional[Hashable]:
+        mode = self._mode(conjunctive)
+        return ('flags', mode) if (mode == 'any') != conjunctive else None
+
+    @override
+    def merged(self, other: Any, conjunctive: bool) -> _Mergeable:
+        return _Flags(self.mask | other.mask, self._mode(conjunctive), _joined((self.name, other.name), conjunctive))
+
+    @override
+    def negated(self) -> Optional[_Leaf]:
+        if self._mode(False) == 'any':
+            return _Flags(self.mask, 'none', 'not ({})'.format(self.name))
+        if self.mode == 'none':
+            return _Flags(self.mask, 'any', 'not ({})'.format(self.name))
+        return None
+
+    @override
+    def source(self, code: _Code) -> str:
+        # Notam objects hold the decoded sets rather than the bits, so the mask is checked per field, as a subset
+        # (all) or disjointness (any, none) test of the meanings of its bits in that field.
+        mode = self._mode(True)
+        tests = []
+        for field in FLAG_FIELDS:
+            meanings = frozenset(m for ((f, m), bit) in FLAG_BITS.items() if f == field and self.mask & bit)
+            if len(meanings) == 1 and mode != 'none':
+                tests.append('{!r} in n.{}'.format(next(iter(meanings)), field))
+            elif len(meanings) == 1:
+                tests.append('{!r} not in n.{}'.format(next(iter(meanings)), field))
+            elif meanings and mode == 'all':
+                tests.append('{} <= n.{}'.format(code.const(meanings), field))
+            elif meanings:
+                tests.append('{}{}.isdisjoint(n.{})'.format('not ' if mode == 'any' else '',
+                                                            code.const(meanings), field))
+        return _joined(tests, mode != 'any')
+
+    @override
+    def row_source(self, code: _Code) -> str:
+        flags = '{}[i]'.format(code.column('flags'))
+        mode = self._mode(True)
+        if mode == 'all':
+            return '{} & {} == {}'.format(flags, self.mask, self.mask)
+        return '{} & {} {} 0'.format(flags, self.mask, '!=' if mode == 'any' else '==')
+
+
+class _Strings(_Mergeable):
+    """field in values, or field.startswith(prefixes); the opposite if negated."""
+
+    def __init__(self, field: str, values: FrozenSet[str], prefixes: Tuple[str, ...], negated: bool, name: str):
+        self.field, self.values, self.prefixes, self.is_negated, self.name = field, values, prefixes, negated, name
+        self.cost = 1.5 if prefixes else 1.0
+
+    @override
+    def merge_key(self, conjunctive: bool) -> Optional[Hashable]:
+        # 'a or b' of positive tests, and 'not a and not b' of negated ones, are a test of the union.
+        return ('strings', self.field) if self.is_negated == conjunctive else None
+
+    @override
+    def merged(self, other: Any, conjunctive: bool) -> _Mergeable:
+        return _Strings(self.field, self.values | other.values, self.prefixes + other.prefixes, self.is_negated,
+                        _joined((self.name, other.name), conjunctive))
+
+    @override
+    def negated(self) -> Optional[_Leaf]:
+        return _Strings(self.field, self.values, self.prefixes, not self.is_negated, 'not ({})'.format(self.name))
+
+    @override
+    def source(self, code: _Code) -> str:
+        value = 'n.{}'.format(self.field)
+        tests = []
+        if len(self.values) == 1:
+            tests.append('{} == {!r}'.format(value, next(iter(self.values))))
+        elif self.values:
+            tests.append('{} in {}'.format(value, code.const(self.values)))
+        for (length, prefixes) in _by_length(self.prefixes).items():
+            if length == 0:
+                tests.append('{} is not None'.format(value))
+            else:
+                tests.append('({} or "")[:{}] in {}'.format(value, length, code.const(prefixes)))
+        test = _joined(tests, False)
+        return 'not ({})'.format(test) if self.is_negated else test
+
+    @override
+    def row_source(self, code: _Code) -> str:
+        tests = []
+        if self.values:
+            tests.append('{} in {}'.format(code.string(self.field), code.const({v.encode() for v in self.values})))
+        # The columns hold UTF-8, so the prefixes are grouped by their length in bytes, not characters.
+        for (length, prefixes) in _by_length([p.encode() for p in self.prefixes]).items():
+            tests.append('{} in {}'.format(code.string(self.field, length), code.const(prefixes)))
+        test = 'not {} and ({})'.format(code.null(self.field), _joined(tests, False))
+        return 'not ({})'.format(test) if self.is_negated else test
+
+
+class _Location(_Mergeable):
+    """Any of the values is one of the A) locations; none of them, if negated."""
+
+    cost = 1.5
+
+    def __init__(self, values: FrozenSet[str], negated: bool, name: str):
+        self.values, self.is_negated, self.name = values, negated, name
+
+    @override
+    def merge_key(self, conjunctive: bool) -> Optional[Hashable]:
+        return 'location' if self.is_negated == conjunctive else None
+
+    @override
+    def merged(self, other: Any, conjunctive: bool) -> _Mergeable:
+        return _Location(self.values | other.values, self.is_negated, _joined((self.name, other.name), conjunctive))
+
+    @override
+    def negated(self) -> Optional[_Leaf]:
+        return _Location(self.values, not self.is_negated, 'not ({})'.format(self.name))
+
+    @override
+    def source(self, code: _Code) -> str:
+        if len(self.values) == 1:
+            return '{!r} {}in n.location'.format(next(iter(self.values)), 'not ' if self.is_negated else '')
+        return '{}{}.isdisjoint(n.location)'.format('' if self.is_negated else 'not ', code.const(self.values))
+
+    @override
+    def row_source(self, code: _Code) -> str:
+        test = 'not {} and not {}.isdisjoint({}.split(b" "))'.format(
+            code.null('location'), code.const({v.encode() for v in self.values}), code.string('location'))
+        return 'not ({})'.format(test) if self.is_negated else test
+
+
+class _Number(_Leaf):
+    """A comparison of one of NUMBER_FIELDS with a constant (or, for 'in', a set of them)."""
+
+    def __init__(self, field: str, op: str, value: Any, name: str):
+        self.field, self.op, self.value, self.name = field, op, value, name
+
+    def _constant(self, code: _Code) -> str:
+        return code.const(self.value) if isinstance(self.value, frozenset) else repr(self.value)
+
+    @override
+    def source(self, code: _Code) -> str:
+        value = 'n.{}'.format(self.field)
+        test = '{} {} {}'.format(value, self.op, self._constant(code))
+        # None is unequal to (and not in) everything, and fails ordering comparisons.
+        return test if self.op in ('==', '!=', 'in', 'not in') else '{} is not None and {}'.format(value, test)
+
+    @override
+    def row_source(self, code: _Code) -> str:
+        test = '{}[i] {} {}'.format(code.column(self.field), self.op, self._constant(code))
+        if self.op in ('!=', 'not in'):
+            return '{} or {} != 0'.format(test, code.null(self.field))
+        return '{} == 0 and {}'.format(code.null(self.field), test)
+
+
+class _Not(object):
+    def __init__(self, child: _Node):
+        self.child = child
+
+
+class _And(object):
+    def __init__(self, children: List[_Node]):
+        self.children = children
+
+
+class _Or(object):
+    def __init__(self, children: List[_Node]):
+        self.children = children
+
+
+_Node = Union[_Leaf, _Not, _And, _Or]
+
+
+def _combine(nodes: Sequence[_Node], conjunctive: bool) -> _Node:
+    """The conjunction (or disjunction) of the nodes, flattened, and with tests of the same kind merged."""
+    kind = _And if conjunctive else _Or
+    out: List[_Node] = []
+    merged_at: Dict[Hashable, int] = {}
+    for node in nodes:
+        for n in (node.children if isinstance(node, kind) else [node]):
+            key = n.merge_key(conjunctive) if isinstance(n, _Mergeable) else None
+            if key is not None and key in merged_at:
+                first = out[merged_at[key]]
+                assert isinstance(first, _Mergeable)
+                out[merged_at[key]] = first.merged(n, conjunctive)
+                continue
+            if key is not None:
+                merged_at[key] = len(out)
+            out.append(n)
+    return out[0] if len(out) == 1 else kind(out)
+
+
+def _negate(node: _Node) -> _Node:
+    if isinstance(node, _Not):
+        return node.child
+    negated = node.negated() if isinstance(node, _Leaf) else None
+    return negated if negated is not None else _Not(node)
+
+
+def _error(node: ast.AST, reason: str) -> ValueError:
+    return ValueError('{}: {}'.format(reason, ast.unparse(node)))
+
+
+def _field(node: ast.AST) -> str:
+    if not isinstance(node, ast.Name):
+        raise _error(node, 'expected a field name')
+    if node.id not in STRING_FIELDS + NUMBER_FIELDS + FLAG_FIELDS + ('location',):
+        raise _error(node, 'unknown field')
+    return node.id
+
+
+def _literal(node: ast.AST, kind: type) -> Any:
+    try:
+        value = ast.literal_eval(node)
+    except ValueError:
+        raise _error(node, 'expected a constant') from None
+    if isinstance(value, (tuple, list, set, frozenset)):
+        if not all(isinstance(v, kind) and not isinstance(v, bool) for v in value):
+            raise _error(node, 'expected constants of type {}'.format(kind.__name__))
+        return frozenset(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise _error(node, 'expected a constant of type {}'.format(kind.__name__))
+    return value
+
+
+def _membership(element: ast.AST, container: ast.AST, negated: bool, name: str) -> _Node:
+    if isinstance(container, ast.Name):
+        field = _field(container)
+        value = _literal(element, str)
+        if isinstance(value, frozenset):
+            raise _error(element, 'expected a single value')
+        if field == 'location':
+            return _Location(frozenset([value]), negated, name)
+        if field not in FLAG_FIELDS:
+            raise _error(container, "'in' tests need a set field, or a set of values")
+        bit = FLAG_BITS.get((field, value))
+        if bit is None:
+            raise _error(element, 'unknown {}'.format(field))
+        return _Flags(bit, 'none' if negated else 'all', name)
+
+    field = _field(element)
+    if field in STRING_FIELDS:
+        values = _literal(container, str)
+        if not isinstance(values, frozenset):
+            raise _error(container, 'expected a tuple, list or set of values')
+        return _Strings(field, values, (), negated, name)
+    if field in NUMBER_FIELDS:
+        values = _literal(container, int)
+        if not isinstance(values, frozenset):
+            raise _error(container, 'expected a tuple, list or set of values')
+        return _Number(field, 'not in' if negated else 'in', values, name)
+    raise _error(element, "'in' tests need a string or number field")
+
+
+def _comparison(left: ast.AST, symbol: str, right: ast.AST) -> _Node:
+    name = '{} {} {}'.format(ast.unparse(left), symbol, ast.unparse(right))
+    if symbol in ('in', 'not in'):
+        return _membership(left, right, symbol == 'not in', name)
+    if isinstance(left, ast.Name):
+        (field, constant) = (_field(left), right)
+    elif isinstance(right, ast.Name):
+        (field, constant, symbol) = (_field(right), left, _SWAPPED[symbol])
+    else:
+        raise ValueError('expected a comparison of a field with a constant: {}'.format(name))
+    if field in STRING_FIELDS and symbol in ('==', '!='):
+        value = _literal(constant, str)
+        if isinstance(value, frozenset):
+            raise _error(constant, 'expected a single value')
+        return _Strings(field, frozenset([value]), (), symbol == '!=', name)
+    if field in NUMBER_FIELDS:
+        value = _literal(constant, int)
+        if isinstance(value, frozenset):
+            raise _error(constant, 'expected a single value')
+        return _Number(field, symbol, value, name)
+    raise ValueError('unsupported comparison of {}: {}'.format(field, name))
+
+
+def _build(node: ast.AST) -> _Node:
+    if isinstance(node, ast.BoolOp):
+        return _combine([_build(v) for v in node.values], isinstance(node.op, ast.And))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return _negate(_build(node.operand))
+    if isinstance(node, ast.Compare):
+        if not all(type(op) in _SYMBOLS for op in node.ops):
+            raise _error(node, 'unsupported comparison')
+        operands = [node.left] + node.comparators
+        # A chained comparison 'a < b < c' is 'a < b and b < c'.
+        return _combine([_comparison(operands[i], _SYMBOLS[type(op)], operands[i + 1])
+                         for (i, op) in enumerate(node.ops)], True)
+    if isinstance(node, ast.Call):
+        func = node.func
+        if not (isinstance(func, ast.Attribute) and func.attr == 'startswith' and len(node.args) == 1
+                and not node.keywords):
+            raise _error(node, 'unsupported call')
+        field = _field(func.value)
+        if field not in STRING_FIELDS:
+            raise _error(node, 'startswith() needs a string field')
+        prefixes = _literal(node.args[0], str)
+        return _Strings(field, frozenset(), tuple(sorted(prefixes)) if isinstance(prefixes, frozenset)
+                        else (prefixes,), False, ast.unparse(node))
+    raise _error(node, 'unsupported expression')
+
+
+def _operands(node: _Node, code: _Code, sampled: Sequence[Any]) -> List[Tuple[_query.Predicate, str]]:
+    """The operands of a conjunction (or disjunction) as predicates, with their source, in the order they are best
+    evaluated in over the sample."""
+    assert isinstance(node, (_And, _Or))
+    sources = {}
+    preds = []
+    for child in node.children:
+        (p, source) = _predicate(child, code, sampled)
+        if isinstance(child, (_And, _Or)):
+            p = p._replace(name='({})'.format(p.name))
+        sources[id(p)] = source
+        preds.append(p)
+    if isinstance(node, _And):
+        preds = _query.order_conjuncts(preds, sampled)
+    else:
+        preds = _query.order_disjuncts(preds, sampled)
+    return [(p, sources[id(p)]) for p in preds]
+
+
+def _predicate(node: _Node, code: _Code, sampled: Sequence[Any]) -> Tuple[_query.Predicate, str]:
+    """The node as a single predicate, with the operands of its conjunctions and disjunctions ordered for the
+    sample, and its source."""
+    if isinstance(node, (_And, _Or)):
+        conjunctive = isinstance(node, _And)
+        operands = _operands(node, code, sampled)
+        source = '({})'.format(_joined((s for (_, s) in operands), conjunctive))
+        return (_query.Predicate(_joined((p.name for (p, _) in operands), conjunctive), code.compile(source),
+                                 sum(p.cost for (p, _) in operands)), source)
+    if isinstance(node, _Not):
+        (p, source) = _predicate(node.child, code, sampled)
+        source = '(not {})'.format(source)
+        return (_query.Predicate('not ({})'.format(p.name), code.compile(source), p.cost), source)
+    source = '({})'.format(node.source(code) if code.table is None else node.row_source(code))
+    return (_query.Predicate(node.name, code.compile(source), node.cost), source)
+
+
+def _plan(root: _Node, code: _Code, sampled: Sequence[Any]) -> Tuple[List[_query.Predicate], Test]:
+    """The conjuncts of the filter in the order chosen for the sample, and the whole filter as a single test."""
+    if isinstance(root, _And):
+        operands = _operands(root, code, sampled)
+        return ([p for (p, _) in operands], code.compile(_joined((s for (_, s) in operands), True)))
+    (p, _) = _predicate(root, code, sampled)
+    return ([p], p.test)
+
+
+class Filter(object):
+    """A compiled filter expression (see compile_filter). Calling it tests a single Notam."""
+
+    def __init__(self, expression: str, root: _Node, sampled: Sequence["Notam"] = ()):
+        self.expression = expression
+        self._root = root
+        (self._steps, self._test) = _plan(root, _Code(), sampled)
+
+    def __call__(self, notam: "Notam") -> bool:
+        return self._test(notam)
+
+    @override
+    def __repr__(self) -> str:
+        return 'Filter({!r})'.format(self.expression)
+
+    @property
+    def steps(self) -> List[str]:
+        """The conjuncts of the filter, in the order in which they are applied."""
+        return [p.name for p in self._steps]
+
+    def ordered_for(self, notams: Sequence["Notam"]) -> Filter:
+        """The same filter, with its tests ordered by their selectivity over a sample of 'notams'."""
+        return Filter(self.expression, self._root, _query.sample(notams))
+
+    def select(self, notams: Iterable["Notam"]) -> List["Notam"]:
+        """The matching NOTAMs, in their original order. The tests keep their order (see ordered_for, to order
+        them for a given list once and reuse the result)."""
+        test = self._test
+        return [n for n in notams if test(n)]
+
+    def iter_select(self, notams: Iterable["Notam"], sample_size: int = _query.SAMPLE_SIZE) -> Iterator["Notam"]:
+        """Yields the matching NOTAMs of a stream as they arrive. The tests are ordered for the first
+        'sample_size' NOTAMs, which are held back until that many have arrived (none, for a sample_size of 0)."""
+        it = iter(notams)
+        head = list(islice(it, sample_size))
+        test = self.ordered_for(head)._test if head else self._test
+        for n in head:
+            if test(n):
+                yield n
+        for n in it:
+            if test(n):
+                yield n
+
+    def indices(self, table: "SharedNotamSet") -> List[int]:
+        """The indices of the matching NOTAMs of a shared-memory NOTAM table. The tests run directly on its
+        columns (e.g. the flags column, for traffic type, purpose and scope), without materializing Notams."""
+        rows = range(len(table))
+        (_, test) = _plan(self._root, _Code(table), _query.sample(rows))
+        return [i for i in rows if test(i)]
+
+
+def compile_filter(expression: str, sample: Sequence["Notam"] = ()) -> Filter:
+    """Compiles a filter expression (see the module documentation), ordering its tests for a sample of NOTAMs
+    like those it is to be applied to, if given. Raises ValueError for invalid expressions."""
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError('invalid filter expression {!r}: {}'.format(expression, e.msg)) from None
+    return Filter(expression, _build(tree.body), _query.sample(sample))
+
+
+def select(expression: Union[str, Filter], notams: Iterable["Notam"]) -> List["Notam"]:
+    """The NOTAMs matching a filter expression (compiled, if it is a string, with its tests ordered for the
+    NOTAMs if they are a sequence), in their original order."""
+    if isinstance(expression, str):
+        expression = compile_filter(expression, sample=notams if isinstance(notams, Sequence) else ())
+    return expression.select(notams)
@@ -0,0 +1,96 @@
+"""Geometry helpers for the Q-line area of influence of NOTAMs.
+
+Positions are (latitude, longitude) tuples in decimal degrees, north and east positive. Distances are in nautical
+miles, on a spherical earth."""
+from __future__ import annotations
+
+from math import acos, asin, atan2, cos, degrees, radians, sin, sqrt
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from . import Notam
+
+EARTH_RADIUS_NM = 3440.065
+
+Position = Tuple[float, float]
+BoundingBox = Tuple[float, float, float, float]
+
+
+def parse_coordinate(s: str) -> float:
+    """Converts a Q-line coordinate (degrees and minutes followed by a hemisphere letter, e.g. '5510N' or
+    '00520W') into decimal degrees."""
+    value = int(s[:-3]) + int(s[-3:-1]) / 60
+    return -value if s[-1] in 'SW' else value
+
+
+def area_center(notam: "Notam") -> Optional[Position]:
+    """Returns the center of the NOTAM's area of influence, or None if it has none."""
+    if not notam.area:
+        return None
+    return (parse_coordinate(str(notam.area['lat'])), parse_coordinate(str(notam.area['long'])))
+
+
+def bounding_box(center: Position, radius_nm: float) -> BoundingBox:
+    """Returns a (min_lat, min_lon, max_lat, max_lon) box containing the circle of radius_nm around center. Boxes
+    reaching a pole or the antimeridian span all longitudes."""
+    (lat, lon) = center
+    dlat = radius_nm / 60
+    (min_lat, max_lat) = (max(-90.0, lat - dlat), min(90.0, lat + dlat))
+    if abs(min_lat) >= 90 or abs(max_lat) >= 90:
+        return (min_lat, -180.0, max_lat, 180.0)
+    dlon = radius_nm / (60 * cos(radians(max(abs(min_lat), abs(max_lat)))))
+    if lon - dlon < -180 or lon + dlon > 180:
+        return (min_lat, -180.0, max_lat, 180.0)
+    return (min_lat, lon - dlon, max_lat, lon + dlon)
+
+
+def distance_nm(a: Position, b: Position) -> float:
+    """Great-circle distance between two positions."""
+    lat1, lon1, lat2, lon2 = map(radians, (a[0], a[1], b[0], b[1]))
+    h = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * asin(min(1.0, sqrt(h)))
+
+
+def destination(start: Position, bearing: float, distance: float) -> Position:
+    """The position reached by travelling 'distance' nautical miles from start along the great circle with the
+    given initial bearing (in degrees clockwise from north)."""
+    lat1, lon1, brg = radians(start[0]), radians(start[1]), radians(bearing)
+    d = distance / EARTH_RADIUS_NM
+    lat2 = asin(max(-1.0, min(1.0, sin(lat1) * cos(d) + cos(lat1) * sin(d) * cos(brg))))
+    lon2 = lon1 + atan2(sin(brg) * sin(d) * cos(lat1), cos(d) - sin(lat1) * sin(lat2))
+    return (degrees(lat2), (degrees(lon2) + 540) % 360 - 180)
+
+
+def circle(center: Position, radius_nm: float, segments: int = 32) -> List[Position]:
+    """A closed ring of segments + 1 positions approximating the circle of radius_nm around center, clockwise
+    from north."""
+    ring = [destination(center, 360 * i / segments, radius_nm) for i in range(segments)]
+    return ring + ring[:1]
+
+
+def _bearing(a: Position, b: Position) -> float:
+    lat1, lon1, lat2, lon2 = map(radians, (a[0], a[1], b[0], b[1]))
+    return atan2(sin(lon2 - lon1) * cos(lat2), cos(lat1) * sin(lat2) - sin(lat1) * cos(lat2) * cos(lon2 - lon1))
+
+
+def distance_to_segment_nm(p: Position, a: Position, b: Position) -> float:
+    """Shortest distance from p to the great-circle segment between a and b."""
+    d_ap = distance_nm(a, p)
+    if a == b:
+        return d_ap
+    delta = _bearing(a, p) - _bearing(a, b)
+    if cos(delta) <= 0:  # p lies "behind" a
+        return d_ap
+    angular_ap = d_ap / EARTH_RADIUS_NM
+    cross = asin(max(-1.0, min(1.0, sin(angular_ap) * sin(delta))))
+    along = EARTH_RADIUS_NM * acos(max(-1.0, min(1.0, cos(angular_ap) / cos(cross))))
+    if along >= distance_nm(a, b):  # p lies beyond b
+        return distance_nm(b, p)
+    return abs(cross) * EARTH_RADIUS_NM
+
+
+def distance_to_path_nm(p: Position, path: Sequence[Position]) -> float:
+    """Shortest distance from p to a path of one or more positions joined by great-circle segments."""
+    if len(path) == 1:
+        return distance_nm(p, path[0])
+    return min(distance_to_segment_nm(p, a, b) for (a, b) in zip(path, path[1:]))
@@ -0,0 +1,193 @@
+"""Export of NOTAM areas as GeoJSON, and a cache of them per map tile.
+
+The Q-line area of influence of a NOTAM (a circle) is approximated by a polygon. write_geojson() streams any
+number of NOTAMs into a GeoJSON FeatureCollection. TileCache serves map front ends: it precomputes, for every
+NOTAM and zoom level, a polygon with just enough vertices for that zoom, files it under the web mercator tiles
+(zoom/x/y) its bounding box covers, and keeps the serialized GeoJSON of every requested tile until a NOTAM on
+that tile is added or removed."""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from math import ceil, cos, floor, log, pi, radians, tan
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .geo import Position, area_center, bounding_box, circle
+
+if TYPE_CHECKING:
+    from . import Notam
+
+DEFAULT_SEGMENTS = 32
+MAX_MERCATOR_LAT = 85.0511287798
+
+Tile = Tuple[int, int, int]
+
+_EMPTY_TILE = b'{"type":"FeatureCollection","features":[]}'
+
+
+def _properties(notam: "Notam") -> Dict[str, Any]:
+    till = notam.valid_till
+    permanent = till is not None and till.year == datetime.max.year
+    return {
+        'notam_id': notam.notam_id, 'notam_type': notam.notam_type, 'fir': notam.fir,
+        'notam_code': notam.notam_code, 'location': list(notam.location),
+        'fl_lower': notam.fl_lower, 'fl_upper': notam.fl_upper,
+        'valid_from': notam.valid_from.isoformat() if notam.valid_from is not None else None,
+        'valid_till': till.isoformat() if till is not None and not permanent else None,
+        'valid_till_estimated': getattr(till, 'is_estimated', False), 'permanent': permanent,
+        'body': notam.body,
+    }
+
+
+def _ring(center: Position, radius_nm: float, segments: int) -> List[List[float]]:
+    # GeoJSON wants (longitude, latitude), with exterior rings counterclockwise.
+    return [[round(lon, 5), round(lat, 5)] for (lat, lon) in reversed(circle(center, radius_nm, segments))]
+
+
+def feature(notam: "Notam", segments: int = DEFAULT_SEGMENTS) -> Optional[Dict[str, Any]]:
+    """The NOTAM as a GeoJSON Feature: its area as a polygon of 'segments' sides (or a point, for a radius of 0),
+    and its main fields as properties. None if the NOTAM has no area."""
+    center = area_center(notam)
+    if center is None:
+        return None
+    radius = int(notam.area['radius'])
+    if radius == 0:
+        geometry: Dict[str, Any] = {'type': 'Point', 'coordinates': [round(center[1], 5), round(center[0], 5)]}
+    else:
+        geometry = {'type': 'Polygon', 'coordinates': [_ring(center, radius, segments)]}
+    return {'type': 'Feature', 'id': notam.notam_id, 'geometry': geometry, 'properties': _properties(notam)}
+
+
+def iter_features(notams: Iterable["Notam"], segments: int = DEFAULT_SEGMENTS) -> Iterator[Dict[str, Any]]:
+    for n in notams:
+        f = feature(n, segments)
+        if f is not None:
+            yield f
+
+
+def write_geojson(notams: Iterable["Notam"], out: TextIO, segments: int = DEFAULT_SEGMENTS) -> int:
+    """Streams the NOTAMs that have an area into a GeoJSON FeatureCollection, one feature at a time, so that
+    arbitrarily many NOTAMs can be written in bounded memory. Returns the number of features written."""
+    count = 0
+    _ = out.write('{"type": "FeatureCollection", "features": [')
+    for f in iter_features(notams, segments):
+        _ = out.write(',\n' if count else '\n')
+        _ = out.write(json.dumps(f, ensure_ascii=False, separators=(',', ':')))
+        count += 1
+    _ = out.write('\n]}\n')
+    return count
+
+
+def tile_of(position: Position, zoom: int) -> Tuple[int, int]:
+    """The (x, y) of the web mercator tile containing the position at the given zoom level."""
+    (lat, lon) = position
+    n = 1 << zoom
+    lat = radians(max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat)))
+    x = floor((lon + 180) / 360 * n)
+    y = floor((1 - log(tan(lat) + 1 / cos(lat)) / pi) / 2 * n)
+    return (min(max(x, 0), n - 1), min(max(y, 0), n - 1))
+
+
+def segments_for(radius_nm: float, latitude: float, zoom: int) -> int:
+    """The number of polygon sides needed to draw a circle at a zoom level with about one vertex every 8 pixels
+    (on 256-pixel tiles), between 8 and 64."""
+    radius_px = radius_nm / 60 / 360 * 256 * (1 << zoom) / max(cos(radians(min(abs(latitude), 85.0))), 1e-6)
+    return max(8, min(64, ceil(2 * pi * radius_px / 8)))
+
+
+class TileCache(object):
+    """GeoJSON FeatureCollections of NOTAM areas per web mercator tile, for zoom levels min_zoom to max_zoom.
+
+    Maintained incrementally, like the other NOTAM containers: add(), discard() and apply() only touch the tiles
+    of the affected NOTAM, dropping their cached GeoJSON, and tile() serializes a tile at most once between
+    changes to it."""
+
+    def __init__(self, min_zoom: int = 0, max_zoom: int = 8, notams: Iterable["Notam"] = ()):
+        if not 0 <= min_zoom <= max_zoom:
+            raise ValueError('need 0 <= min_zoom <= max_zoom')
+        self.min_zoom, self.max_zoom = min_zoom, max_zoom
+        # notam_id -> zoom -> feature simplified for that zoom level
+        self._features: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._tiles_of: Dict[str, List[Tile]] = {}
+        self._tiles: Dict[Tile, Set[str]] = {}
+        self._rendered: Dict[Tile, bytes] = {}
+        for n in notams:
+            self.apply(n)
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def __contains__(self, notam_id: object) -> bool:
+        return notam_id in self._features
+
+    def _covered(self, notam: "Notam", zoom: int) -> Iterator[Tile]:
+        center = area_center(notam)
+        assert center is not None
+        (min_lat, min_lon, max_lat, max_lon) = bounding_box(center, int(notam.area['radius']))
+        (x0, y0) = tile_of((max_lat, min_lon), zoom)
+        (x1, y1) = tile_of((min_lat, max_lon), zoom)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield (zoom, x, y)
+
+    def add(self, notam: "Notam") -> None:
+        """Adds the NOTAM's area under its notam_id, replacing any previous NOTAM with the same id. NOTAMs without
+        an area are ignored."""
+        if notam.notam_id is None:
+            raise ValueError('cannot cache a NOTAM without a notam_id')
+        _ = self.discard(notam.notam_id)
+        center = area_center(notam)
+        if center is None:
+            return
+        radius = int(notam.area['radius'])
+        features: Dict[int, Dict[str, Any]] = {}
+        tiles: List[Tile] = []
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            f = feature(notam, segments_for(radius, center[0], zoom))
+            assert f is not None
+            features[zoom] = f
+            tiles.extend(self._covered(notam, zoom))
+        self._features[notam.notam_id] = features
+        self._tiles_of[notam.notam_id] = tiles
+        for t in tiles:
+            self._tiles.setdefault(t, set()).add(notam.notam_id)
+            _ = self._rendered.pop(t, None)
+
+    def discard(self, notam_id: str) -> bool:
+        """Removes the NOTAM with the given id. Returns whether it was present."""
+        if self._features.pop(notam_id, None) is None:
+            return False
+        for t in self._tiles_of.pop(notam_id):
+            ids = self._tiles[t]
+            ids.discard(notam_id)
+            if not ids:
+                del self._tiles[t]
+            _ = self._rendered.pop(t, None)
+        return True
+
+    def apply(self, notam: "Notam") -> None:
+        """Updates the cache with a newly received NOTAM: a NOTAMR replaces the NOTAM it references, and a NOTAMC
+        removes it (a NOTAMC is not cached itself)."""
+        if notam.notam_type in ('REPLACE', 'CANCEL') and notam.ref_notam_id is not None:
+            _ = self.discard(notam.ref_notam_id)
+        if notam.notam_type != 'CANCEL':
+            self.add(notam)
+
+    def notam_ids(self, zoom: int, x: int, y: int) -> Set[str]:
+        """Ids of the NOTAMs whose area's bounding box overlaps the tile."""
+        return set(self._tiles.get((zoom, x, y), ()))
+
+    def tile(self, zoom: int, x: int, y: int) -> bytes:
+        """The tile's FeatureCollection, serialized as UTF-8 GeoJSON."""
+        if not self.min_zoom <= zoom <= self.max_zoom:
+            raise ValueError('zoom level {} is not cached'.format(zoom))
+        key = (zoom, x, y)
+        data = self._rendered.get(key)
+        if data is None:
+            if key not in self._tiles:
+                return _EMPTY_TILE
+            features = [self._features[i][zoom] for i in sorted(self._tiles.get(key, ()))]
+            data = json.dumps({'type': 'FeatureCollection', 'features': features}, ensure_ascii=False,
+                              separators=(',', ':')).encode()
+            self._rendered[key] = data
+        return data
@@ -0,0 +1,99 @@
+"""Inverted index from ICAO location indicators and FIRs to the ids of the NOTAMs concerning them."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from . import Notam
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+class LocationIndex(object):
+    """Maps each ICAO location indicator in A) and each Q-line FIR to the set of notam_ids referring to it.
+
+    The index is maintained incrementally: add() and discard() cost O(k) for a NOTAM with k locations, and apply()
+    handles NEW/REPLACE/CANCEL semantics. Queries over many indicators at once (union, intersection) run over the
+    posting sets directly, without scanning NOTAMs."""
+
+    def __init__(self, notams: Iterable["Notam"] = ()):
+        self._postings: Dict[str, Dict[str, Set[str]]] = {'location': {}, 'fir': {}}
+        self._keys: Dict[str, Tuple[FrozenSet[str], Optional[str]]] = {}
+        for n in notams:
+            self.apply(n)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, notam_id: object) -> bool:
+        return notam_id in self._keys
+
+    def add(self, notam: "Notam") -> None:
+        """Indexes the NOTAM under its notam_id, replacing any previous NOTAM with the same id."""
+        if notam.notam_id is None:
+            raise ValueError('cannot index a NOTAM without a notam_id')
+        _ = self.discard(notam.notam_id)
+        locations = frozenset(notam.location)
+        for loc in locations:
+            self._postings['location'].setdefault(loc, set()).add(notam.notam_id)
+        if notam.fir is not None:
+            self._postings['fir'].setdefault(notam.fir, set()).add(notam.notam_id)
+        self._keys[notam.notam_id] = (locations, notam.fir)
+
+    def discard(self, notam_id: str) -> bool:
+        """Removes the NOTAM with the given id from the index. Returns whether it was present."""
+        entry = self._keys.pop(notam_id, None)
+        if entry is None:
+            return False
+        locations, fir = entry
+        for (field, keys) in (('location', locations), ('fir', (fir,) if fir is not None else ())):
+            postings = self._postings[field]
+            for k in keys:
+                ids = postings[k]
+                ids.discard(notam_id)
+                if not ids:
+                    del postings[k]
+        return True
+
+    def apply(self, notam: "Notam") -> None:
+        """Updates the index with a newly received NOTAM: a NOTAMR replaces the NOTAM it references, and a NOTAMC
+        removes it (a NOTAMC is not indexed itself)."""
+        if notam.notam_type in ('REPLACE', 'CANCEL') and notam.ref_notam_id is not None:
+            _ = self.discard(notam.ref_notam_id)
+        if notam.notam_type != 'CANCEL':
+            self.add(notam)
+
+    def lookup(self, key: str, field: Optional[str] = None) -> FrozenSet[str]:
+        """Returns the ids of the NOTAMs referring to 'key' as an A) location (field='location'), as their FIR
+        (field='fir'), or either (field=None)."""
+        if field is not None:
+            return frozenset(self._postings[field].get(key, _EMPTY))
+        return frozenset(self._postings['location'].get(key, _EMPTY) | self._postings['fir'].get(key, _EMPTY))
+
+    def _posting_sets(self, keys: Iterable[str], field: Optional[str]) -> Iterable[Set[str] | FrozenSet[str]]:
+        for k in keys:
+            if field is not None:
+                yield self._postings[field].get(k, _EMPTY)
+            else:
+                loc, fir = self._postings['location'].get(k), self._postings['fir'].get(k)
+                yield (loc | fir) if (loc and fir) else (loc or fir or _EMPTY)
+
+    def union(self, keys: Iterable[str], field: Optional[str] = None) -> Set[str]:
+        """Ids of the NOTAMs referring to any of the given keys, e.g. all NOTAMs for EDDF or EDDM."""
+        return set().union(*self._posting_sets(keys, field))
+
+    def intersection(self, keys: Iterable[str], field: Optional[str] = None) -> Set[str]:
+        """Ids of the NOTAMs referring to all of the given keys."""
+        sets = sorted(self._posting_sets(keys, field), key=len)
+        if not sets:
+            return set()
+        result = set(sets[0])
+        for s in sets[1:]:
+            if not result:
+                break
+            result.intersection_update(s)
+        return result
+
+    def keys(self, field: str = 'location') -> FrozenSet[str]:
+        """All location indicators (or FIRs) currently referred to by at least one NOTAM."""
+        return frozenset(self._postings[field])
@@ -0,0 +1,140 @@
+"""Reassembly of NOTAMs that were sent in several parts (A) ... PART n OF m) into single NOTAMs."""
+from __future__ import annotations
+
+import copy
+import re
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from . import Notam
+
+_part_regex = re.compile(r" PART [0-9]+ OF [0-9]+$")
+
+_ITEMS = ('a', 'b', 'c', 'd', 'e', 'f', 'g')
+
+
+def _strip_part(merged: "Notam") -> None:
+    """Removes the PART n OF m clause from item A) of the merged NOTAM's full_text, shifting the later indices."""
+    if merged.full_text is None or merged.indices_item_a is None:
+        return
+    (a_start, a_end) = merged.indices_item_a
+    m = _part_regex.search(merged.full_text, a_start, a_end)
+    if m is None:
+        return
+    merged.full_text = merged.full_text[:m.start()] + merged.full_text[m.end():]
+    shift = m.end() - m.start()
+    merged.indices_item_a = (a_start, a_end - shift)
+    for item in _ITEMS[1:]:
+        rng: Optional[Tuple[int, int]] = getattr(merged, 'indices_item_' + item)
+        if rng is not None and rng[0] >= m.end():
+            setattr(merged, 'indices_item_' + item, (rng[0] - shift, rng[1] - shift))
+
+
+def merge_parts(parts: List["Notam"]) -> "Notam":
+    """Merges the complete, ordered list of parts of a multi-part NOTAM into a single Notam.
+
+    The merged NOTAM takes items A) through D) from the first part, and F), G) and the CREATED/SOURCE trailers
+    from the last one. Its body is the concatenation of the parts' E) items, one per line. Its full_text is
+    the first part's text up to the end of its E) item, followed by the other parts' E) items and the
+    remainder of the last part's text, so that all indices_item_* remain valid for it. The PART clause is removed
+    from item A), so that the merged text parses as a single-part NOTAM."""
+    first, last = parts[0], parts[-1]
+    merged = copy.copy(first)
+    merged.part_number = merged.part_count = None
+    merged.location = list(first.location)
+    merged.traffic_type, merged.purpose, merged.scope = set(first.traffic_type), set(first.purpose), set(first.scope)
+    merged.area = dict(first.area)
+    bodies = [p.body or '' for p in parts]
+    merged.body = '\n'.join(bodies)
+    for f in ('limit_lower', 'limit_upper', 'source', 'created', 'indices_item_f', 'indices_item_g'):
+        setattr(merged, f, getattr(last, f))
+
+    if first.full_text is None or first.indices_item_e is None or last.full_text is None \
+            or last.indices_item_e is None:
+        merged.full_text = '\n'.join(p.full_text or '' for p in parts)
+        merged.indices_item_e = merged.indices_item_f = merged.indices_item_g = None
+        _strip_part(merged)
+        return merged
+
+    (e_start, e_end) = first.indices_item_e
+    head = first.full_text[:e_end] + ''.join('\n' + b for b in bodies[1:])
+    merged.full_text = head + last.full_text[last.indices_item_e[1]:]
+    merged.indices_item_e = (e_start, e_start + len(merged.body))
+    shift = len(head) - last.indices_item_e[1]
+    for f in ('indices_item_f', 'indices_item_g'):
+        rng: Optional[Tuple[int, int]] = getattr(last, f)
+        if rng is not None:
+            setattr(merged, f, (rng[0] + shift, rng[1] + shift))
+    _strip_part(merged)
+    return merged
+
+
+class PartReassembler(object):
+    """Buffers the parts of multi-part NOTAMs until all of them have arrived, then emits the merged NOTAM.
+
+    Parts are grouped by notam_id and may arrive in any order. At most max_pending incomplete NOTAMs are
+    buffered; when another one arrives, the one that has been waiting longest is evicted. If timeout (seconds,
+    as measured by 'clock') is given, incomplete NOTAMs waiting longer than that are dropped as well. Evicted
+    and expired parts are passed to on_incomplete, if given."""
+
+    def __init__(self, max_pending: int = 1024, timeout: Optional[float] = None,
+                 on_incomplete: Optional[Callable[[List["Notam"]], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_pending <= 0:
+            raise ValueError('max_pending must be positive')
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.on_incomplete = on_incomplete
+        self.clock = clock
+        # notam_id -> (arrival time of the first part, {part_number: part})
+        self._pending: OrderedDict[str, Tuple[float, Dict[int, "Notam"]]] = OrderedDict()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """Number of incomplete NOTAMs currently buffered."""
+        return len(self._pending)
+
+    def feed(self, notam: "Notam") -> Optional["Notam"]:
+        """Processes one incoming NOTAM. Returns it unchanged if it is not part of a multi-part NOTAM, the merged
+        NOTAM if it completes one, and None otherwise."""
+        self.expire()
+        if notam.part_count is None or notam.part_number is None or notam.part_count <= 1:
+            return notam
+        key = notam.notam_id or ''
+        entry = self._pending.get(key)
+        if entry is None:
+            if len(self._pending) >= self.max_pending:
+                self._drop(next(iter(self._pending)))
+            entry = self._pending[key] = (self.clock(), {})
+        parts = entry[1]
+        parts[notam.part_number] = notam
+        if len(parts) < notam.part_count or any(i not in parts for i in range(1, notam.part_count + 1)):
+            return None
+        del self._pending[key]
+        return merge_parts([parts[i] for i in range(1, notam.part_count + 1)])
+
+    def expire(self) -> None:
+        """Drops incomplete NOTAMs that have waited longer than the timeout."""
+        if self.timeout is None:
+            return
+        cutoff = self.clock() - self.timeout
+        while self._pending:
+            key, (arrival, _) = next(iter(self._pending.items()))
+            if arrival > cutoff:
+                break
+            self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        _, parts = self._pending.pop(key)
+        self.dropped += 1
+        if self.on_incomplete is not None:
+            self.on_incomplete([parts[i] for i in sorted(parts)])
+
+    def reassemble(self, notams: Iterable["Notam"]) -> Iterator["Notam"]:
+        """Lazily applies feed() to a stream of NOTAMs, yielding single-part and merged NOTAMs."""
+        for n in notams:
+            out = self.feed(n)
+            if out is not None:
+                yield out
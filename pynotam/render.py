@@ -0,0 +1,147 @@
+"""Rendering of NOTAMs as ICAO NOTAM text, from their structured fields.
+
+render() is the inverse of Notam.from_str: it writes the header, Q-line, items A) to G) and the CREATED/SOURCE
+trailers of a Notam in the layout the grammar of _parser.py accepts, such that parsing the text yields the same
+fields again. The text of the free-text items is written as is, so it must not itself contain what looks like
+the start of another item (e.g. a line starting with 'F) '); render(..., validate=True) checks that the text
+parses back to the same NOTAM.
+
+For bulk generation, iter_render() and write_notams() render any number of NOTAMs one at a time."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, TextIO, TypeVar
+
+from ._codes import FIELD_CODES
+
+if TYPE_CHECKING:
+    from . import Notam
+
+_T = TypeVar('_T')
+
+_TYPE_KEYWORDS = {'NEW': 'NOTAMN', 'REPLACE': 'NOTAMR', 'CANCEL': 'NOTAMC'}
+
+# meaning -> letter code, for each of the Q-line's code fields, in the order the letters must appear in.
+_LETTERS: Dict[str, Dict[str, str]] = {field: {m: c for (c, m) in codes.items()}
+                                       for (field, codes) in FIELD_CODES.items()}
+
+# Not strftime('%b'), which depends on the locale (see _parser.visit_month).
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc) if dt.tzinfo is not None else dt
+
+
+def _item_datetime(dt: datetime, field: str) -> str:
+    """Formats a datetime as in items B) and C), where the two-digit years 81 to 80 stand for 1981 to 2080."""
+    dt = _utc(dt)
+    if not 1981 <= dt.year <= 2080:
+        raise ValueError('{} {} cannot be written with a two-digit year'.format(field, dt.isoformat()))
+    return '{:02d}{:02d}{:02d}{:02d}{:02d}'.format(dt.year % 100, dt.month, dt.day, dt.hour, dt.minute)
+
+
+def _codes(field: str, values: Set[str]) -> str:
+    letters = _LETTERS[field]
+    unknown = values - letters.keys()
+    if unknown:
+        raise ValueError('unknown {}: {}'.format(field, ', '.join(sorted(unknown))))
+    if not values:
+        raise ValueError('NOTAM has no {}'.format(field))
+    return ''.join(c for (m, c) in letters.items() if m in values)
+
+
+def _required(field: str, v: Optional[_T]) -> _T:
+    if v is None or v == '' or v == []:
+        raise ValueError('cannot render a NOTAM without {}'.format(field))
+    return v
+
+
+def render(n: "Notam", validate: bool = False) -> str:
+    """Returns the NOTAM as ICAO NOTAM text. Raises ValueError if a field required by the format is missing or
+    cannot be represented. If validate is set, the text is also parsed again, and ValueError is raised unless
+    that gives the same NOTAM (by fingerprint), e.g. because a free-text item contains an item letter."""
+    notam_type = _required('notam_type', n.notam_type)
+    if notam_type not in _TYPE_KEYWORDS:
+        raise ValueError('unknown notam_type {!r}'.format(notam_type))
+    parts: List[str] = ['(', _required('notam_id', n.notam_id), ' ', _TYPE_KEYWORDS[notam_type]]
+    if notam_type != 'NEW':
+        parts += [' ', _required('ref_notam_id', n.ref_notam_id)]
+
+    area = n.area
+    if not area:
+        raise ValueError('cannot render a NOTAM without area')
+    if n.fl_lower is None or n.fl_upper is None:
+        raise ValueError('cannot render a NOTAM without fl_lower and fl_upper')
+    parts += ['\nQ) ', _required('fir', n.fir), '/', _required('notam_code', n.notam_code), '/',
+              _codes('traffic_type', n.traffic_type), '/', _codes('purpose', n.purpose), '/',
+              _codes('scope', n.scope), '/', '{:03d}/{:03d}/{}{}{:03d}'.format(
+                  n.fl_lower, n.fl_upper, area['lat'], area['long'], int(area['radius']))]
+
+    parts += ['\nA) ', ' '.join(_required('location', n.location))]
+    if n.part_number is not None and n.part_count is not None:
+        parts.append(' PART {} OF {}'.format(n.part_number, n.part_count))
+    parts += [' B) ', _item_datetime(_required('valid_from', n.valid_from), 'valid_from')]
+    till = n.valid_till
+    if till is not None:
+        if till.year == datetime.max.year:
+            parts.append(' C) PERM')
+        else:
+            parts += [' C) ', _item_datetime(till, 'valid_till')]
+            if getattr(till, 'is_estimated', False):
+                parts.append(' EST')
+
+    if n.schedule is not None:
+        parts += ['\nD) ', n.schedule]
+    parts += ['\nE) ', _required('body', n.body)]
+    if n.limit_lower is not None and n.limit_upper is not None:
+        parts += ['\nF) ', n.limit_lower, ' G) ', n.limit_upper]
+    elif n.limit_lower is not None or n.limit_upper is not None:
+        raise ValueError('items F) and G) must be given together')
+    if n.created is not None:
+        c = _utc(n.created)
+        parts.append('\nCREATED: {:02d} {} {:04d} {:02d}:{:02d}:{:02d}'.format(
+            c.day, _MONTHS[c.month - 1], c.year, c.hour, c.minute, c.second))
+    if n.source is not None:
+        parts += ['\nSOURCE: ', n.source]
+    parts.append(')')
+    text = ''.join(parts)
+
+    if validate:
+        _validate(n, text)
+    return text
+
+
+def _validate(n: "Notam", text: str) -> None:
+    from . import Notam
+    try:
+        parsed = Notam.from_str(text)
+    except Exception as e:
+        raise ValueError('rendered text of {} does not parse: {}'.format(n.notam_id, e)) from None
+    if parsed.fingerprint() != n.fingerprint() or parsed.source != n.source or parsed.created != _created(n):
+        raise ValueError('rendered text of {} does not parse back to the same NOTAM'.format(n.notam_id))
+
+
+def _created(n: "Notam") -> Optional[datetime]:
+    # The CREATED trailer has no time zone, and is read as UTC.
+    return _utc(n.created).replace(tzinfo=timezone.utc) if n.created is not None else None
+
+
+def iter_render(notams: Iterable["Notam"], validate: bool = False) -> Iterator[str]:
+    """Renders the NOTAMs one at a time (see render)."""
+    for n in notams:
+        yield render(n, validate)
+
+
+def write_notams(notams: Iterable["Notam"], out: TextIO, validate: bool = False, separator: str = '\n\n') -> int:
+    """Streams the rendered NOTAMs to 'out', separated by 'separator' (such that pynotam.batch.split_notams
+    splits them again). Returns the number of NOTAMs written."""
+    count = 0
+    for text in iter_render(notams, validate):
+        if count:
+            _ = out.write(separator)
+        _ = out.write(text)
+        count += 1
+    if count:
+        _ = out.write('\n')
+    return count
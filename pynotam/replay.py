@@ -0,0 +1,214 @@
+"""Replay of NOTAM feeds into a processing pipeline, for load and throughput testing.
+
+synthesize() produces an endless, realistic-looking feed from a corpus of NOTAM texts, by giving them fresh ids,
+validity periods and slightly moved areas, and by chaining NOTAMR/NOTAMC messages to earlier NOTAMs. replay()
+feeds texts into a pipeline (by default Notam.from_str) at a given rate, or at an accelerated pace of their
+original timestamps, and reports latency percentiles, throughput and memory use over time. Latency is measured
+from the time a message was due, so a pipeline that cannot keep up shows growing latencies."""
+from __future__ import annotations
+
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from . import Notam
+
+_header_regex = re.compile(r"^(\(?)[A-Z][0-9]{4}/[0-9]{2} NOTAM[NRC](?: [A-Z][0-9]{4}/[0-9]{2})?")
+_area_regex = re.compile(r"/([0-9]{2})([0-9]{2})([NS])([0-9]{3})([0-9]{2})([EW])([0-9]{3})\b")
+_date_regex = re.compile(r"\b([BC])\) ([0-9]{10})\b")
+
+_DATE_FORMAT = '%y%m%d%H%M'
+_DEFAULT_INTERVAL = timedelta(seconds=30)
+
+
+def _move_area(m: re.Match[str], rnd: random.Random) -> str:
+    (lat_d, lat_m, ns, lon_d, lon_m, ew, radius) = m.groups()
+    lat = (int(lat_d) * 60 + int(lat_m)) * (1 if ns == 'N' else -1) + rnd.randint(-30, 30)
+    lon = (int(lon_d) * 60 + int(lon_m)) * (1 if ew == 'E' else -1) + rnd.randint(-30, 30)
+    lat = max(-89 * 60, min(89 * 60, lat))
+    lon = (lon + 180 * 60) % (360 * 60) - 180 * 60
+    return '/{:02d}{:02d}{}{:03d}{:02d}{}{}'.format(abs(lat) // 60, abs(lat) % 60, 'N' if lat >= 0 else 'S',
+                                                    abs(lon) // 60, abs(lon) % 60, 'E' if lon >= 0 else 'W', radius)
+
+
+def synthesize(corpus: Sequence[str], start: Optional[datetime] = None, interval: timedelta = _DEFAULT_INTERVAL,
+               replace_rate: float = 0.1, cancel_rate: float = 0.05, seed: Optional[int] = None
+               ) -> Iterator[Tuple[datetime, str]]:
+    """Endlessly yields (timestamp, text) pairs of a synthetic feed, one every 'interval' on average from 'start'
+    (default: now). Every text is a NOTAM from the corpus with a fresh id, its validity moved to start some time
+    after the timestamp, and its Q-line area moved by up to half a degree. A share of them are NOTAMRs or NOTAMCs
+    referencing an earlier NOTAM of the feed that is still in effect."""
+    rnd = random.Random(seed)
+    texts = [t.strip() for t in corpus if _header_regex.match(t.strip())]
+    if not texts:
+        raise ValueError('the corpus contains no NOTAMs')
+    now = start if start is not None else datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    live: List[str] = []
+    counter = 0
+    while True:
+        now += interval * rnd.expovariate(1.0)
+        notam_id = '{}{:04d}/{:02d}'.format(chr(ord('A') + (counter // 9999) % 26), counter % 9999 + 1,
+                                            now.year % 100)
+        counter += 1
+        r = rnd.random()
+        if live and r < replace_rate + cancel_rate:
+            kind = 'R' if r < replace_rate else 'C'
+            header = '{} NOTAM{} {}'.format(notam_id, kind, live.pop(rnd.randrange(len(live))))
+        else:
+            kind = 'N'
+            header = '{} NOTAMN'.format(notam_id)
+        if kind != 'C':
+            live.append(notam_id)
+
+        text = _header_regex.sub(lambda m: m.group(1) + header, rnd.choice(texts), count=1)
+        text = _area_regex.sub(lambda m: _move_area(m, rnd), text, count=1)
+        text = _shift_dates(text, now + timedelta(minutes=rnd.randint(0, 48 * 60)))
+        yield (now, text)
+
+
+def _shift_dates(text: str, new_start: datetime) -> str:
+    """Moves B) to new_start, and C) (unless PERM) by the same amount."""
+    dates = {m.group(1): m for m in _date_regex.finditer(text)}
+    if 'B' not in dates:
+        return text
+    try:
+        shift = new_start - datetime.strptime(dates['B'].group(2), _DATE_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return text
+
+    def moved(m: re.Match[str]) -> str:
+        try:
+            dt = datetime.strptime(m.group(2), _DATE_FORMAT).replace(tzinfo=timezone.utc) + shift
+        except ValueError:
+            return m.group()
+        return '{}) {}'.format(m.group(1), dt.strftime(_DATE_FORMAT))
+    return _date_regex.sub(moved, text)
+
+
+def memory_usage() -> int:
+    """The resident memory of this process in bytes (its peak, where the current value is not available)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:  # pragma: no cover
+        return 0
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """The q'th percentile (0 <= q <= 100) of the sorted values, by the nearest-rank method; 0 if empty."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), int(-(-q * len(sorted_values) // 100))))
+    return sorted_values[rank - 1]
+
+
+class ReplaySample(NamedTuple):
+    """Statistics over one reporting interval of a replay. Latencies are in seconds."""
+
+    """Time since the start of the replay, in seconds."""
+    elapsed: float
+    """Messages processed (and failed) so far."""
+    processed: int
+    errors: int
+    """Messages per second during this interval."""
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    """Resident memory of the process, in bytes."""
+    memory: int
+
+
+class ReplayReport(NamedTuple):
+    """Statistics over a whole replay. Latencies are in seconds."""
+
+    processed: int
+    errors: int
+    elapsed: float
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    samples: List[ReplaySample]
+
+
+def replay(items: Iterable[Union[str, Tuple[datetime, str]]], sink: Callable[[str], Any] = Notam.from_str,
+           rate: Optional[float] = None, speedup: Optional[float] = None, limit: Optional[int] = None,
+           interval: float = 1.0, on_sample: Optional[Callable[[ReplaySample], None]] = None,
+           clock: Callable[[], float] = time.perf_counter, sleep: Callable[[float], None] = time.sleep
+           ) -> ReplayReport:
+    """Feeds texts (or (timestamp, text) pairs) into sink one at a time, and reports how it coped.
+
+    Messages are sent 'rate' per second if given; with 'speedup', they are sent at the pace of their timestamps,
+    that many times faster; otherwise as fast as the sink accepts them. At most 'limit' messages are sent. Every
+    'interval' seconds, a ReplaySample is passed to on_sample. Exceptions raised by the sink count as errors."""
+    if rate is not None and rate <= 0:
+        raise ValueError('rate must be positive')
+    if speedup is not None and speedup <= 0:
+        raise ValueError('speedup must be positive')
+    latencies: List[float] = []
+    window: List[float] = []
+    samples: List[ReplaySample] = []
+    processed = errors = 0
+    start = clock()
+    last_sample, last_processed = start, 0
+    first_ts: Optional[datetime] = None
+
+    def sample(now: float) -> None:
+        nonlocal last_sample, last_processed
+        window.sort()
+        s = ReplaySample(now - start, processed, errors, (processed - last_processed) / max(now - last_sample, 1e-9),
+                         percentile(window, 50), percentile(window, 95), percentile(window, 99), memory_usage())
+        samples.append(s)
+        if on_sample is not None:
+            on_sample(s)
+        window.clear()
+        last_sample, last_processed = now, processed
+
+    for (i, item) in enumerate(items):
+        if limit is not None and i >= limit:
+            break
+        if isinstance(item, tuple):
+            (ts, text) = item
+        else:
+            (ts, text) = (None, item)
+        if speedup is not None and ts is not None:
+            if first_ts is None:
+                first_ts = ts
+            due = start + (ts - first_ts).total_seconds() / speedup
+        elif rate is not None:
+            due = start + i / rate
+        else:
+            due = clock()
+        now = clock()
+        if due > now:
+            sleep(due - now)
+        try:
+            sink(text)
+        except Exception:
+            errors += 1
+        processed += 1
+        now = clock()
+        latency = max(0.0, now - due)
+        latencies.append(latency)
+        window.append(latency)
+        if now - last_sample >= interval:
+            sample(now)
+
+    end = clock()
+    if processed > last_processed:
+        sample(end)
+    latencies.sort()
+    elapsed = end - start
+    return ReplayReport(processed, errors, elapsed, processed / elapsed if elapsed > 0 else 0.0,
+                        percentile(latencies, 50), percentile(latencies, 95), percentile(latencies, 99),
+                        latencies[-1] if latencies else 0.0, samples)
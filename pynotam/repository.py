@@ -0,0 +1,279 @@
+"""Persistent storage of parsed NOTAMs in an SQLite database.
+
+The 'notams' table has one row per NOTAM, with a column for every Notam field (and its full text), so NOTAMs
+can be loaded back without parsing them again. A notam_id is only unique among the NOTAMs of one NOF, so rows are
+keyed by the issuer (the SOURCE of the NOTAM, or else its FIR) and the notam_id. A NOTAMR or NOTAMC does not
+delete the NOTAM it references but marks it as superseded, so the history remains queryable. Side tables hold the
+A) locations of each NOTAM and, in an R*Tree, the bounding box of its Q-line area of influence."""
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .geo import BoundingBox, area_center, bounding_box
+from .store import Query
+from .timeutils import EstimatedDateTime
+
+if TYPE_CHECKING:
+    from . import Notam
+
+DEFAULT_BATCH_SIZE = 1000
+
+_ITEMS = ('a', 'b', 'c', 'd', 'e', 'f', 'g')
+
+# Columns of the 'notams' table, besides the integer primary key 'id', 'issuer' and 'superseded_by'. The traffic type,
+# purpose and scope sets are stored comma-separated, the A) locations space-separated, and datetimes as seconds
+# since the epoch (UTC).
+COLUMNS = (
+    'notam_id', 'notam_type', 'ref_notam_id',
+    'fir', 'notam_code', 'traffic_type', 'purpose', 'scope', 'fl_lower', 'fl_upper',
+    'area_lat', 'area_long', 'area_radius',
+    'location', 'part_number', 'part_count',
+    'valid_from', 'valid_till', 'valid_till_estimated', 'valid_till_permanent',
+    'schedule', 'body', 'limit_lower', 'limit_upper', 'source', 'created',
+) + tuple('indices_item_{}_{}'.format(i, side) for i in _ITEMS for side in ('start', 'end')) + ('full_text',)
+
+_INTEGER_COLUMNS = {'fl_lower', 'fl_upper', 'area_radius', 'part_number', 'part_count', 'valid_from', 'valid_till',
+                    'valid_till_estimated', 'valid_till_permanent', 'created'} | \
+    {c for c in COLUMNS if c.startswith('indices_item_')}
+
+# The latest time that can be represented, standing in for PERM in range queries.
+_PERMANENT = int(datetime.max.replace(tzinfo=timezone.utc).timestamp())
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notams (
+    id INTEGER PRIMARY KEY,
+    issuer TEXT NOT NULL,
+    {columns},
+    superseded_by TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS notams_issuer_notam_id ON notams (issuer, notam_id);
+CREATE INDEX IF NOT EXISTS notams_notam_id ON notams (notam_id);
+CREATE INDEX IF NOT EXISTS notams_ref_notam_id ON notams (issuer, ref_notam_id);
+CREATE INDEX IF NOT EXISTS notams_fir ON notams (fir);
+CREATE INDEX IF NOT EXISTS notams_notam_code ON notams (notam_code);
+CREATE INDEX IF NOT EXISTS notams_validity ON notams (valid_from, valid_till);
+CREATE TABLE IF NOT EXISTS notam_locations (
+    id INTEGER NOT NULL,
+    location TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notam_locations_location ON notam_locations (location);
+CREATE INDEX IF NOT EXISTS notam_locations_id ON notam_locations (id);
+CREATE VIRTUAL TABLE IF NOT EXISTS notam_areas USING rtree (id, min_lat, max_lat, min_lon, max_lon);
+""".format(columns=',\n    '.join('{} {}'.format(c, 'INTEGER' if c in _INTEGER_COLUMNS else 'TEXT') +
+                                   (' NOT NULL' if c == 'notam_id' else '') for c in COLUMNS))
+
+# An upsert keeps the row's id (and thus its R*Tree entry). A NOTAM arriving after the NOTAMR/NOTAMC referencing
+# it (from the same issuer) is marked as superseded right away.
+_UPSERT = """
+INSERT INTO notams (issuer, {columns}, superseded_by)
+VALUES (?, {params}, (SELECT r.notam_id FROM notams r
+                      WHERE r.issuer = ? AND r.ref_notam_id = ? AND r.notam_type IN ('REPLACE', 'CANCEL') LIMIT 1))
+ON CONFLICT (issuer, notam_id) DO UPDATE SET {updates}
+""".format(columns=', '.join(COLUMNS), params=', '.join('?' * len(COLUMNS)),
+           updates=', '.join('{0} = excluded.{0}'.format(c) for c in COLUMNS[1:]))
+
+
+def _timestamp(dt: Optional[datetime]) -> Optional[int]:
+    return int(dt.timestamp()) if dt is not None else None
+
+
+def _datetime(ts: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(ts, timezone.utc) if ts is not None else None
+
+
+def _issuer(n: "Notam") -> str:
+    return n.source or n.fir or ''
+
+
+def _row(n: "Notam") -> Tuple[Any, ...]:
+    area = n.area or {}
+    till = n.valid_till
+    permanent = till is not None and till.year == datetime.max.year
+    indices: List[Optional[int]] = []
+    for i in _ITEMS:
+        rng = getattr(n, 'indices_item_{}'.format(i))
+        indices.extend(rng if rng is not None else (None, None))
+    return (n.notam_id, n.notam_type, n.ref_notam_id,
+            n.fir, n.notam_code, ','.join(sorted(n.traffic_type)), ','.join(sorted(n.purpose)),
+            ','.join(sorted(n.scope)), n.fl_lower, n.fl_upper,
+            area.get('lat'), area.get('long'), area.get('radius'),
+            ' '.join(n.location), n.part_number, n.part_count,
+            _timestamp(n.valid_from), _PERMANENT if permanent else _timestamp(till),
+            int(getattr(till, 'is_estimated', False)), int(permanent),
+            n.schedule, n.body, n.limit_lower, n.limit_upper, n.source, _timestamp(n.created),
+            *indices, n.full_text)
+
+
+def _notam(row: Sequence[Any]) -> "Notam":
+    from . import Notam
+    v = dict(zip(COLUMNS, row))
+    n = Notam()
+    for f in ('notam_id', 'notam_type', 'ref_notam_id', 'fir', 'notam_code', 'fl_lower', 'fl_upper',
+              'part_number', 'part_count', 'schedule', 'body', 'limit_lower', 'limit_upper', 'source', 'full_text'):
+        setattr(n, f, v[f])
+    for f in ('traffic_type', 'purpose', 'scope'):
+        setattr(n, f, set(v[f].split(',')) if v[f] else set())
+    n.location = v['location'].split()
+    if v['area_radius'] is not None:
+        n.area = {'lat': v['area_lat'], 'long': v['area_long'], 'radius': v['area_radius']}
+    n.valid_from = _datetime(v['valid_from'])
+    n.created = _datetime(v['created'])
+    if v['valid_till_permanent']:
+        n.valid_till = datetime.max.replace(tzinfo=timezone.utc)
+    else:
+        n.valid_till = _datetime(v['valid_till'])
+    if n.valid_till is not None and v['valid_till_estimated']:
+        n.valid_till = EstimatedDateTime(n.valid_till)
+    for i in _ITEMS:
+        start = v['indices_item_{}_start'.format(i)]
+        if start is not None:
+            setattr(n, 'indices_item_{}'.format(i), (start, v['indices_item_{}_end'.format(i)]))
+    return n
+
+
+def _key_condition(issuer: Optional[str]) -> str:
+    return 'notam_id = ?' if issuer is None else 'issuer = ? AND notam_id = ?'
+
+
+def _key_params(notam_id: str, issuer: Optional[str]) -> Tuple[str, ...]:
+    return (notam_id,) if issuer is None else (issuer, notam_id)
+
+
+def _code_range(prefix: str) -> Tuple[str, str]:
+    """The [low, high) range of strings starting with prefix, so that an index on the column can be used."""
+    return (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+class NotamRepository(object):
+    """A database of NOTAMs, at 'path' (a file name, or ':memory:').
+
+    Writes are batched: upsert() stores NOTAMs in transactions of batch_size rows each, using executemany. Use as
+    a context manager, or call close(), to close the database."""
+
+    def __init__(self, path: str = ':memory:', batch_size: int = DEFAULT_BATCH_SIZE):
+        if batch_size <= 0:
+            raise ValueError('batch_size must be positive')
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(path)
+        if path != ':memory:':
+            _ = self._db.execute('PRAGMA journal_mode = WAL')
+            _ = self._db.execute('PRAGMA synchronous = NORMAL')
+        _ = self._db.executescript(_SCHEMA)
+
+    def __enter__(self) -> NotamRepository:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT count(*) FROM notams').fetchone()[0]
+
+    def upsert(self, notams: Iterable["Notam"]) -> int:
+        """Stores the given NOTAMs, replacing stored NOTAMs with the same issuer and notam_id. A NOTAMR or NOTAMC
+        marks the NOTAM it references (from the same issuer) as superseded (see active()). Returns the number of
+        NOTAMs stored."""
+        count = 0
+        it = iter(notams)
+        while True:
+            batch = list(islice(it, self.batch_size))
+            if not batch:
+                return count
+            if any(n.notam_id is None for n in batch):
+                raise ValueError('cannot store a NOTAM without a notam_id')
+            with self._db:  # one transaction per batch
+                self._write(batch)
+            count += len(batch)
+
+    def _write(self, batch: List["Notam"]) -> None:
+        db = self._db
+        keys = [(_issuer(n), n.notam_id) for n in batch]
+        _ = db.executemany(_UPSERT, [(_issuer(n),) + _row(n) + (_issuer(n), n.notam_id) for n in batch])
+        _ = db.executemany("UPDATE notams SET superseded_by = ? WHERE issuer = ? AND notam_id = ?",
+                           [(n.notam_id, _issuer(n), n.ref_notam_id) for n in batch
+                            if n.notam_type in ('REPLACE', 'CANCEL') and n.ref_notam_id is not None])
+
+        _ = db.executemany("""
+            DELETE FROM notam_locations WHERE id = (SELECT id FROM notams WHERE issuer = ? AND notam_id = ?)
+            """, keys)
+        _ = db.executemany("""
+            INSERT INTO notam_locations (id, location)
+            SELECT id, ? FROM notams WHERE issuer = ? AND notam_id = ?
+            """, [(loc, _issuer(n), n.notam_id) for n in batch for loc in dict.fromkeys(n.location)])
+
+        _ = db.executemany("""
+            DELETE FROM notam_areas WHERE id = (SELECT id FROM notams WHERE issuer = ? AND notam_id = ?)
+            """, keys)
+        areas = []
+        for n in batch:
+            center = area_center(n)
+            if center is not None:
+                (min_lat, min_lon, max_lat, max_lon) = bounding_box(center, int(n.area['radius']))
+                areas.append((min_lat, max_lat, min_lon, max_lon, _issuer(n), n.notam_id))
+        _ = db.executemany("""
+            INSERT INTO notam_areas (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT id, ?, ?, ?, ? FROM notams WHERE issuer = ? AND notam_id = ?
+            """, areas)
+
+    def get(self, notam_id: str, issuer: Optional[str] = None) -> Optional["Notam"]:
+        """The NOTAM with the given id. If NOTAMs from several issuers have this id, issuer (the SOURCE of the
+        NOTAM, or else its FIR) selects one of them; otherwise the first one stored is returned."""
+        row = self._db.execute('SELECT {} FROM notams WHERE {} ORDER BY id LIMIT 1'.format(
+            ', '.join(COLUMNS), _key_condition(issuer)), _key_params(notam_id, issuer)).fetchone()
+        return _notam(row) if row is not None else None
+
+    def superseded_by(self, notam_id: str, issuer: Optional[str] = None) -> Optional[str]:
+        """The id of the NOTAMR or NOTAMC that replaced or cancelled the given NOTAM (see get()), if any."""
+        row = self._db.execute('SELECT superseded_by FROM notams WHERE {} ORDER BY id LIMIT 1'.format(
+            _key_condition(issuer)), _key_params(notam_id, issuer)).fetchone()
+        return row[0] if row is not None else None
+
+    def query(self, query: Optional[Query] = None, bbox: Optional[BoundingBox] = None,
+              include_superseded: bool = False) -> List["Notam"]:
+        """Returns the stored NOTAMs matching the query (default: all), ordered by notam_id. Unless
+        include_superseded is set, only NOTAMs in effect are considered: not replaced or cancelled, and not NOTAMCs
+        themselves. If bbox (min_lat, min_lon, max_lat, max_lon) is given, the bounding box of a NOTAM's area must
+        intersect it."""
+        return list(self._select(query if query is not None else Query(), bbox, include_superseded))
+
+    def active(self) -> Iterator["Notam"]:
+        """Lazily iterates over all NOTAMs in effect, e.g. to restore a NotamStore after a restart."""
+        return self._select(Query(), None, False)
+
+    def _select(self, query: Query, bbox: Optional[BoundingBox], include_superseded: bool) -> Iterator["Notam"]:
+        where: List[str] = []
+        params: List[Any] = []
+        if not include_superseded:
+            where.append("superseded_by IS NULL AND notam_type IS NOT 'CANCEL'")
+        if query.locations:
+            where.append('id IN (SELECT id FROM notam_locations WHERE location IN ({}))'.format(
+                ', '.join('?' * len(query.locations))))
+            params.extend(query.locations)
+        if query.firs:
+            where.append('fir IN ({})'.format(', '.join('?' * len(query.firs))))
+            params.extend(query.firs)
+        if query.code_prefix:
+            where.append('notam_code >= ? AND notam_code < ?')
+            params.extend(_code_range(query.code_prefix))
+        if query.active_till is not None:
+            where.append('(valid_from IS NULL OR valid_from <= ?)')
+            params.append(_timestamp(query.active_till))
+        if query.active_from is not None:
+            where.append('(valid_till IS NULL OR valid_till >= ?)')
+            params.append(_timestamp(query.active_from))
+        if bbox is not None:
+            (min_lat, min_lon, max_lat, max_lon) = bbox
+            where.append("""
+                id IN (SELECT id FROM notam_areas
+                       WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?)
+                """)
+            params.extend((min_lat, max_lat, min_lon, max_lon))
+        sql = 'SELECT {} FROM notams{} ORDER BY notam_id, issuer'.format(
+            ', '.join(COLUMNS), ' WHERE ' + ' AND '.join(where) if where else '')
+        return (_notam(row) for row in self._db.execute(sql, params))
@@ -0,0 +1,342 @@
+"""Publication of a parsed NOTAM set to other processes through shared memory.
+
+A SharedNotamPublisher serializes a set of Notams once, into a shared memory segment holding one flat array per
+field plus a heap of UTF-8 strings. Any number of processes can then attach a SharedNotamReader by name and access
+the set through read-only, zero-copy views of that segment, so that memory use does not grow with the number of
+reading processes.
+
+Every publish() creates a new segment (a "generation"); the name of the current generation is held in a small
+control segment, which the publisher updates only once the new segment is completely written. Readers thus always
+see either the previous or the new snapshot in its entirety, and pick up new generations on their next
+SharedNotamReader.snapshot() call."""
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Literal, Optional, Sequence, Tuple, overload
+
+from typing_extensions import override
+
+from ._codes import decode_flags, encode_flags
+from .timeutils import EstimatedDateTime
+
+if TYPE_CHECKING:
+    from . import Notam
+
+_MAGIC = b'NTSM'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHQQ')  # magic, version, reserved, number of NOTAMs, heap size
+_CONTROL = struct.Struct('<Q')  # current generation
+
+# The array typecodes of the columns.
+_Typecode = Literal['I', 'h', 'i', 'q', 'Q']
+
+STRING_FIELDS = ('notam_id', 'notam_type', 'ref_notam_id', 'fir', 'notam_code', 'area_lat', 'area_long',
+                 'location', 'schedule', 'body', 'limit_lower', 'limit_upper', 'source', 'full_text')
+_ITEMS = ('a', 'b', 'c', 'd', 'e', 'f', 'g')
+
+# Fixed-width columns and their array typecodes. A NOTAM's location list is stored as a single space-separated
+# string; its traffic type, purpose and scope sets as bitflags (see _codes), along with the FLAG_* bits below.
+INT_COLUMNS: Tuple[Tuple[str, _Typecode], ...] = (
+    ('flags', 'I'), ('nulls', 'I'),
+    ('fl_lower', 'h'), ('fl_upper', 'h'), ('area_radius', 'h'), ('part_number', 'h'), ('part_count', 'h'),
+    ('valid_from', 'q'), ('valid_till', 'q'), ('created', 'q'),
+    *[('indices_item_{}_{}'.format(i, side), 'i') for i in _ITEMS for side in ('start', 'end')],
+)
+
+FLAG_ESTIMATED = 1 << 16
+FLAG_PERMANENT = 1 << 17
+
+# Bit i of the 'nulls' column is set if the i'th of these fields is None.
+_NULLABLE = STRING_FIELDS + ('fl_lower', 'fl_upper', 'area_radius', 'part_number', 'part_count',
+                             'valid_from', 'valid_till', 'created') + \
+    tuple('indices_item_{}'.format(i) for i in _ITEMS)
+_NULL_BIT = {f: 1 << i for (i, f) in enumerate(_NULLABLE)}
+
+
+def _layout(count: int) -> Tuple[Dict[str, Tuple[int, _Typecode, int]], int]:
+    """Returns the {column: (offset, typecode, length)} layout of a segment holding 'count' NOTAMs, and the
+    offset of the string heap that follows the columns."""
+    cols: Dict[str, Tuple[int, _Typecode, int]] = {}
+    offset = _HEADER.size
+    columns: List[Tuple[str, _Typecode]] = [*INT_COLUMNS, *[('{}_offsets'.format(f), 'Q') for f in STRING_FIELDS]]
+    for (name, typecode) in columns:
+        length = count + 1 if name.endswith('_offsets') else count
+        offset = (offset + 7) & ~7
+        cols[name] = (offset, typecode, length)
+        offset += length * array(typecode).itemsize
+    return cols, offset
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches an existing segment without handing its ownership to this process' resource tracker, which would
+    otherwise unlink it when this process exits."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name)
+    # The tracker knows the segment by its POSIX name, with the leading slash that shm.name leaves out.
+    resource_tracker.unregister('/' + shm.name, 'shared_memory')
+    return shm
+
+
+def _buffer(shm: shared_memory.SharedMemory) -> memoryview:
+    """The memory of a segment, which is only available until it is closed."""
+    buf = shm.buf
+    if buf is None:
+        raise ValueError('shared memory segment {} is closed'.format(shm.name))
+    return buf
+
+
+def _timestamp(dt: Optional[datetime]) -> int:
+    return int(dt.timestamp()) if dt is not None else 0
+
+
+def _serialize(notams: Sequence["Notam"]) -> Tuple[Dict[str, array[int]], List[bytes]]:
+    cols: Dict[str, array[int]] = {name: array(typecode) for (name, typecode) in INT_COLUMNS}
+    strings: Dict[str, List[bytes]] = {f: [] for f in STRING_FIELDS}
+    for n in notams:
+        area = n.area or {}
+        values: Dict[str, Any] = {
+            'notam_id': n.notam_id, 'notam_type': n.notam_type, 'ref_notam_id': n.ref_notam_id, 'fir': n.fir,
+            'notam_code': n.notam_code, 'area_lat': area.get('lat'), 'area_long': area.get('long'),
+            'location': ' '.join(n.location) if n.location else None, 'schedule': n.schedule, 'body': n.body,
+            'limit_lower': n.limit_lower, 'limit_upper': n.limit_upper, 'source': n.source,
+            'full_text': n.full_text, 'fl_lower': n.fl_lower, 'fl_upper': n.fl_upper,
+            'area_radius': area.get('radius'), 'part_number': n.part_number, 'part_count': n.part_count,
+            'valid_from': n.valid_from, 'valid_till': n.valid_till, 'created': n.created,
+        }
+        values.update({'indices_item_{}'.format(i): getattr(n, 'indices_item_{}'.format(i)) for i in _ITEMS})
+
+        nulls = 0
+        for (f, bit) in _NULL_BIT.items():
+            if values[f] is None:
+                nulls |= bit
+        flags = encode_flags(n.traffic_type, n.purpose, n.scope)
+        till = n.valid_till
+        if till is not None:
+            if getattr(till, 'is_estimated', False):
+                flags |= FLAG_ESTIMATED
+            if till.year == datetime.max.year:
+                flags |= FLAG_PERMANENT
+                till = None
+
+        cols['flags'].append(flags)
+        cols['nulls'].append(nulls)
+        for f in ('fl_lower', 'fl_upper', 'area_radius', 'part_number', 'part_count'):
+            cols[f].append(int(values[f] or 0))
+        cols['valid_from'].append(_timestamp(n.valid_from))
+        cols['valid_till'].append(_timestamp(till))
+        cols['created'].append(_timestamp(n.created))
+        for i in _ITEMS:
+            rng = values['indices_item_{}'.format(i)] or (-1, -1)
+            cols['indices_item_{}_start'.format(i)].append(rng[0])
+            cols['indices_item_{}_end'.format(i)].append(rng[1])
+        for f in STRING_FIELDS:
+            v = values[f]
+            strings[f].append(v.encode() if isinstance(v, str) else b'')
+
+    heap: List[bytes] = []
+    pos = 0
+    for f in STRING_FIELDS:
+        offsets = array('Q', [pos])
+        for b in strings[f]:
+            pos += len(b)
+            offsets.append(pos)
+            heap.append(b)
+        cols['{}_offsets'.format(f)] = offsets
+    return cols, heap
+
+
+class SharedNotamSet(Sequence["Notam"]):
+    """A read-only view of one published generation of a NOTAM set.
+
+    Individual NOTAMs are materialized as Notam objects on access; column() provides zero-copy access to the
+    fixed-width columns (e.g. for vectorized filtering) without materializing anything."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, generation: int):
+        self.generation = generation
+        self._shm = shm
+        self._buf = _buffer(shm).toreadonly()
+        magic, version, _, count, heap_size = _HEADER.unpack_from(self._buf)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('{} is not a version {} NOTAM set segment'.format(shm.name, _VERSION))
+        self._count = count
+        layout, heap_start = _layout(count)
+        self._columns = {name: self._buf[off:off + length * array(tc).itemsize].cast(tc)
+                         for (name, (off, tc, length)) in layout.items()}
+        self._heap = self._buf[heap_start:heap_start + heap_size]
+
+    @override
+    def __len__(self) -> int:
+        return self._count
+
+    def column(self, name: str) -> memoryview[int]:
+        """Returns a read-only, zero-copy view of one of INT_COLUMNS (or of the '<field>_offsets' array of one of
+        STRING_FIELDS into the string heap)."""
+        return self._columns[name]
+
+    @property
+    def heap(self) -> memoryview:
+        """A read-only, zero-copy view of the string heap, which the '<field>_offsets' columns index into."""
+        return self._heap
+
+    @staticmethod
+    def null_bit(field: str) -> int:
+        """The bit of the 'nulls' column that is set where a field (one of STRING_FIELDS, or a nullable int column
+        such as 'fl_lower' or 'valid_till') is None."""
+        return _NULL_BIT[field]
+
+    def string(self, field: str, i: int) -> Optional[str]:
+        """Returns the value of one of STRING_FIELDS for the i'th NOTAM."""
+        if self._columns['nulls'][i] & _NULL_BIT[field]:
+            return None
+        offsets = self._columns['{}_offsets'.format(field)]
+        return str(self._heap[offsets[i]:offsets[i + 1]], 'utf-8')
+
+    def _datetime(self, column: str, i: int) -> Optional[datetime]:
+        if self._columns['nulls'][i] & _NULL_BIT[column]:
+            return None
+        return datetime.fromtimestamp(self._columns[column][i], timezone.utc)
+
+    def _notam(self, i: int) -> "Notam":
+        from . import Notam
+        cols, nulls = self._columns, self._columns['nulls'][i]
+        n = Notam()
+        for f in STRING_FIELDS:
+            if f not in ('area_lat', 'area_long', 'location'):
+                setattr(n, f, self.string(f, i))
+        location = self.string('location', i)
+        n.location = location.split(' ') if location is not None else []
+        flags = cols['flags'][i]
+        n.traffic_type, n.purpose, n.scope = decode_flags(flags)
+        for f in ('fl_lower', 'fl_upper', 'part_number', 'part_count'):
+            setattr(n, f, None if nulls & _NULL_BIT[f] else cols[f][i])
+        if not nulls & _NULL_BIT['area_radius']:
+            n.area = {'lat': self.string('area_lat', i) or '', 'long': self.string('area_long', i) or '',
+                      'radius': cols['area_radius'][i]}
+        n.valid_from = self._datetime('valid_from', i)
+        n.created = self._datetime('created', i)
+        if flags & FLAG_PERMANENT:
+            n.valid_till = datetime.max.replace(tzinfo=timezone.utc)
+        else:
+            n.valid_till = self._datetime('valid_till', i)
+        if n.valid_till is not None and flags & FLAG_ESTIMATED:
+            n.valid_till = EstimatedDateTime(n.valid_till)
+        for item in _ITEMS:
+            if not nulls & _NULL_BIT['indices_item_{}'.format(item)]:
+                setattr(n, 'indices_item_{}'.format(item),
+                        (cols['indices_item_{}_start'.format(item)][i], cols['indices_item_{}_end'.format(item)][i]))
+        return n
+
+    @overload
+    def __getitem__(self, i: int) -> "Notam": ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List["Notam"]: ...
+
+    @override
+    def __getitem__(self, i: int | slice) -> "Notam" | List["Notam"]:
+        if isinstance(i, slice):
+            return [self._notam(j) for j in range(*i.indices(self._count))]
+        index = i + self._count if i < 0 else i
+        if not 0 <= index < self._count:
+            raise IndexError('NOTAM index out of range')
+        return self._notam(index)
+
+    @override
+    def __iter__(self) -> Iterator["Notam"]:
+        return (self._notam(i) for i in range(self._count))
+
+    def close(self) -> None:
+        """Detaches from the segment. The view (but not Notams materialized from it) is unusable afterwards."""
+        for mv in self._columns.values():
+            mv.release()
+        self._heap.release()
+        self._buf.release()
+        self._shm.close()
+
+
+class SharedNotamPublisher(object):
+    """Publishes successive snapshots of a NOTAM set under 'name'. Only one publisher may exist per name."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.generation = 0
+        self._control = shared_memory.SharedMemory(name, create=True, size=_CONTROL.size)
+        _CONTROL.pack_into(_buffer(self._control), 0, 0)
+        self._segments: List[shared_memory.SharedMemory] = []
+
+    def publish(self, notams: Sequence["Notam"]) -> int:
+        """Writes the NOTAMs into a new segment and makes it the current generation, which is returned.
+        Segments older than the previous generation are unlinked; processes still attached to them keep
+        their mapping until they detach."""
+        cols, heap = _serialize(notams)
+        layout, heap_start = _layout(len(notams))
+        heap_size = sum(len(b) for b in heap)
+        generation = self.generation + 1
+        shm = shared_memory.SharedMemory('{}.{}'.format(self.name, generation), create=True,
+                                         size=max(1, heap_start + heap_size))
+        buf = _buffer(shm)
+        _HEADER.pack_into(buf, 0, _MAGIC, _VERSION, 0, len(notams), heap_size)
+        for (name, (off, _, _)) in layout.items():
+            data = cols[name].tobytes()
+            buf[off:off + len(data)] = data
+        pos = heap_start
+        for b in heap:
+            buf[pos:pos + len(b)] = b
+            pos += len(b)
+        del buf
+
+        # The generation is switched with a single aligned 8-byte store, after the segment is complete.
+        _CONTROL.pack_into(_buffer(self._control), 0, generation)
+        self.generation = generation
+        self._segments.append(shm)
+        while len(self._segments) > 2:
+            old = self._segments.pop(0)
+            old.close()
+            old.unlink()
+        return generation
+
+    def close(self) -> None:
+        """Unlinks all segments published under this name."""
+        for shm in self._segments + [self._control]:
+            shm.close()
+            shm.unlink()
+        self._segments = []
+
+
+class SharedNotamReader(object):
+    """Attaches to the NOTAM set published under 'name'."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._control = _attach(name)
+        self._current: Optional[SharedNotamSet] = None
+
+    def snapshot(self) -> SharedNotamSet:
+        """Returns a view of the most recently published generation. If a newer generation than the one
+        returned by the previous call is available, the previous view is closed and the new one attached."""
+        while True:
+            generation, = _CONTROL.unpack_from(_buffer(self._control))
+            if generation == 0:
+                raise LookupError('nothing has been published under {!r} yet'.format(self.name))
+            if self._current is not None and self._current.generation == generation:
+                return self._current
+            try:
+                shm = _attach('{}.{}'.format(self.name, generation))
+            except FileNotFoundError:
+                continue  # superseded (and unlinked) in the meantime; retry with the newest generation
+            if self._current is not None:
+                self._current.close()
+            self._current = SharedNotamSet(shm, generation)
+            return self._current
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        self._control.close()
@@ -0,0 +1,130 @@
+"""Incrementally maintained statistics over the NOTAMs in effect, e.g. for dashboards.
+
+NotamStats keeps a counter per dimension (FIR, Q-code subject, traffic type, ...) and an hourly histogram of
+validity start times. Every NOTAM applied to it updates those counters by the few keys it contributes, and a
+NOTAMR or NOTAMC takes back the contribution of the NOTAM it references, so reads never need to iterate over
+NOTAMs. Aggregates built by several workers over disjoint parts of a feed can be merged."""
+from __future__ import annotations
+
+from datetime import datetime
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, Mapping, Set, Tuple, cast
+
+if TYPE_CHECKING:
+    from . import Notam
+
+DIMENSIONS = ('fir', 'subject', 'condition', 'traffic_type', 'purpose', 'scope', 'hour')
+"""fir: the Q-line FIR; subject/condition: the second/third and fourth/fifth letters of the NOTAM code (e.g. 'MR',
+runway, and 'LC', closed, for QMRLC); traffic_type/purpose/scope: each of the NOTAM's codes (a NOTAM counts once
+under each of them); hour: the start of validity, truncated to the hour."""
+
+_Key = Tuple[str, Hashable]
+
+
+def _keys(notam: "Notam") -> Tuple[_Key, ...]:
+    keys: List[_Key] = []
+    if notam.fir is not None:
+        keys.append(('fir', notam.fir))
+    code = notam.notam_code
+    if code is not None and len(code) == 5:
+        keys.append(('subject', code[1:3]))
+        keys.append(('condition', code[3:5]))
+    keys.extend(('traffic_type', t) for t in notam.traffic_type)
+    keys.extend(('purpose', p) for p in notam.purpose)
+    keys.extend(('scope', s) for s in notam.scope)
+    if notam.valid_from is not None:
+        keys.append(('hour', notam.valid_from.replace(minute=0, second=0, microsecond=0)))
+    return tuple(keys)
+
+
+class NotamStats(object):
+    """Counters over the NOTAMs in effect, maintained from a stream of NEW/REPLACE/CANCEL NOTAMs."""
+
+    def __init__(self, notams: Iterable["Notam"] = ()):
+        self._counts: Dict[str, Dict[Hashable, int]] = {d: {} for d in DIMENSIONS}
+        # notam_id -> the keys it contributes to
+        self._contributions: Dict[str, Tuple[_Key, ...]] = {}
+        # Ids of the NOTAMs replaced or cancelled by the NOTAMRs and NOTAMCs applied that were not counted here, so
+        # that merge() can take them back from aggregates built over other parts of the feed. A NOTAM taken back
+        # here is in no other part, so this only grows with the references across parts.
+        self._retired: Set[str] = set()
+        for n in notams:
+            self.apply(n)
+
+    def __len__(self) -> int:
+        """Number of NOTAMs counted."""
+        return len(self._contributions)
+
+    def _count(self, keys: Tuple[_Key, ...], delta: int) -> None:
+        for (dim, key) in keys:
+            counts = self._counts[dim]
+            c = counts.get(key, 0) + delta
+            if c:
+                counts[key] = c
+            else:
+                del counts[key]
+
+    def add(self, notam: "Notam") -> None:
+        """Counts the NOTAM under its notam_id, replacing any previous NOTAM with the same id."""
+        if notam.notam_id is None:
+            raise ValueError('cannot count a NOTAM without a notam_id')
+        _ = self.discard(notam.notam_id)
+        keys = _keys(notam)
+        self._contributions[notam.notam_id] = keys
+        self._count(keys, 1)
+
+    def discard(self, notam_id: str) -> bool:
+        """Takes back the contribution of the NOTAM with the given id. Returns whether it was counted."""
+        keys = self._contributions.pop(notam_id, None)
+        if keys is None:
+            return False
+        self._count(keys, -1)
+        return True
+
+    def apply(self, notam: "Notam") -> None:
+        """Updates the statistics with a newly received NOTAM: a NOTAMR replaces the NOTAM it references, and a
+        NOTAMC removes it (a NOTAMC is not counted itself)."""
+        if notam.notam_type in ('REPLACE', 'CANCEL') and notam.ref_notam_id is not None:
+            if not self.discard(notam.ref_notam_id):
+                self._retired.add(notam.ref_notam_id)
+        if notam.notam_type != 'CANCEL':
+            self.add(notam)
+
+    def counts(self, dimension: str) -> Mapping[Hashable, int]:
+        """A read-only, live view of the counter for one of DIMENSIONS."""
+        return MappingProxyType(self._counts[dimension])
+
+    def count(self, dimension: str, key: Hashable) -> int:
+        return self._counts[dimension].get(key, 0)
+
+    def histogram(self, start: datetime, end: datetime) -> List[Tuple[datetime, int]]:
+        """The number of NOTAMs whose validity starts in each hour in [start, end), in chronological order
+        (omitting empty hours)."""
+        hours = cast(Dict[datetime, int], self._counts['hour'])
+        return sorted((h, c) for (h, c) in hours.items() if start <= h < end)
+
+    def snapshot(self) -> Dict[str, Dict[Hashable, int]]:
+        """A copy of all counters, e.g. for serialization."""
+        return {d: dict(c) for (d, c) in self._counts.items()}
+
+    def merge(self, other: NotamStats) -> None:
+        """Adds the NOTAMs counted by another aggregate, typically one built by a worker over another part of a
+        feed. A NOTAM counted by both is counted as in 'other'. NOTAMs replaced or cancelled in either part are not
+        counted, even if the NOTAMR or NOTAMC was applied to the other aggregate."""
+        for notam_id in other._retired:
+            _ = self.discard(notam_id)
+        self._retired |= other._retired
+        for (notam_id, keys) in other._contributions.items():
+            if notam_id in self._retired:
+                continue
+            _ = self.discard(notam_id)
+            self._contributions[notam_id] = keys
+            self._count(keys, 1)
+
+    @classmethod
+    def merged(cls, parts: Iterable[NotamStats]) -> NotamStats:
+        """A new aggregate combining the given ones."""
+        result = cls()
+        for p in parts:
+            result.merge(p)
+        return result
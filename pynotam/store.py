@@ -0,0 +1,272 @@
+"""Stores of the currently effective NOTAMs, queryable by time, location and NOTAM code.
+
+NotamStore holds its NOTAMs in the calling process. ShardedNotamStore partitions them across several local
+worker processes, each running a NotamStore, by FIR or by a hash of the notam_id: updates are routed to the
+shard owning the NOTAM, and queries are scattered to all shards that may hold matching NOTAMs, run there in
+parallel, and their results merged."""
+from __future__ import annotations
+
+import multiprocessing
+import zlib
+from datetime import datetime
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .index import LocationIndex
+
+if TYPE_CHECKING:
+    from . import Notam
+
+
+class Query(NamedTuple):
+    """Selects the NOTAMs satisfying every criterion that is set (not None/empty)."""
+
+    """The NOTAM's A) location must include one of these."""
+    locations: Sequence[str] = ()
+    """The NOTAM's Q-line FIR must be one of these."""
+    firs: Sequence[str] = ()
+    """Prefix of the NOTAM code, e.g. 'QMR' for any runway NOTAM."""
+    code_prefix: Optional[str] = None
+    """The NOTAM must be in effect at some time between these two."""
+    active_from: Optional[datetime] = None
+    active_till: Optional[datetime] = None
+
+    def matches(self, notam: "Notam") -> bool:
+        if self.locations and not any(loc in notam.location for loc in self.locations):
+            return False
+        if self.firs and notam.fir not in self.firs:
+            return False
+        if self.code_prefix is not None and not (notam.notam_code or '').startswith(self.code_prefix):
+            return False
+        if self.active_till is not None and notam.valid_from is not None and notam.valid_from > self.active_till:
+            return False
+        if self.active_from is not None and notam.valid_till is not None and notam.valid_till < self.active_from:
+            return False
+        return True
+
+
+class NotamStore(object):
+    """The NOTAMs in effect, by notam_id, maintained from a stream of NEW/REPLACE/CANCEL NOTAMs."""
+
+    def __init__(self, notams: Iterable["Notam"] = ()):
+        self._notams: Dict[str, "Notam"] = {}
+        self._index = LocationIndex()
+        self.apply_many(notams)
+
+    def __len__(self) -> int:
+        return len(self._notams)
+
+    def __contains__(self, notam_id: object) -> bool:
+        return notam_id in self._notams
+
+    def get(self, notam_id: str) -> Optional["Notam"]:
+        return self._notams.get(notam_id)
+
+    def add(self, notam: "Notam") -> None:
+        """Stores the NOTAM under its notam_id, replacing any previous NOTAM with the same id."""
+        if notam.notam_id is None:
+            raise ValueError('cannot store a NOTAM without a notam_id')
+        self._index.add(notam)
+        self._notams[notam.notam_id] = notam
+
+    def discard(self, notam_id: str) -> bool:
+        """Removes the NOTAM with the given id. Returns whether it was present."""
+        _ = self._index.discard(notam_id)
+        return self._notams.pop(notam_id, None) is not None
+
+    def apply(self, notam: "Notam") -> None:
+        """Updates the store with a newly received NOTAM: a NOTAMR replaces the NOTAM it references, and a
+        NOTAMC removes it (a NOTAMC is not stored itself)."""
+        if notam.notam_type in ('REPLACE', 'CANCEL') and notam.ref_notam_id is not None:
+            _ = self.discard(notam.ref_notam_id)
+        if notam.notam_type != 'CANCEL':
+            self.add(notam)
+
+    def apply_many(self, notams: Iterable["Notam"]) -> None:
+        for n in notams:
+            self.apply(n)
+
+    def query(self, query: Query) -> List["Notam"]:
+        """Returns the stored NOTAMs matching the query, ordered by notam_id."""
+        ids: Optional[Set[str]] = None
+        if query.locations:
+            ids = self._index.union(query.locations, 'location')
+        if query.firs:
+            by_fir = self._index.union(query.firs, 'fir')
+            ids = by_fir if ids is None else ids & by_fir
+        candidates = self._notams.values() if ids is None else (self._notams[i] for i in ids)
+        return sorted((n for n in candidates if query.matches(n)), key=lambda n: n.notam_id or '')
+
+
+def _shard_worker(conn: Connection) -> None:
+    """Serves requests for one shard until it receives None. A request is a (method name, argument) tuple calling
+    a NotamStore method, ('batch', [(method name, argument), ...]) calling several ones, or ('len', None). Replies
+    with (True, result) or (False, exception)."""
+    store = NotamStore()
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        (method, arg) = request
+        try:
+            if method == 'batch':
+                for (m, a) in arg:
+                    getattr(store, m)(a)
+                result = None
+            elif method == 'len':
+                result = len(store)
+            else:
+                result = getattr(store, method)(arg)
+            reply: Tuple[bool, Any] = (True, result)
+        except Exception as e:
+            reply = (False, e)
+        conn.send(reply)
+    conn.close()
+
+
+def _raise_failed(replies: Dict[int, Tuple[bool, Any]]) -> None:
+    for (ok, value) in replies.values():
+        if not ok:
+            raise value
+
+
+def shard_of(key: str, shards: int) -> int:
+    """The shard a partitioning key (FIR or notam_id) maps to; stable across processes and runs."""
+    return zlib.crc32(key.encode()) % shards
+
+
+class ShardedNotamStore(object):
+    """A NotamStore partitioned across 'shards' local worker processes.
+
+    With by='fir', each NOTAM is stored on the shard of its Q-line FIR, and queries restricted to some FIRs are
+    only sent to their shards; with by='id', NOTAMs are spread evenly by a hash of their notam_id. A NOTAMR or
+    NOTAMC is routed to its own shard, and the NOTAM it references is removed from whichever shard holds it (which
+    may differ, e.g. if the replacement has another FIR), so the coordinating process keeps a map from notam_id to
+    shard.
+
+    Use as a context manager, or call close(), to stop the worker processes."""
+
+    def __init__(self, shards: int = 4, by: str = 'fir', context: Optional[Any] = None):
+        if shards <= 0:
+            raise ValueError('shards must be positive')
+        if by not in ('fir', 'id'):
+            raise ValueError("by must be 'fir' or 'id'")
+        self.by = by
+        self.shards = shards
+        ctx = context or multiprocessing.get_context()
+        self._conns: List[Connection] = []
+        self._procs = []
+        for _ in range(shards):
+            (parent, child) = ctx.Pipe()
+            p = ctx.Process(target=_shard_worker, args=(child,), daemon=True)
+            _ = p.start()
+            _ = child.close()
+            self._conns.append(parent)
+            self._procs.append(p)
+        self._shard_by_id: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._shard_by_id)
+
+    def __contains__(self, notam_id: object) -> bool:
+        return notam_id in self._shard_by_id
+
+    def __enter__(self) -> ShardedNotamStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _route(self, notam: "Notam") -> int:
+        key = (notam.fir if self.by == 'fir' else notam.notam_id) or ''
+        return shard_of(key, self.shards)
+
+    def _exchange(self, requests: Dict[int, Tuple[str, Any]]) -> Dict[int, Tuple[bool, Any]]:
+        """Sends one request to each of the given shards, then collects all (ok, value) replies; the shards work in
+        parallel."""
+        for (shard, request) in requests.items():
+            self._conns[shard].send(request)
+        return {shard: self._conns[shard].recv() for shard in requests}
+
+    def _scatter(self, requests: Dict[int, Tuple[str, Any]]) -> Dict[int, Any]:
+        """As _exchange, but returns the results, raising the exception of a shard that failed."""
+        replies = self._exchange(requests)
+        _raise_failed(replies)
+        return {shard: value for (shard, (_, value)) in replies.items()}
+
+    def apply_many(self, notams: Iterable["Notam"]) -> None:
+        """Applies a batch of NOTAMs (see NotamStore.apply), sending each shard a single message. The batch is
+        applied in order: a NOTAM replacing another one from the same batch replaces it.
+
+        The notam_id to shard map is only updated for the shards that acknowledge their part of the batch, so if a
+        shard fails, the map still points at the shards that actually hold the NOTAMs."""
+        batches: Dict[int, List[Tuple[str, Any]]] = {}
+        # The shard of each notam_id as the batch so far leaves it (None once removed).
+        planned: Dict[str, Optional[int]] = {}
+
+        def current(notam_id: str) -> Optional[int]:
+            return planned[notam_id] if notam_id in planned else self._shard_by_id.get(notam_id)
+
+        for n in notams:
+            if n.notam_id is None:
+                raise ValueError('cannot store a NOTAM without a notam_id')
+            if n.notam_type in ('REPLACE', 'CANCEL') and n.ref_notam_id is not None:
+                old = current(n.ref_notam_id)
+                if old is not None:
+                    planned[n.ref_notam_id] = None
+                    batches.setdefault(old, []).append(('discard', n.ref_notam_id))
+            if n.notam_type != 'CANCEL':
+                shard = self._route(n)
+                old = current(n.notam_id)
+                if old is not None and old != shard:
+                    batches.setdefault(old, []).append(('discard', n.notam_id))
+                planned[n.notam_id] = shard
+                batches.setdefault(shard, []).append(('add', n))
+        if not batches:
+            return
+        replies = self._exchange({shard: ('batch', ops) for (shard, ops) in batches.items()})
+        for (shard, ops) in batches.items():
+            if not replies[shard][0]:
+                continue
+            for (method, arg) in ops:
+                if method == 'add':
+                    self._shard_by_id[arg.notam_id] = shard
+                elif self._shard_by_id.get(arg) == shard:
+                    del self._shard_by_id[arg]
+        _raise_failed(replies)
+
+    def apply(self, notam: "Notam") -> None:
+        self.apply_many([notam])
+
+    def get(self, notam_id: str) -> Optional["Notam"]:
+        shard = self._shard_by_id.get(notam_id)
+        if shard is None:
+            return None
+        return self._scatter({shard: ('get', notam_id)})[shard]
+
+    def query(self, query: Query) -> List["Notam"]:
+        """Runs the query on every shard that may hold matching NOTAMs, and merges the results, ordered by
+        notam_id."""
+        if self.by == 'fir' and query.firs:
+            targets = {shard_of(f, self.shards) for f in query.firs}
+        else:
+            targets = set(range(self.shards))
+        results = self._scatter({shard: ('query', query) for shard in targets})
+        return sorted((n for r in results.values() for n in r), key=lambda n: n.notam_id or '')
+
+    def sizes(self) -> List[int]:
+        """Number of NOTAMs held by each shard."""
+        results = self._scatter({shard: ('len', None) for shard in range(self.shards)})
+        return [results[i] for i in range(self.shards)]
+
+    def close(self) -> None:
+        for (conn, proc) in zip(self._conns, self._procs):
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            proc.join(5)
+            if proc.is_alive():
+                proc.terminate()
+            conn.close()
+        self._conns, self._procs = [], []
@@ -0,0 +1,160 @@
+"""Matching of incoming NOTAMs against a large number of standing queries ("subscriptions").
+
+Instead of testing every subscription against every new NOTAM, the SubscriptionMatcher indexes the subscriptions
+themselves: each one is filed under the most selective of its criteria (an A) location, a spatial grid cell, a
+FIR, or a NOTAM code prefix). Matching a NOTAM then looks up the handful of index entries the NOTAM falls under,
+and only verifies the subscriptions found there."""
+from __future__ import annotations
+
+from datetime import datetime
+from math import cos, floor, radians
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, \
+    Tuple
+
+from .geo import Position, area_center, distance_nm
+
+if TYPE_CHECKING:
+    from . import Notam
+
+CELL_DEGREES = 1.0
+
+
+class Subscription(NamedTuple):
+    """A standing query. A NOTAM matches if it satisfies every criterion that is set (not None/empty)."""
+
+    id: Hashable
+    """Prefix of the NOTAM code, e.g. 'QMRLC' for a specific code or 'QMR' for any runway NOTAM."""
+    code_prefix: Optional[str] = None
+    """The NOTAM's A) location must include one of these."""
+    locations: Sequence[str] = ()
+    """The NOTAM's Q-line FIR must be one of these."""
+    firs: Sequence[str] = ()
+    """The NOTAM's area of influence must come within radius_nm of center."""
+    center: Optional[Position] = None
+    radius_nm: float = 0.0
+    """The NOTAM's vertical limits must overlap this band (in flight levels)."""
+    fl_lower: Optional[int] = None
+    fl_upper: Optional[int] = None
+    """The NOTAM's validity period must overlap this window."""
+    valid_from: Optional[datetime] = None
+    valid_till: Optional[datetime] = None
+
+    def matches(self, notam: "Notam") -> bool:
+        """Tests the NOTAM against all of this subscription's criteria (without using any index)."""
+        if self.code_prefix is not None and not (notam.notam_code or '').startswith(self.code_prefix):
+            return False
+        if self.locations and not any(loc in notam.location for loc in self.locations):
+            return False
+        if self.firs and notam.fir not in self.firs:
+            return False
+        if self.center is not None:
+            c = area_center(notam)
+            if c is None or distance_nm(self.center, c) > self.radius_nm + int(notam.area['radius']):
+                return False
+        if self.fl_lower is not None and notam.fl_upper is not None and notam.fl_upper < self.fl_lower:
+            return False
+        if self.fl_upper is not None and notam.fl_lower is not None and notam.fl_lower > self.fl_upper:
+            return False
+        if self.valid_till is not None and notam.valid_from is not None and notam.valid_from > self.valid_till:
+            return False
+        if self.valid_from is not None and notam.valid_till is not None and notam.valid_till < self.valid_from:
+            return False
+        return True
+
+
+def _cells(center: Position, radius_nm: float) -> Iterator[Tuple[int, int]]:
+    """The grid cells overlapped by the bounding box of a circle."""
+    (lat, lon) = center
+    dlat = radius_nm / 60
+    dlon = radius_nm / (60 * max(cos(radians(min(89.0, abs(lat) + dlat))), 1e-6))
+    if dlon >= 180:
+        lon_cells: Iterable[int] = range(int(-180 // CELL_DEGREES), int(180 // CELL_DEGREES))
+    else:
+        lon_cells = range(floor((lon - dlon) / CELL_DEGREES), floor((lon + dlon) / CELL_DEGREES) + 1)
+    n_lon = int(360 // CELL_DEGREES)
+    half = n_lon // 2
+    for y in range(floor(max(-90.0, lat - dlat) / CELL_DEGREES), floor(min(90.0, lat + dlat) / CELL_DEGREES) + 1):
+        for x in lon_cells:
+            yield (y, (x + half) % n_lon - half)  # wrap around the antimeridian
+
+
+class SubscriptionMatcher(object):
+    """An index of subscriptions, answering which of them match a given NOTAM."""
+
+    def __init__(self, subscriptions: Iterable[Subscription] = ()):
+        self._subs: Dict[Hashable, Subscription] = {}
+        # index name -> key -> ids of the subscriptions filed under that key
+        self._index: Dict[str, Dict[Hashable, Set[Hashable]]] = {'location': {}, 'cell': {}, 'fir': {}, 'code': {}}
+        self._unindexed: Set[Hashable] = set()
+        for s in subscriptions:
+            self.add(s)
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    @staticmethod
+    def _anchors(sub: Subscription) -> Tuple[str, List[Hashable]]:
+        """The index entries under which a subscription is filed: those of its most selective criterion."""
+        if sub.locations:
+            return ('location', list(sub.locations))
+        if sub.center is not None:
+            return ('cell', list(_cells(sub.center, sub.radius_nm)))
+        if sub.firs:
+            return ('fir', list(sub.firs))
+        if sub.code_prefix:
+            return ('code', [sub.code_prefix])
+        return ('', [])
+
+    def add(self, sub: Subscription) -> None:
+        """Registers a subscription, replacing any previous one with the same id."""
+        self.remove(sub.id)
+        self._subs[sub.id] = sub
+        (name, keys) = self._anchors(sub)
+        if not keys:
+            self._unindexed.add(sub.id)
+        for key in keys:
+            self._index[name].setdefault(key, set()).add(sub.id)
+
+    def remove(self, sub_id: Hashable) -> None:
+        sub = self._subs.pop(sub_id, None)
+        if sub is None:
+            return
+        self._unindexed.discard(sub_id)
+        (name, keys) = self._anchors(sub)
+        for key in keys:
+            ids = self._index[name][key]
+            ids.discard(sub_id)
+            if not ids:
+                del self._index[name][key]
+
+    def prune(self, now: datetime) -> int:
+        """Removes subscriptions whose validity window ended before 'now'. Returns how many were removed."""
+        expired = [s.id for s in self._subs.values() if s.valid_till is not None and s.valid_till < now]
+        for sub_id in expired:
+            self.remove(sub_id)
+        return len(expired)
+
+    def candidates(self, notam: "Notam") -> Set[Hashable]:
+        """Ids of the subscriptions that may match the NOTAM, according to the index."""
+        (by_location, by_cell, by_fir, by_code) = (self._index[k] for k in ('location', 'cell', 'fir', 'code'))
+        found = set(self._unindexed)
+        for loc in notam.location:
+            found.update(by_location.get(loc, ()))
+        if notam.fir is not None:
+            found.update(by_fir.get(notam.fir, ()))
+        code = notam.notam_code or ''
+        for i in range(1, len(code) + 1):
+            found.update(by_code.get(code[:i], ()))
+        if by_cell:
+            center = area_center(notam)
+            if center is not None:
+                # A subscription circle is filed under every cell its bounding box touches, so it suffices to
+                # look at the cells touched by the NOTAM's own circle.
+                for c in _cells(center, int(notam.area['radius'])):
+                    found.update(by_cell.get(c, ()))
+        return found
+
+    def match(self, notam: "Notam") -> List[Hashable]:
+        """Ids of all subscriptions matching the NOTAM."""
+        subs = self._subs
+        return [i for i in self.candidates(notam) if subs[i].matches(notam)]
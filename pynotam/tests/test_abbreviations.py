@@ -0,0 +1,75 @@
+import pickle
+import re
+import unittest
+
+from .. import Notam, abbreviations
+from .._abbr import ICAO_abbr
+from ..abbreviations import ICAO, AbbreviationDictionary
+from .test_helper import read_all_notams, read_single_notam
+
+
+def decode_with_regex(entries, txt: str) -> str:
+    """The reference implementation: one alternative per abbreviation, tried in dictionary order."""
+    regex = re.compile(r"\b(" + "|".join([re.escape(key) for key in entries]) + r")\b")
+    return regex.sub(lambda m: entries[m.group()], txt)
+
+
+class TestAbbreviations(unittest.TestCase):
+    def test_matches_regex_decoding(self) -> None:
+        for txt in read_all_notams() + ['G/A/G', 'A/A/A', 'RWY/TWY U/S', 'CLIMB-OUT-ABV', 'TWY_RWY', 'O/R/']:
+            with self.subTest(txt=txt[:30]):
+                self.assertEqual(ICAO.decode(txt), decode_with_regex(ICAO_abbr, txt))
+
+    def test_rank_decides_overlaps(self) -> None:
+        d = AbbreviationDictionary({'G/A': 'ga', 'G/A/G': 'gag', 'A/G': 'ag'})
+        self.assertEqual(d.decode('G/A/G'), 'ga/G')
+        d = AbbreviationDictionary({'G/A/G': 'gag', 'G/A': 'ga', 'A/G': 'ag'})
+        self.assertEqual(d.decode('G/A/G G/A/A/G'), 'gag ga/ag')
+
+    def test_invalid_abbreviation(self) -> None:
+        with self.assertRaises(ValueError):
+            AbbreviationDictionary({'A B': 'x'})
+
+    def test_extend_and_override(self) -> None:
+        faa = ICAO.extend({'CLSD': 'Closed (FAA)', 'RWY': 'Runway (FAA)'}, name='test-faa')
+        self.assertNotEqual(faa.version, ICAO.version)
+        self.assertEqual(len(faa), len(ICAO))
+        self.assertEqual(faa.decode('RWY CLSD'), 'Runway (FAA) Closed (FAA)')
+        self.assertEqual(ICAO.decode('RWY CLSD'), 'Runway Closed')
+
+        n = Notam.from_str(read_single_notam('478095'))
+        self.assertEqual(n.decoded(), n.decoded(ICAO))
+        self.assertEqual(n.decoded(), n.decoded('icao'))
+        self.assertIn('Closed (FAA)', n.decoded(faa))
+        self.assertNotIn('Closed (FAA)', n.decoded())
+        self.assertEqual(Notam.decode_abbr('RWY CLSD', faa), 'Runway (FAA) Closed (FAA)')
+
+    def test_registry(self) -> None:
+        self.assertIn('icao', abbreviations.registered())
+        self.assertIs(abbreviations.get('icao'), ICAO)
+        custom = AbbreviationDictionary({'WIP': 'Work in progress!'}, name='test-custom')
+        abbreviations.register(custom)
+        self.addCleanup(abbreviations._registry.pop, 'test-custom')
+        self.assertEqual(Notam.decode_abbr('WIP RWY', 'test-custom'), 'Work in progress! RWY')
+        with self.assertRaises(KeyError):
+            abbreviations.get('no-such-dictionary')
+
+    def test_serialization(self) -> None:
+        data = ICAO.to_bytes()
+        loaded = AbbreviationDictionary.from_bytes(data)
+        self.assertEqual(loaded.version, ICAO.version)
+        self.assertEqual(dict(loaded), dict(ICAO))
+        self.assertEqual(loaded.name, 'icao')
+        self.assertIs(loaded.table(), ICAO.table())  # cached per version
+        self.assertEqual(pickle.loads(pickle.dumps(ICAO)).decode('RWY CLSD'), 'Runway Closed')
+        with self.assertRaises(ValueError):
+            AbbreviationDictionary.from_bytes(data.replace(b'[1,', b'[99,', 1))
+        # Entries that do not match the stored version must not share the table cached for that version.
+        tampered = data.replace(b'"Runway"', b'"Taxiway"', 1)
+        self.assertNotEqual(tampered, data)
+        with self.assertRaises(ValueError):
+            AbbreviationDictionary.from_bytes(tampered)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import io
+import unittest
+
+from .. import Notam
+from .test_helper import read_all_notams
+
+try:
+    import pyarrow.ipc
+    import pyarrow.parquet
+    from .. import arrow
+except ImportError:
+    arrow = None
+
+
+@unittest.skipIf(arrow is None, 'pyarrow not installed')
+class TestArrowExport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+
+    def test_record_batch(self) -> None:
+        batch = arrow.to_record_batch(self.notams)
+        self.assertEqual(batch.schema, arrow.SCHEMA)
+        self.assertEqual(batch.num_rows, len(self.notams))
+        row = batch.slice(0, 1).to_pylist()[0]
+        n = self.notams[0]
+        self.assertEqual(row['notam_id'], n.notam_id)
+        self.assertEqual(row['location'], n.location)
+        self.assertEqual(row['valid_from'], n.valid_from)
+        self.assertEqual((row['indices_item_e']['start'], row['indices_item_e']['end']), n.indices_item_e)
+
+    def test_batching(self) -> None:
+        sizes = [b.num_rows for b in arrow.iter_record_batches(iter(self.notams), batch_size=50)]
+        self.assertEqual(sum(sizes), len(self.notams))
+        self.assertTrue(all(s <= 50 for s in sizes))
+
+    def test_parquet_roundtrip(self) -> None:
+        buf = io.BytesIO()
+        rows = arrow.write_parquet(self.notams, buf, batch_size=64, include_full_text=True)
+        self.assertEqual(rows, len(self.notams))
+        table = pyarrow.parquet.read_table(io.BytesIO(buf.getvalue()))
+        self.assertEqual(table.column('full_text').to_pylist(), [n.full_text for n in self.notams])
+        permanent = table.column('valid_till_permanent').to_pylist()
+        self.assertEqual(permanent.count(True), sum(1 for n in self.notams
+                                                    if n.valid_till is not None and n.valid_till.year == 9999))
+
+    def test_ipc_roundtrip(self) -> None:
+        buf = io.BytesIO()
+        _ = arrow.write_ipc(self.notams, buf, batch_size=64)
+        table = pyarrow.ipc.open_file(io.BytesIO(buf.getvalue())).read_all()
+        self.assertEqual(table.column('notam_code').to_pylist(), [n.notam_code for n in self.notams])
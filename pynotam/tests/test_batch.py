@@ -0,0 +1,29 @@
+import unittest
+
+from .. import Notam
+from ..batch import NOT_A_NOTAM, iter_parse, split_notams
+from .test_helper import read_all_notams
+
+
+class TestBatch(unittest.TestCase):
+    def test_split_notams(self) -> None:
+        texts = read_all_notams()[:5]
+        joined = 'ZCZC HEADER\n' + '\n\n'.join(texts) + '\n'
+        self.assertEqual(split_notams(joined), [t.strip() for t in texts])
+        self.assertEqual(split_notams('  \n'), [])
+
+    def test_iter_parse(self) -> None:
+        texts = read_all_notams()[:40] + ['NOT A NOTAM']
+        items = [('corpus', i, t) for (i, t) in enumerate(texts)]
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                results = list(iter_parse(items, workers=workers, chunk_size=7))
+                self.assertEqual([r.position for r in results], list(range(len(texts))))
+                self.assertEqual([r.value.notam_id for r in results[:-1]],
+                                 [Notam.from_str(t).notam_id for t in texts[:-1]])
+                self.assertIsNone(results[-1].value)
+                self.assertEqual(results[-1].error, NOT_A_NOTAM)
+
+    def test_strict(self) -> None:
+        with self.assertRaises(ValueError):
+            _ = list(iter_parse([('x', 0, 'NOT A NOTAM')], workers=1, strict=True))
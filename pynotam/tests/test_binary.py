@@ -0,0 +1,79 @@
+import pickle
+import unittest
+from datetime import datetime, timezone
+
+from .. import Notam, binary
+from ..timeutils import EstimatedDateTime
+from .test_helper import read_all_notams, read_single_notam
+
+FIELDS = [f for f in Notam.__annotations__ if not f.startswith('_')]
+
+
+class TestBinary(unittest.TestCase):
+    def assertSameNotam(self, a: Notam, b: Notam) -> None:
+        for f in FIELDS:
+            self.assertEqual(getattr(a, f), getattr(b, f), f)
+            self.assertIs(type(getattr(a, f)), type(getattr(b, f)), f)
+
+    def test_round_trip(self) -> None:
+        for text in read_all_notams():
+            n = Notam.from_str(text)
+            with self.subTest(notam_id=n.notam_id):
+                self.assertSameNotam(Notam.from_bytes(n.to_bytes()), n)
+
+    def test_batch(self) -> None:
+        notams = [Notam.from_str(t) for t in read_all_notams()]
+        data = binary.encode_many(notams)
+        decoded = binary.decode_many(data)
+        self.assertEqual(len(decoded), len(notams))
+        for (a, b) in zip(decoded, notams):
+            self.assertSameNotam(a, b)
+        self.assertLess(len(data), len(pickle.dumps(notams)))
+        self.assertEqual(binary.decode_many(binary.encode_many([])), [])
+
+    def test_constructed(self) -> None:
+        n = Notam()
+        self.assertSameNotam(Notam.from_bytes(n.to_bytes()), n)
+
+        n.notam_id, n.notam_type, n.body = 'A0001/24', 'NEW', 'NOT THE TEXT OF AN ITEM é'
+        n.full_text = '(A0001/24 NOTAMN ...)'
+        n.indices_item_e = (1, 5)
+        n.location = ['EDDM', 'EDDN']
+        n.traffic_type = {'IFR'}
+        n.area = {'lat': '4809N', 'long': '01610E', 'radius': 5}
+        n.valid_from = datetime(2024, 1, 1, 12, 30, 15, 250, tzinfo=timezone.utc)
+        n.valid_till = EstimatedDateTime(2024, 2, 1, tzinfo=timezone.utc)
+        n.created = datetime(1965, 5, 1, tzinfo=timezone.utc)
+        self.assertSameNotam(Notam.from_bytes(n.to_bytes()), n)
+
+        n.valid_till = datetime.max.replace(tzinfo=timezone.utc)
+        self.assertSameNotam(Notam.from_bytes(n.to_bytes()), n)
+
+    def test_items_not_stored_twice(self) -> None:
+        n = Notam.from_str(read_single_notam('A0623/91'))
+        self.assertEqual(n.to_bytes().count(n.body.encode()), 1)
+        decoded = Notam.from_bytes(n.to_bytes())
+        decoded.body = 'CHANGED'
+        self.assertEqual(Notam.from_bytes(decoded.to_bytes()).body, 'CHANGED')
+
+    def test_invalid(self) -> None:
+        data = Notam.from_str(read_single_notam('A0623/91')).to_bytes()
+        for bad in (b'', b'XX\x01' + data[3:], data[:2] + b'\x63' + data[3:], data[:-5], data + b'\x00',
+                    binary.encode_many([])):
+            with self.subTest(bad=bad[:8]):
+                with self.assertRaises(ValueError):
+                    Notam.from_bytes(bad)
+        with self.assertRaises(ValueError):
+            binary.decode_many(data)
+
+    def test_corrupt_timestamp(self) -> None:
+        n = Notam.from_str(read_single_notam('A0623/91'))
+        (data, batch) = (n.to_bytes(), binary.encode_many([n]))
+        # valid_from is the first of the datetimes, after the nulls, the flags and the integer fields.
+        offset = 4 + 4 + 4 * len(binary.INT_FIELDS)
+        for value in (b'\xff' * 7 + b'\x7f', b'\x00' * 7 + b'\x80'):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    Notam.from_bytes(data[:3 + offset] + value + data[3 + offset + 8:])
+                with self.assertRaises(ValueError):
+                    binary.decode_many(batch[:8 + offset] + value + batch[8 + offset + 8:])
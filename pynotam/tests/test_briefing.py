@@ -0,0 +1,63 @@
+import datetime
+import unittest
+
+from .. import Notam
+from ..briefing import Route, brief, brief_plan
+from ..geo import area_center, distance_nm, distance_to_path_nm, parse_coordinate
+from .test_helper import read_all_notams
+
+UTC = datetime.timezone.utc
+
+
+class TestGeo(unittest.TestCase):
+    def test_coordinates(self) -> None:
+        self.assertAlmostEqual(parse_coordinate('5510N'), 55 + 10 / 60)
+        self.assertAlmostEqual(parse_coordinate('00520W'), -(5 + 20 / 60))
+
+    def test_distances(self) -> None:
+        self.assertAlmostEqual(distance_nm((50, 8), (51, 8)), 60, delta=0.1)
+        path = [(50, 8), (51, 8)]
+        self.assertAlmostEqual(distance_to_path_nm((50.5, 8), path), 0, delta=0.01)
+        self.assertAlmostEqual(distance_to_path_nm((52, 8), path), 60, delta=0.1)
+
+
+class TestBriefing(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+
+    def reference(self, route: Route, window: tuple, fl_band: tuple) -> list:
+        def relevant(n: Notam) -> bool:
+            spatial = (set(n.location) & {route.departure, route.destination, *route.alternates}
+                       or n.fir in route.firs or set(n.location) & set(route.firs))
+            center = area_center(n)
+            if route.waypoints and center is not None:
+                spatial = spatial or (distance_to_path_nm(center, route.waypoints)
+                                      <= route.corridor_nm + n.area['radius'])
+            return bool(spatial and n.valid_from <= window[1] and (n.valid_till is None or n.valid_till >= window[0])
+                        and n.fl_lower <= fl_band[1] and n.fl_upper >= fl_band[0])
+        return [n for n in self.notams if relevant(n)]
+
+    def test_matches_reference(self) -> None:
+        queries = [
+            (Route('LLBG', 'LLSD'), (datetime.datetime(2015, 1, 1, tzinfo=UTC),
+                                     datetime.datetime(2015, 2, 1, tzinfo=UTC)), (0, 999)),
+            (Route('LLHA', 'LLET', firs=['LLLL']), (datetime.datetime(2015, 6, 1, tzinfo=UTC),
+                                                    datetime.datetime(2015, 6, 2, tzinfo=UTC)), (50, 100)),
+            (Route('EDDM', 'EDDN', waypoints=[(48.35, 11.78), (49.5, 11.07)], corridor_nm=10),
+             (datetime.datetime(2023, 8, 1, tzinfo=UTC), datetime.datetime(2023, 9, 1, tzinfo=UTC)), (0, 20)),
+        ]
+        for (route, window, fl_band) in queries:
+            with self.subTest(route=route):
+                expected = self.reference(route, window, fl_band)
+                self.assertTrue(expected)
+                self.assertEqual(brief(self.notams, route, window, fl_band), expected)
+
+    def test_plan(self) -> None:
+        route = Route('LLBG', 'LLSD', waypoints=[(60.0, 10.0), (61.0, 10.0)])
+        window = (datetime.datetime(1990, 1, 1, tzinfo=UTC), datetime.datetime(2030, 1, 1, tzinfo=UTC))
+        plan = brief_plan(self.notams, route, window, (0, 999))
+        self.assertEqual(sorted(plan.steps), ['altitude', 'space', 'time'])
+        # Time and altitude accept everything here, so the (selective) spatial filter must run first; within it,
+        # the geometric corridor test is the most expensive and comes last.
+        self.assertEqual(plan.steps[0], 'space')
+        self.assertEqual(plan.disjuncts[-1].name, 'corridor')
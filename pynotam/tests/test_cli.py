@@ -0,0 +1,72 @@
+import io
+import json
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from .. import Notam
+from ..batch import split_notams
+from ..cli import main
+
+
+class TestCli(unittest.TestCase):
+    data_dir = str(Path(__file__).parent / 'test_data')
+
+    def run_cli(self, *argv: str) -> tuple[int, str, str]:
+        out, err = io.StringIO(), io.StringIO()
+        status = main(list(argv), stdout=out, stderr=err)
+        return status, out.getvalue(), err.getvalue()
+
+    def test_ndjson(self) -> None:
+        status, out, err = self.run_cli('parse', '-j', '1', self.data_dir)
+        self.assertEqual(status, 0)
+        records = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(len(records), len(list(Path(self.data_dir).iterdir())))
+        self.assertIn('(0 errors)', err)
+        self.assertTrue(all(r['notam_id'] for r in records))
+
+    def test_csv_and_timings(self) -> None:
+        path = str(Path(self.data_dir) / 'A0623_91.txt')
+        status, out, err = self.run_cli('parse', '-j', '1', '-f', 'csv', '--timings', path)
+        self.assertEqual(status, 0)
+        header, row = out.splitlines()
+        self.assertTrue(header.startswith('notam_id,'))
+        self.assertIn('EGTT EGPX', row)
+        self.assertIn('A0623_91.txt: 1 NOTAMs', err)
+
+    def test_strict(self) -> None:
+        bad = str(Path(__file__))
+        self.assertEqual(self.run_cli('parse', '-j', '1', '-q', bad)[0], 0)
+        status, _, err = self.run_cli('parse', '-j', '1', '--strict', bad)
+        self.assertEqual(status, 1)
+        self.assertIn('(1 errors)', err)
+
+    def test_replay(self) -> None:
+        status, out, err = self.run_cli('replay', '--synthesize', '50', '--seed', '1', self.data_dir)
+        self.assertEqual(status, 0)
+        self.assertIn('Replayed 50 messages (0 errors)', err)
+        self.assertIn('msgs/s', out)
+
+    def test_render(self) -> None:
+        status, ndjson, _ = self.run_cli('parse', '-j', '1', '-q', self.data_dir)
+        self.assertEqual(status, 0)
+        records = io.StringIO(ndjson + '{"notam_id": "A0001/24"}\n')
+        with mock.patch('sys.stdin', records):
+            status, out, err = self.run_cli('render', '--validate')
+        self.assertEqual(status, 0)
+        self.assertIn('Rendered 191 NOTAMs (1 errors)', err)
+        self.assertIn('<stdin>:192:', err)
+        self.assertEqual(len(split_notams(out)), 191)
+
+    def test_render_multipart(self) -> None:
+        path = str(Path(self.data_dir) / 'C2557_23.txt')
+        status, ndjson, _ = self.run_cli('parse', '-j', '1', '-q', path)
+        self.assertEqual(status, 0)
+        record = json.loads(ndjson)
+        self.assertEqual((record['part_number'], record['part_count']), (1, 3))
+        with mock.patch('sys.stdin', io.StringIO(ndjson)):
+            status, out, _ = self.run_cli('render')
+        self.assertEqual(status, 0)
+        self.assertIn(' PART 1 OF 3 ', out)
+        rendered = Notam.from_str(out.strip())
+        self.assertEqual((rendered.part_number, rendered.part_count), (1, 3))
@@ -0,0 +1,41 @@
+import unittest
+
+from .. import Notam
+from ..dedup import BloomFilter, Deduplicator
+from .test_helper import read_all_notams, read_single_notam
+
+
+class TestDedup(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+
+    def test_fingerprint_ignores_layout(self) -> None:
+        text = read_single_notam('C2661/23')
+        n = Notam.from_str(text)
+        variant = text.replace('\nAND', '  AND').replace('E) ', 'E)  ', 1)
+        variant = variant[:variant.index('\nCREATED:')] + ')'
+        m = Notam.from_str(variant)
+        self.assertEqual(n, m)
+        self.assertEqual(hash(n), hash(m))
+        self.assertIsNone(m.source)
+
+    def test_fingerprint_distinguishes_notams(self) -> None:
+        self.assertEqual(len({n.fingerprint() for n in self.notams}), len(self.notams))
+        a, b = Notam.from_str(read_single_notam('A0623/91')), Notam.from_str(read_single_notam('A0623/91'))
+        b.fl_upper = 399
+        self.assertNotEqual(a, b)
+
+    def test_deduplicator(self) -> None:
+        stream = self.notams + [Notam.from_str(s) for s in read_all_notams()[:20]]
+        for dedup in (Deduplicator(), Deduplicator(bloom=BloomFilter(1000))):
+            with self.subTest(bloom=dedup.bloom is not None):
+                unique = list(dedup.filter(stream))
+                self.assertEqual(unique, self.notams)
+                self.assertEqual(dedup.duplicates, 20)
+
+    def test_bounded(self) -> None:
+        dedup = Deduplicator(max_size=10)
+        _ = list(dedup.filter(self.notams))
+        self.assertEqual(len(dedup), 10)
+        self.assertTrue(dedup.seen(self.notams[-1]))
+        self.assertFalse(dedup.seen(self.notams[0]))
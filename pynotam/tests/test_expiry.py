@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from .. import Notam
+from ..expiry import ExpiryEvent, ExpiryScheduler, SimulatedClock
+from ..index import LocationIndex
+from ..stats import NotamStats
+from ..store import NotamStore, Query
+from ..timeutils import EstimatedDateTime
+from .test_helper import read_all_notams
+
+
+def notam(notam_id: str, till: Optional[datetime], notam_type: str = 'NEW', ref: Optional[str] = None) -> Notam:
+    n = Notam()
+    n.notam_id, n.notam_type, n.ref_notam_id, n.fir, n.valid_till = notam_id, notam_type, ref, 'EDMM', till
+    n.location = ['EDDM']
+    return n
+
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class TestExpiryScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = SimulatedClock(T0)
+        self.events: List[ExpiryEvent] = []
+        self.scheduler = ExpiryScheduler(grace=timedelta(hours=1), clock=self.clock, on_expire=self.events.append)
+        self.index = LocationIndex()
+        self.scheduler.register(self.index)
+
+    def feed(self, *notams: Notam) -> None:
+        for n in notams:
+            self.index.apply(n)
+            self.scheduler.apply(n)
+
+    def test_expiry_order_and_grace(self) -> None:
+        self.feed(notam('A0003/24', T0 + timedelta(hours=3)),
+                  notam('A0001/24', T0 + timedelta(hours=1)),
+                  notam('A0002/24', EstimatedDateTime(T0 + timedelta(minutes=30))),
+                  notam('A0004/24', datetime.max.replace(tzinfo=timezone.utc)),
+                  notam('A0005/24', None))
+        self.assertEqual(len(self.scheduler), 3)
+        self.assertEqual(self.scheduler.next_expiry(), T0 + timedelta(hours=1))
+        self.assertEqual(self.scheduler.expire(), [])
+
+        self.clock.advance(timedelta(hours=1))
+        events = self.scheduler.expire()
+        # A0002/24 ended (estimated) half an hour ago, but is kept for the grace period of an hour.
+        self.assertEqual([e.notam_id for e in events], ['A0001/24'])
+        self.clock.advance(timedelta(minutes=30))
+        events = self.scheduler.expire()
+        self.assertEqual(events[0].notam_id, 'A0002/24')
+        self.assertTrue(events[0].estimated)
+        self.assertEqual(events[0].expired_at, T0 + timedelta(minutes=90))
+
+        self.clock.advance(timedelta(days=10000))
+        self.assertEqual([e.notam_id for e in self.scheduler.expire()], ['A0003/24'])
+        self.assertEqual([e.notam_id for e in self.events], ['A0001/24', 'A0002/24', 'A0003/24'])
+        self.assertEqual(set(self.index.lookup('EDDM')), {'A0004/24', 'A0005/24'})
+        self.assertIsNone(self.scheduler.next_expiry())
+
+    def test_replace_and_cancel(self) -> None:
+        self.feed(notam('A0001/24', T0 + timedelta(hours=1)),
+                  notam('A0002/24', T0 + timedelta(hours=5), 'REPLACE', 'A0001/24'),
+                  notam('A0003/24', T0 + timedelta(hours=1)),
+                  notam('A0004/24', None, 'CANCEL', 'A0003/24'))
+        self.assertEqual(len(self.scheduler), 1)
+        self.assertEqual(self.scheduler.expire(T0 + timedelta(hours=2)), [])
+        # Rescheduling moves the expiry.
+        self.feed(notam('A0002/24', T0 + timedelta(hours=1)))
+        self.assertEqual([e.notam_id for e in self.scheduler.expire(T0 + timedelta(hours=2))], ['A0002/24'])
+        self.assertEqual(len(self.index), 0)
+
+    def test_stale_entries_are_compacted(self) -> None:
+        for i in range(1000):
+            self.scheduler.schedule(notam('A0001/24', T0 + timedelta(minutes=i)))
+        self.assertLess(len(self.scheduler._heap), 200)
+        self.assertEqual(len(self.scheduler.expire(T0 + timedelta(days=1))), 1)
+
+    def test_corpus_containers(self) -> None:
+        notams = [Notam.from_str(s) for s in read_all_notams()]
+        store, stats = NotamStore(), NotamStats()
+        scheduler = ExpiryScheduler(grace=timedelta(hours=2))
+        for c in (store, stats):
+            scheduler.register(c)
+        for n in notams:
+            store.apply(n)
+            stats.apply(n)
+            scheduler.apply(n)
+        now = datetime(2023, 6, 1, tzinfo=timezone.utc)
+        events = scheduler.expire(now)
+        self.assertTrue(events)
+        self.assertEqual([e.expired_at for e in events], sorted(e.expired_at for e in events))
+        for n in store.query(Query()):
+            self.assertTrue(n.valid_till is None or scheduler.expires_at(n) is None or scheduler.expires_at(n) > now)
+        self.assertEqual(len(stats), len(store))
+
+
+if __name__ == '__main__':
+    unittest.main()
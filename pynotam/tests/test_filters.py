@@ -0,0 +1,118 @@
+import os
+import unittest
+from typing import Any, Dict
+
+from .. import Notam
+from ..filters import compile_filter, select
+from ..shm import SharedNotamPublisher, SharedNotamReader
+from .test_helper import read_all_notams
+
+_FIELDS = ('notam_id', 'notam_type', 'ref_notam_id', 'fir', 'notam_code', 'traffic_type', 'purpose', 'scope',
+           'fl_lower', 'fl_upper', 'location', 'part_number', 'part_count', 'schedule', 'body', 'limit_lower',
+           'limit_upper', 'source')
+
+EXPRESSIONS = (
+    "fir == 'LLLL'",
+    "fir != 'LLLL'",
+    "fir in ('EDMM', 'EGXX', 'LFBB')",
+    "notam_type not in ['NEW']",
+    "'IFR' in traffic_type",
+    "'VFR' not in traffic_type and 'AERODROME' in scope",
+    "'IFR' in traffic_type and 'VFR' in traffic_type and 'MISC' in purpose",
+    "'IFR' in traffic_type or 'NAV WARNING' in scope or 'EN-ROUTE' in scope",
+    "not ('AERODROME' in scope or 'EN-ROUTE' in scope)",
+    "'CHECKLIST' not in purpose and 'CHECKLIST' not in scope",
+    "notam_code.startswith('QMR')",
+    "notam_code.startswith(('QFA', 'QOB')) or notam_code == 'QWCLW'",
+    "not notam_code.startswith('QF') and fl_upper <= 100",
+    "fir == 'LLLL' and 'IFR' in traffic_type and notam_code.startswith('QMR')",
+    "10 < fl_upper <= 999 and fl_lower == 0",
+    "fl_lower in (0, 10) or fl_upper not in {999}",
+    "'LLBG' in location or 'LLHA' in location",
+    "'LLBG' not in location and 'LLHA' not in location",
+    "not (fir == 'LLLL' and (notam_type == 'NEW' or 'IFR' in traffic_type))",
+    "notam_id != 'A0623/91' and (fir == 'LLLL' or not fl_upper > 100)",
+)
+
+
+def _namespace(n: Notam) -> Dict[str, Any]:
+    return {f: getattr(n, f) for f in _FIELDS}
+
+
+class TestFilters(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.notams = [Notam.from_str(s) for s in read_all_notams()]
+
+    def test_same_as_lambda(self) -> None:
+        for expression in EXPRESSIONS:
+            with self.subTest(expression=expression):
+                expected = [n for n in self.notams if eval(expression, {}, _namespace(n))]
+                f = compile_filter(expression)
+                self.assertEqual([n for n in self.notams if f(n)], expected)
+                self.assertEqual(f.select(self.notams), expected)
+                self.assertEqual(list(f.iter_select(iter(self.notams))), expected)
+                self.assertEqual(list(f.iter_select(self.notams, sample_size=0)), expected)
+                self.assertEqual(compile_filter(expression, sample=self.notams).select(self.notams), expected)
+        self.assertEqual(select("fir == 'EDMM'", self.notams), [n for n in self.notams if n.fir == 'EDMM'])
+
+    def test_none(self) -> None:
+        n = Notam()
+        self.assertTrue(compile_filter("limit_lower != 'SFC'")(n))
+        self.assertFalse(compile_filter("limit_lower == 'SFC'")(n))
+        self.assertFalse(compile_filter("limit_lower.startswith('FL')")(n))
+        self.assertTrue(compile_filter("not limit_lower.startswith('FL')")(n))
+        self.assertFalse(compile_filter("fl_lower < 100")(n))
+        self.assertFalse(compile_filter("fl_lower >= 100")(n))
+        self.assertTrue(compile_filter("fl_lower not in (0, 100)")(n))
+        self.assertTrue(compile_filter("'IFR' not in traffic_type")(n))
+
+    def test_merged(self) -> None:
+        f = compile_filter("'IFR' in traffic_type and fl_upper < 100 and 'AERODROME' in scope")
+        self.assertEqual(len(f.steps), 2)
+        self.assertIn("'IFR' in traffic_type and 'AERODROME' in scope", f.steps)
+        f = compile_filter("notam_code.startswith('QMR') or fir == 'EDMM' or notam_code.startswith('QFA')")
+        # Without a sample, the cheaper equality test goes first.
+        self.assertEqual(f.steps, ["fir == 'EDMM' or notam_code.startswith('QMR') or notam_code.startswith('QFA')"])
+
+    def test_ordering(self) -> None:
+        # Nearly every NOTAM is in LLLL, but few are runway NOTAMs: the code test rejects more and goes first.
+        expression = "fir == 'LLLL' and notam_code.startswith('QMR')"
+        self.assertEqual(compile_filter(expression).steps, ["fir == 'LLLL'", "notam_code.startswith('QMR')"])
+        self.assertEqual(compile_filter(expression, sample=self.notams).steps,
+                         ["notam_code.startswith('QMR')", "fir == 'LLLL'"])
+        self.assertEqual(compile_filter(expression).ordered_for(self.notams).steps,
+                         ["notam_code.startswith('QMR')", "fir == 'LLLL'"])
+
+    def test_invalid(self) -> None:
+        for expression in ("fir ==", "fir = 'LLLL'", "fir == 'LLLL' + 'X'", "firs == 'LLLL'", "fir == 1",
+                           "fl_lower == '100'", "fl_lower == True", "'LL' in fir", "fir is None",
+                           "'FAST' in traffic_type", "body.endswith('X')", "fl_lower.startswith('1')",
+                           "fir == notam_code", "fir in 'LLLL'", "fir", "fl_lower < 100 < 'X'"):
+            with self.subTest(expression=expression):
+                self.assertRaises(ValueError, compile_filter, expression)
+
+    def test_shared_table(self) -> None:
+        # Prefixes are compared as UTF-8 in the columns, where 'ÉT' is as long as 'RWY'.
+        accented = [Notam.from_str(s.replace('E) ', 'E) {} '.format(word), 1))
+                    for (s, word) in zip(read_all_notams(), ('ÉTÉ', 'ÉCOLE', 'RWYS'))]
+        notams = self.notams + accented
+        self.assertTrue(all(n.body.startswith(('É', 'RWYS')) for n in accented))
+        publisher = SharedNotamPublisher('pynotam-test-filters-{}'.format(os.getpid()))
+        reader = SharedNotamReader(publisher.name)
+        try:
+            _ = publisher.publish(notams)
+            table = reader.snapshot()
+            for expression in EXPRESSIONS + ("body.startswith('É')", "body.startswith(('ÉT', 'RWY'))"):
+                with self.subTest(expression=expression):
+                    f = compile_filter(expression)
+                    self.assertEqual(f.indices(table), [i for (i, n) in enumerate(notams) if f(n)])
+                    if 'É' in expression:
+                        self.assertGreater(len(f.indices(table)), 1)
+        finally:
+            reader.close()
+            publisher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import copy
+import io
+import json
+import unittest
+
+from .. import Notam
+from ..geo import area_center, distance_nm
+from ..geojson import TileCache, feature, segments_for, tile_of, write_geojson
+from .test_helper import read_all_notams
+
+
+class TestGeoJson(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+        self.with_area = [n for n in self.notams if n.area]
+
+    def test_write_geojson(self) -> None:
+        out = io.StringIO()
+        count = write_geojson(self.notams, out)
+        doc = json.loads(out.getvalue())
+        self.assertEqual(doc['type'], 'FeatureCollection')
+        self.assertEqual(count, len(self.with_area))
+        self.assertEqual([f['id'] for f in doc['features']], [n.notam_id for n in self.with_area])
+        self.assertEqual(write_geojson([], io.StringIO()), 0)
+
+    def test_polygon(self) -> None:
+        n = self.with_area[0]
+        f = feature(n, segments=16)
+        ring = f['geometry']['coordinates'][0]
+        self.assertEqual(len(ring), 17)
+        self.assertEqual(ring[0], ring[-1])
+        center = area_center(n)
+        for (lon, lat) in ring:
+            self.assertAlmostEqual(distance_nm(center, (lat, lon)), int(n.area['radius']), delta=0.01)
+        self.assertEqual(f['properties']['notam_code'], n.notam_code)
+        self.assertIsNone(feature(Notam()))
+
+    def test_tiles(self) -> None:
+        self.assertEqual(tile_of((0.0, 0.0), 1), (1, 1))
+        self.assertEqual(tile_of((51.5, -0.1), 10), (511, 340))
+        self.assertLess(segments_for(5, 50, 0), segments_for(5, 50, 12))
+
+    def test_tile_cache(self) -> None:
+        cache = TileCache(max_zoom=6, notams=self.notams)
+        n = self.with_area[0]
+        (x, y) = tile_of(area_center(n), 6)
+        self.assertIn(n.notam_id, cache.notam_ids(6, x, y))
+        data = cache.tile(6, x, y)
+        self.assertIs(cache.tile(6, x, y), data)  # served from the cache
+        self.assertIn(n.notam_id, [f['id'] for f in json.loads(data)['features']])
+        self.assertEqual(json.loads(cache.tile(6, 0, 0))['features'], [])
+        with self.assertRaises(ValueError):
+            cache.tile(7, 0, 0)
+
+        other = next(t for t in cache._tiles if t[0] == 6 and t not in cache._tiles_of[n.notam_id])
+        other_data = cache.tile(*other)
+
+        cancel = copy.copy(n)
+        cancel.notam_id, cancel.notam_type, cancel.ref_notam_id = 'Z0001/24', 'CANCEL', n.notam_id
+        cache.apply(cancel)
+        self.assertNotIn(n.notam_id, cache)
+        self.assertNotIn(n.notam_id, [f['id'] for f in json.loads(cache.tile(6, x, y))['features']])
+        # Invalidation is incremental: tiles not touched by the cancelled NOTAM are still cached.
+        self.assertIs(cache.tile(*other), other_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
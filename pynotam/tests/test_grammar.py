@@ -1,7 +1,11 @@
+import random
 import unittest
 
+from parsimonious.exceptions import ParseError, VisitationError
+
+from .. import Notam, ParseLimitExceeded, looks_like_notam
 from .._parser import grammar
-from .test_helper import read_test_data
+from .test_helper import read_all_notams, read_single_notam, read_test_data
 
 
 class GrammarParse(unittest.TestCase):
@@ -44,3 +48,71 @@ class GrammarParse(unittest.TestCase):
     def test_root(self) -> None:
         notams = ['\n'.join(d) for d in self.test_data]
         self.try_parse_all('root', notams)
+
+
+class ParseHardening(unittest.TestCase):
+    base = read_single_notam('A0623/91')
+
+    def test_long_inputs(self) -> None:
+        n = Notam.from_str(self.base.replace('A) EGTT EGPX', 'A) ' + ' '.join(['EGTT', 'EGPX'] * 5000)))
+        self.assertEqual(n.location, ['EGTT', 'EGPX'] * 5000)
+        body = 'RWY 09/27 CLSD (WIP). ' * 20000
+        n = Notam.from_str(self.base.replace('DANGER AREA DXX IS ACTIVE', body.strip()))
+        self.assertEqual(n.body, body.strip())
+        self.assertEqual(n.limit_lower, 'GND')
+
+    def test_limits(self) -> None:
+        long_text = self.base.replace('A) EGTT EGPX', 'A) ' + ' '.join(['EGTT'] * 50000))
+        with self.assertRaises(ParseLimitExceeded):
+            _ = Notam.from_str(long_text, max_length=10000)
+        with self.assertRaises(ParseLimitExceeded):
+            _ = Notam.from_str(long_text, timeout=0.001)
+        self.assertEqual(Notam.from_str(self.base, max_length=len(self.base), timeout=10).notam_id, 'A0623/91')
+
+    def test_fuzz(self) -> None:
+        rnd = random.Random(1234)
+        corpus = read_all_notams()
+        for _ in range(300):
+            chars = list(rnd.choice(corpus))
+            for _ in range(rnd.randint(1, 6)):
+                pos = rnd.randrange(len(chars))
+                if rnd.random() < 0.5:
+                    del chars[pos]
+                else:
+                    chars[pos:pos] = chars[pos:pos + rnd.randint(1, 10)] * rnd.randint(1, 50)
+            text = ''.join(chars)
+            try:
+                _ = Notam.from_str(text)
+            except (ParseError, VisitationError):
+                pass
+
+
+class Prefilter(unittest.TestCase):
+    def test_corpus(self) -> None:
+        for text in read_all_notams():
+            self.assertEqual(looks_like_notam(text), Notam.from_str(text).notam_type)
+
+    def test_rejects(self) -> None:
+        base = read_single_notam('A0623/91')
+        for text in ('', 'ZCZC 0123 NOTAM CHECKLIST', base.replace('NOTAMN', 'NOTAMX'),
+                     base.replace('NOTAMN', 'NOTAMR'), base.replace('Q) ', 'Q)'), base.replace('A) EGTT', 'A) PART'),
+                     ' ' + base):
+            self.assertIsNone(looks_like_notam(text), text[:40])
+
+    def test_never_rejects_parseable(self) -> None:
+        rnd = random.Random(1)
+        corpus = read_all_notams()
+        for _ in range(2000):
+            chars = list(rnd.choice(corpus))
+            for _ in range(rnd.randint(1, 3)):
+                pos = rnd.randrange(min(len(chars), 140))  # mutate the header and Q-line
+                if rnd.random() < 0.4:
+                    del chars[pos]
+                else:
+                    chars.insert(pos, rnd.choice('()/ \nABCEIKNOQRVWZ0123456789'))
+            text = ''.join(chars)
+            try:
+                _ = Notam.from_str(text)
+            except (ParseError, VisitationError):
+                continue
+            self.assertIsNotNone(looks_like_notam(text), text[:160])
@@ -19,3 +19,8 @@ def read_single_notam(id: str) -> str:
     filename = filename.replace('/', '_')
 
     return (Path(__file__).parent / 'test_data' / filename).read_text()
+
+
+def read_all_notams() -> list[str]:
+    """Returns the full text of every NOTAM in the test_data directory, ordered by file name."""
+    return [p.read_text() for p in sorted((Path(__file__).parent / 'test_data').iterdir())]
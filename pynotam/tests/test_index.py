@@ -0,0 +1,42 @@
+import unittest
+from typing import Callable, Set
+
+from .. import Notam
+from ..index import LocationIndex
+from .test_helper import read_all_notams, read_single_notam
+
+
+class TestLocationIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+        self.index = LocationIndex()
+        for n in self.notams:
+            self.index.add(n)
+
+    def scan(self, pred: Callable[[Notam], bool]) -> Set[str]:
+        return {n.notam_id for n in self.notams if pred(n) and n.notam_id is not None}
+
+    def test_queries(self) -> None:
+        self.assertEqual(self.index.lookup('LLBG', 'location'), self.scan(lambda n: 'LLBG' in n.location))
+        self.assertEqual(self.index.lookup('EDMM', 'fir'), self.scan(lambda n: n.fir == 'EDMM'))
+        self.assertEqual(self.index.union(['LLBG', 'LLSD', 'XXXX']),
+                         self.scan(lambda n: bool({'LLBG', 'LLSD'} & ({n.fir} | set(n.location)))))
+        self.assertEqual(self.index.intersection(['EGTT', 'EGPX'], 'location'),
+                         self.scan(lambda n: {'EGTT', 'EGPX'} <= set(n.location)))
+        self.assertEqual(self.index.intersection(['EGTT', 'XXXX']), set())
+
+    def test_incremental(self) -> None:
+        for notam_id in self.scan(lambda n: 'EGPX' in n.location):
+            self.assertTrue(self.index.discard(notam_id))
+            self.assertFalse(self.index.discard(notam_id))
+        self.assertNotIn('EGPX', self.index.keys())
+        self.assertEqual(len(self.index), len(self.notams) - 2)
+
+    def test_apply(self) -> None:
+        index = LocationIndex()
+        index.apply(Notam.from_str(read_single_notam('A0623/91')))
+        cancel = Notam.from_str(read_single_notam('A1235/09'))
+        cancel.ref_notam_id = 'A0623/91'
+        index.apply(cancel)
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.keys(), frozenset())
@@ -0,0 +1,60 @@
+import unittest
+
+from .. import Notam
+from ..multipart import PartReassembler
+from .test_helper import read_single_notam
+
+PART = """(A0623/91 NOTAMN
+Q) EGXX/QRDCA/IV/NBO/W/000/400/5510N00520W050
+A) EGTT EGPX PART {n} OF 3 B) 9104030730 C) 9104281500
+E) {body}{tail})"""
+
+
+class TestMultipart(unittest.TestCase):
+    def make_parts(self) -> list:
+        bodies = ['DANGER AREA DXX IS ACTIVE', 'WI AREA BOUNDED BY\n5510N 00520W', 'RMK SEE AIP ENR 5.1']
+        return [Notam.from_str(PART.format(n=i + 1, body=b,
+                                           tail='\nF) GND G) FL400' if i == 2 else ''))
+                for (i, b) in enumerate(bodies)]
+
+    def test_part_fields(self) -> None:
+        part = self.make_parts()[1]
+        self.assertEqual((part.part_number, part.part_count, part.location), (2, 3, ['EGTT', 'EGPX']))
+        single = Notam.from_str(read_single_notam('A0623/91'))
+        self.assertEqual((single.part_number, single.part_count), (None, None))
+
+    def test_reassembly(self) -> None:
+        parts = self.make_parts()
+        single = Notam.from_str(read_single_notam('A0624/91'))
+        out = list(PartReassembler().reassemble([parts[2], single, parts[0], parts[1]]))
+        self.assertEqual(out[0], single)
+        merged = out[1]
+        self.assertEqual(merged.body, '\n'.join(p.body for p in parts))
+        self.assertEqual((merged.part_number, merged.part_count), (None, None))
+        self.assertEqual((merged.limit_lower, merged.limit_upper), ('GND', 'FL400'))
+        for (item, value) in (('a', 'EGTT EGPX'), ('b', '9104030730'), ('c', '9104281500'), ('e', merged.body),
+                              ('f', 'GND'), ('g', 'FL400')):
+            self.assertEqual(merged.full_text[slice(*getattr(merged, 'indices_item_' + item))], value)
+        reparsed = Notam.from_str(merged.full_text)
+        self.assertEqual((reparsed.body, reparsed.part_number, reparsed.part_count), (merged.body, None, None))
+        for item in 'abcefg':
+            self.assertEqual(getattr(reparsed, 'indices_item_' + item), getattr(merged, 'indices_item_' + item))
+        self.assertIs(PartReassembler().feed(reparsed), reparsed)
+        merged.location.append('EGLL')
+        merged.traffic_type.discard('VFR')
+        self.assertEqual((parts[0].location, parts[0].traffic_type), (['EGTT', 'EGPX'], {'IFR', 'VFR'}))
+
+    def test_bounds(self) -> None:
+        now = [0.0]
+        incomplete = []
+        reassembler = PartReassembler(max_pending=1, timeout=10, on_incomplete=incomplete.append,
+                                      clock=lambda: now[0])
+        parts = self.make_parts()
+        self.assertIsNone(reassembler.feed(parts[0]))
+        other = Notam.from_str(PART.format(n=1, body='X', tail=''))
+        other.notam_id = 'A0001/91'
+        self.assertIsNone(reassembler.feed(other))  # evicts the first, incomplete NOTAM
+        self.assertEqual(incomplete, [[parts[0]]])
+        now[0] = 11
+        reassembler.expire()
+        self.assertEqual((len(reassembler), reassembler.dropped), (0, 2))
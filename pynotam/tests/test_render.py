@@ -0,0 +1,96 @@
+import io
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from .. import Notam
+from ..batch import split_notams
+from ..render import render, write_notams
+from ..timeutils import EstimatedDateTime
+from .test_helper import read_all_notams, read_single_notam
+
+FIELDS = [f for f in Notam.__annotations__
+          if not f.startswith('_') and f != 'full_text' and not f.startswith('indices_item_')]
+
+
+def facility_notam(i: int) -> Notam:
+    n = Notam()
+    n.notam_id, n.notam_type = 'A{:04d}/24'.format(i), 'NEW'
+    n.fir, n.notam_code = 'EDGG', 'QMRLC'
+    n.traffic_type, n.purpose, n.scope = {'IFR', 'VFR'}, {'IMMEDIATE ATTENTION', 'OPERATIONAL SIGNIFICANCE'}, \
+        {'AERODROME'}
+    n.fl_lower, n.fl_upper = 0, 999
+    n.area = {'lat': '5002N', 'long': '00834E', 'radius': 5}
+    n.location = ['EDDF']
+    n.valid_from = datetime(2024, 3, 1, 6, 0, tzinfo=timezone.utc)
+    n.valid_till = EstimatedDateTime(2024, 3, 31, 18, 0, tzinfo=timezone.utc)
+    n.schedule = 'DAILY 0600-1800'
+    n.body = 'RWY 07C/25C CLSD DUE TO WIP.'
+    return n
+
+
+class TestRender(unittest.TestCase):
+    def assertRoundTrips(self, n: Notam) -> Notam:
+        parsed = Notam.from_str(render(n))
+        for f in FIELDS:
+            self.assertEqual(getattr(parsed, f), getattr(n, f), f)
+            self.assertEqual(type(getattr(parsed, f)), type(getattr(n, f)), f)
+        return parsed
+
+    def test_corpus(self) -> None:
+        for text in read_all_notams():
+            n = Notam.from_str(text)
+            with self.subTest(notam_id=n.notam_id):
+                self.assertRoundTrips(n)
+                self.assertEqual(render(n, validate=True), render(n))
+
+    def test_layout(self) -> None:
+        n = Notam.from_str(read_single_notam('A0623/91'))
+        self.assertEqual(render(n), n.full_text)
+
+    def test_constructed(self) -> None:
+        n = facility_notam(1)
+        self.assertEqual(render(n), '(A0001/24 NOTAMN\n'
+                                    'Q) EDGG/QMRLC/IV/NB/A/000/999/5002N00834E005\n'
+                                    'A) EDDF B) 2403010600 C) 2403311800 EST\n'
+                                    'D) DAILY 0600-1800\n'
+                                    'E) RWY 07C/25C CLSD DUE TO WIP.)')
+        n.notam_type, n.ref_notam_id = 'REPLACE', 'A0999/23'
+        n.valid_till = datetime.max.replace(tzinfo=timezone.utc)
+        n.limit_lower, n.limit_upper = 'GND', 'FL100'
+        n.part_number, n.part_count = 1, 2
+        n.created = datetime(2024, 2, 29, 12, 18, tzinfo=timezone.utc)
+        n.source = 'EUECYIYN'
+        self.assertRoundTrips(n)
+
+        n = facility_notam(1)
+        n.valid_from = datetime(2024, 3, 1, 8, 0, tzinfo=timezone(timedelta(hours=2)))
+        self.assertIn('B) 2403010600', render(n))
+
+    def test_invalid(self) -> None:
+        for (field, value) in (('notam_id', None), ('body', ''), ('location', []), ('traffic_type', set()),
+                               ('purpose', {'URGENT'}), ('notam_type', 'NEW!'), ('limit_lower', 'GND'),
+                               ('valid_from', datetime(2099, 1, 1, tzinfo=timezone.utc)), ('area', {})):
+            n = facility_notam(1)
+            setattr(n, field, value)
+            with self.subTest(field=field):
+                with self.assertRaises(ValueError):
+                    render(n)
+        n = facility_notam(1)
+        n.notam_type = 'CANCEL'
+        with self.assertRaises(ValueError):
+            render(n)
+
+    def test_validate(self) -> None:
+        n = facility_notam(1)
+        n.body = 'RWY CLSD\nF) NOT AN ITEM'
+        _ = render(n)
+        with self.assertRaises(ValueError):
+            render(n, validate=True)
+
+    def test_write_notams(self) -> None:
+        out = io.StringIO()
+        self.assertEqual(write_notams((facility_notam(i) for i in range(1, 51)), out), 50)
+        texts = split_notams(out.getvalue())
+        self.assertEqual(len(texts), 50)
+        self.assertEqual([Notam.from_str(t).notam_id for t in texts], ['A{:04d}/24'.format(i) for i in range(1, 51)])
+        self.assertEqual(write_notams([], io.StringIO()), 0)
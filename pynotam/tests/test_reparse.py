@@ -0,0 +1,73 @@
+import random
+import unittest
+from unittest import mock
+
+from .. import Notam
+from .test_helper import read_all_notams, read_single_notam
+
+FIELDS = [f for f in Notam.__annotations__ if not f.startswith('_')]
+
+
+class TestFromEdit(unittest.TestCase):
+    def setUp(self) -> None:
+        self.text = read_single_notam('A0623/91')
+        self.notam = Notam.from_str(self.text)
+
+    def edit(self, old: str, new: str, local: bool = True) -> Notam:
+        start = self.text.index(old)
+        expected = Notam.from_str(self.text.replace(old, new, 1))
+        with mock.patch.object(Notam, 'from_str', wraps=Notam.from_str) as from_str:
+            n = Notam.from_edit(self.notam, start, start + len(old), new)
+        self.assertEqual(from_str.called, not local)
+        for f in FIELDS:
+            self.assertEqual(getattr(n, f), getattr(expected, f), f)
+        return n
+
+    def test_body(self) -> None:
+        n = self.edit('DANGER AREA', 'RESTRICTED AREA R123')
+        self.assertEqual(n.body, 'RESTRICTED AREA R123 DXX IS ACTIVE')
+        self.assertEqual(n.limit_lower, 'GND')
+        self.assertEqual(self.notam.body, 'DANGER AREA DXX IS ACTIVE')
+
+    def test_items(self) -> None:
+        self.assertEqual(self.edit('EGTT EGPX', 'EGTT EGPX EGAA').location, ['EGTT', 'EGPX', 'EGAA'])
+        self.assertEqual(self.edit('9104281500', '9105281500').valid_till.month, 5)
+        self.assertTrue(self.edit('9104281500', '9104281500 EST').valid_till.is_estimated)
+        self.assertEqual(self.edit('EGTT EGPX', 'EGTT PART 2 OF 3').part_number, 2)
+        self.assertEqual(self.edit('GND', 'SFC').limit_lower, 'SFC')
+
+    def test_full_parse(self) -> None:
+        self.edit('A0623/91', 'A0624/91', local=False)
+        self.edit('EGXX/QRDCA', 'EGXX/QRTCA', local=False)
+        self.edit('DXX IS ACTIVE\nF) GND', 'DXX\nF) SFC', local=False)
+
+    def test_errors(self) -> None:
+        with self.assertRaises(ValueError):
+            Notam.from_edit(self.notam, 10, 5, '')
+        start = self.text.index('0730')
+        with self.assertRaises(Exception):
+            Notam.from_edit(self.notam, start, start + 4, 'XXXX')
+        with self.assertRaises(ValueError):
+            Notam.from_edit(Notam(), 0, 0, 'A')
+
+    def test_random_edits(self) -> None:
+        rnd = random.Random(1)
+        texts = read_all_notams()
+        for _ in range(300):
+            prev = Notam.from_str(rnd.choice(texts))
+            (s, e) = rnd.choice([r for r in (prev.indices_item_a, prev.indices_item_b, prev.indices_item_c,
+                                             prev.indices_item_d, prev.indices_item_e) if r is not None])
+            start = rnd.randint(s, e)
+            end = rnd.randint(start, min(e, start + 3))
+            replacement = ''.join(rnd.choice('ABZ019 )\n') for _ in range(rnd.randint(0, 3)))
+            text = prev.full_text[:start] + replacement + prev.full_text[end:]
+            with self.subTest(text=text):
+                try:
+                    expected = Notam.from_str(text)
+                except Exception as e:
+                    with self.assertRaises(type(e)):
+                        Notam.from_edit(prev, start, end, replacement)
+                    continue
+                n = Notam.from_edit(prev, start, end, replacement)
+                for f in FIELDS:
+                    self.assertEqual(getattr(n, f), getattr(expected, f), f)
@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from .. import Notam
+from ..replay import percentile, replay, synthesize
+from .test_helper import read_all_notams
+
+
+class FakeTime(object):
+    """A clock that only moves when slept on, or by 'step' per reading."""
+
+    def __init__(self, step: float = 0.0):
+        self.now = 0.0
+        self.step = step
+        self.slept = 0.0
+
+    def clock(self) -> float:
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept += seconds
+        self.now += seconds
+
+
+class TestSynthesize(unittest.TestCase):
+    def test_feed(self) -> None:
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        feed = list(islice(synthesize(read_all_notams(), start=start, seed=1), 500))
+        self.assertEqual([ts for (ts, _) in feed], sorted(ts for (ts, _) in feed))
+        self.assertGreater(feed[0][0], start)
+
+        seen = set()
+        kinds = set()
+        for (_, text) in feed:
+            n = Notam.from_str(text)
+            kinds.add(n.notam_type)
+            if n.notam_type != 'NEW':
+                self.assertIn(n.ref_notam_id, seen)
+            seen.add(n.notam_id)
+        self.assertEqual(len(seen), len(feed))
+        self.assertEqual(kinds, {'NEW', 'REPLACE', 'CANCEL'})
+
+    def test_id_rollover(self) -> None:
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        feed = synthesize(read_all_notams(), start=start, interval=timedelta(seconds=1), seed=3)
+        ids = [text.lstrip('(').split(' ', 1)[0] for (_, text) in islice(feed, 10010)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids[:2], ['A0001/24', 'A0002/24'])
+        self.assertEqual(ids[9998:10000], ['A9999/24', 'B0001/24'])
+
+    def test_deterministic(self) -> None:
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        (a, b) = (list(islice(synthesize(read_all_notams(), start=start, seed=7), 50)) for _ in range(2))
+        self.assertEqual(a, b)
+
+    def test_empty_corpus(self) -> None:
+        with self.assertRaises(ValueError):
+            next(synthesize(['not a NOTAM']))
+
+
+class TestReplay(unittest.TestCase):
+    def test_rate(self) -> None:
+        t = FakeTime()
+        received = []
+        r = replay(['a'] * 10, received.append, rate=5, interval=1.0, clock=t.clock, sleep=t.sleep)
+        self.assertEqual(received, ['a'] * 10)
+        self.assertEqual((r.processed, r.errors), (10, 0))
+        self.assertAlmostEqual(t.slept, 1.8)
+        self.assertEqual(r.max, 0.0)
+        self.assertEqual([s.processed for s in r.samples], [6, 10])
+
+    def test_speedup_and_limit(self) -> None:
+        t = FakeTime()
+        items = [(datetime(2024, 1, 1, 0, m, tzinfo=timezone.utc), 'x') for m in range(10)]
+        r = replay(items, lambda s: None, speedup=60, limit=4, clock=t.clock, sleep=t.sleep)
+        self.assertEqual(r.processed, 4)
+        self.assertAlmostEqual(t.slept, 3.0)
+
+    def test_errors_and_latency(self) -> None:
+        t = FakeTime(step=0.5)
+        texts = [n for n in read_all_notams()[:3]] + ['garbage']
+        r = replay(texts, rate=1, clock=t.clock, sleep=t.sleep)
+        self.assertEqual((r.processed, r.errors), (4, 1))
+        self.assertGreater(r.p50, 0)
+        self.assertGreaterEqual(r.max, r.p99)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            replay([], rate=0)
+
+
+class TestPercentile(unittest.TestCase):
+    def test_percentile(self) -> None:
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile([], 50), 0.0)
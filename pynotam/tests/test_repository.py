@@ -0,0 +1,126 @@
+import copy
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from .. import Notam
+from ..geo import area_center, bounding_box
+from ..repository import NotamRepository
+from ..store import NotamStore, Query
+from .test_helper import read_all_notams
+
+
+def ids(notams) -> list:
+    return [n.notam_id for n in notams]
+
+
+class TestNotamRepository(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+        self.repo = NotamRepository(batch_size=50)
+        self.addCleanup(self.repo.close)
+        self.assertEqual(self.repo.upsert(self.notams), len(self.notams))
+
+    def test_roundtrip(self) -> None:
+        for n in self.notams:
+            with self.subTest(notam_id=n.notam_id):
+                loaded = self.repo.get(n.notam_id)
+                self.assertEqual(loaded, n)
+                self.assertEqual(loaded.full_text, n.full_text)
+                self.assertEqual(loaded.decoded(), n.decoded())
+                self.assertEqual(loaded.created, n.created)
+                self.assertEqual(loaded.valid_till, n.valid_till)
+                self.assertEqual(getattr(loaded.valid_till, 'is_estimated', False),
+                                 getattr(n.valid_till, 'is_estimated', False))
+        self.assertIsNone(self.repo.get('Z0000/00'))
+
+    def test_queries_match_store(self) -> None:
+        store = NotamStore(self.notams)
+        self.assertEqual(ids(self.repo.active()), ids(store.query(Query())))
+        queries = [
+            Query(locations=['LLBG', 'LLHA']),
+            Query(firs=['EDMM', 'EGTT']),
+            Query(code_prefix='QMR'),
+            Query(code_prefix='QFAXX'),
+            Query(firs=['LLLL'], active_from=datetime(2023, 6, 1, tzinfo=timezone.utc),
+                  active_till=datetime(2023, 6, 2, tzinfo=timezone.utc)),
+        ]
+        for q in queries:
+            with self.subTest(query=q):
+                self.assertEqual(ids(self.repo.query(q)), ids(store.query(q)))
+
+    def test_bbox(self) -> None:
+        box = (31.0, 34.0, 33.0, 36.0)
+        expected = sorted(n.notam_id for n in NotamStore(self.notams).query(Query())
+                          if area_center(n) is not None and
+                          (lambda b: b[2] >= box[0] and b[0] <= box[2] and b[3] >= box[1] and b[1] <= box[3])(
+                              bounding_box(area_center(n), int(n.area['radius']))))
+        self.assertTrue(expected)
+        self.assertEqual(ids(self.repo.query(bbox=box)), expected)
+
+    def test_history(self) -> None:
+        original = self.notams[0]
+        replacement = copy.copy(original)
+        replacement.notam_id, replacement.notam_type, replacement.ref_notam_id = 'Z0002/24', 'REPLACE', original.notam_id
+        cancel = copy.copy(original)
+        cancel.notam_id, cancel.notam_type, cancel.ref_notam_id = 'Z0003/24', 'CANCEL', 'Z0002/24'
+        self.repo.upsert([replacement, cancel])
+        self.assertEqual(self.repo.superseded_by(original.notam_id), 'Z0002/24')
+        self.assertEqual(self.repo.superseded_by('Z0002/24'), 'Z0003/24')
+        active = ids(self.repo.active())
+        for i in (original.notam_id, 'Z0002/24', 'Z0003/24'):
+            self.assertNotIn(i, active)
+        everything = ids(self.repo.query(include_superseded=True))
+        self.assertIn(original.notam_id, everything)
+        self.assertIn('Z0003/24', everything)
+
+    def test_out_of_order_replacement(self) -> None:
+        original = copy.copy(self.notams[0])
+        original.notam_id = 'Z0010/24'
+        replacement = copy.copy(original)
+        replacement.notam_id, replacement.notam_type, replacement.ref_notam_id = 'Z0011/24', 'REPLACE', 'Z0010/24'
+        self.repo.upsert([replacement])
+        self.repo.upsert([original])
+        self.assertEqual(self.repo.superseded_by('Z0010/24'), 'Z0011/24')
+
+    def test_same_id_from_other_issuer(self) -> None:
+        ours = copy.copy(self.notams[0])
+        ours.notam_id, ours.source, ours.location = 'Z0020/24', 'EUECYIYN', ['ZZZA']
+        theirs = copy.copy(ours)
+        theirs.source, theirs.location = 'KDZZNAXX', ['ZZZB']
+        self.repo.upsert([ours, theirs])
+        self.assertEqual(self.repo.get('Z0020/24', 'EUECYIYN'), ours)
+        self.assertEqual(self.repo.get('Z0020/24', 'KDZZNAXX'), theirs)
+        self.assertEqual(ids(self.repo.query(Query(locations=['ZZZA', 'ZZZB']))), ['Z0020/24', 'Z0020/24'])
+
+        cancel = copy.copy(theirs)
+        cancel.notam_id, cancel.notam_type, cancel.ref_notam_id = 'Z0021/24', 'CANCEL', 'Z0020/24'
+        self.repo.upsert([cancel])
+        self.assertEqual(self.repo.superseded_by('Z0020/24', 'KDZZNAXX'), 'Z0021/24')
+        self.assertIsNone(self.repo.superseded_by('Z0020/24', 'EUECYIYN'))
+        self.assertEqual([n.location for n in self.repo.query(Query(locations=['ZZZA', 'ZZZB']))], [['ZZZA']])
+
+    def test_upsert_replaces_side_tables(self) -> None:
+        n = copy.copy(self.notams[0])
+        n.location = ['ZZZZ']
+        n.area = {}
+        n.indices_item_a = None
+        self.repo.upsert([n])
+        self.assertEqual(len(self.repo), len({m.notam_id for m in self.notams}))
+        self.assertEqual(ids(self.repo.query(Query(locations=['ZZZZ']))), [n.notam_id])
+        for loc in self.notams[0].location:
+            self.assertNotIn(n.notam_id, ids(self.repo.query(Query(locations=[loc]))))
+        self.assertNotIn(n.notam_id, ids(self.repo.query(bbox=(-90, -180, 90, 180))))
+
+    def test_warm_restart(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'notams.db')
+            with NotamRepository(path) as repo:
+                repo.upsert(self.notams)
+            with NotamRepository(path) as repo:
+                self.assertEqual(ids(repo.active()), ids(self.repo.active()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from .. import Notam
+from ..shm import SharedNotamPublisher, SharedNotamReader
+from .test_helper import read_all_notams
+
+
+def _count_in_worker(name: str) -> Tuple[int, Optional[str]]:
+    reader = SharedNotamReader(name)
+    try:
+        snapshot = reader.snapshot()
+        return len(snapshot), snapshot[0].notam_id
+    finally:
+        reader.close()
+
+
+class TestSharedMemory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+        self.publisher = SharedNotamPublisher('pynotam-test-{}'.format(os.getpid()))
+        self.reader = SharedNotamReader(self.publisher.name)
+
+    def tearDown(self) -> None:
+        self.reader.close()
+        self.publisher.close()
+
+    def test_roundtrip(self) -> None:
+        _ = self.publisher.publish(self.notams)
+        snapshot = self.reader.snapshot()
+        self.assertEqual(len(snapshot), len(self.notams))
+        for (original, shared) in zip(self.notams, snapshot):
+            self.assertEqual(original, shared)
+            for field in ('full_text', 'source', 'created', 'area', 'indices_item_c', 'indices_item_g'):
+                self.assertEqual(getattr(original, field), getattr(shared, field))
+            self.assertEqual(type(original.valid_till), type(shared.valid_till))
+        self.assertEqual(list(snapshot.column('fl_upper')), [n.fl_upper for n in self.notams])
+        self.assertTrue(snapshot.column('fl_upper').readonly)
+
+    def test_generations(self) -> None:
+        self.assertEqual(self.publisher.publish(self.notams), 1)
+        self.assertEqual(len(self.reader.snapshot()), len(self.notams))
+        for g in (2, 3, 4):
+            self.assertEqual(self.publisher.publish(self.notams[:g]), g)
+        snapshot = self.reader.snapshot()
+        self.assertEqual((snapshot.generation, len(snapshot)), (4, 4))
+        self.assertIs(self.reader.snapshot(), snapshot)
+
+    def test_other_process(self) -> None:
+        _ = self.publisher.publish(self.notams)
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            count, first_id = pool.submit(_count_in_worker, self.publisher.name).result()
+        self.assertEqual((count, first_id), (len(self.notams), self.notams[0].notam_id))
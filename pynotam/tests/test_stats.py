@@ -0,0 +1,110 @@
+import copy
+import pickle
+import unittest
+from collections import Counter
+from datetime import datetime, timezone
+
+from .. import Notam
+from ..stats import DIMENSIONS, NotamStats
+from ..store import NotamStore, Query
+from .test_helper import read_all_notams
+
+
+def recount(notams) -> dict:
+    """The reference: counters computed from scratch over the given (effective) NOTAMs."""
+    counts = {d: Counter() for d in DIMENSIONS}
+    for n in notams:
+        counts['fir'][n.fir] += 1
+        counts['subject'][n.notam_code[1:3]] += 1
+        counts['condition'][n.notam_code[3:5]] += 1
+        for d in ('traffic_type', 'purpose', 'scope'):
+            counts[d].update(getattr(n, d))
+        counts['hour'][n.valid_from.replace(minute=0, second=0)] += 1
+    return {d: dict(c) for (d, c) in counts.items()}
+
+
+class TestNotamStats(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+        self.effective = NotamStore(self.notams).query(Query())
+
+    def test_counts(self) -> None:
+        stats = NotamStats(self.notams)
+        self.assertEqual(len(stats), len(self.effective))
+        self.assertEqual(stats.snapshot(), recount(self.effective))
+        self.assertEqual(stats.count('fir', 'LLLL'), sum(1 for n in self.effective if n.fir == 'LLLL'))
+        self.assertEqual(stats.count('fir', 'XXXX'), 0)
+        with self.assertRaises(TypeError):
+            stats.counts('fir')['LLLL'] = 0  # type: ignore[index]
+
+    def test_replace_and_cancel(self) -> None:
+        stats = NotamStats(self.notams)
+        view = stats.counts('fir')
+        original = self.effective[0]
+        before = view[original.fir]
+        replacement = copy.copy(original)
+        replacement.notam_id, replacement.notam_type, replacement.ref_notam_id = 'Z0002/24', 'REPLACE', original.notam_id
+        replacement.fir = 'ZZZZ'
+        stats.apply(replacement)
+        self.assertEqual(view.get(original.fir, 0), before - 1)
+        self.assertEqual(view['ZZZZ'], 1)
+        cancel = copy.copy(replacement)
+        cancel.notam_id, cancel.notam_type, cancel.ref_notam_id = 'Z0003/24', 'CANCEL', 'Z0002/24'
+        stats.apply(cancel)
+        self.assertNotIn('ZZZZ', view)
+        self.assertEqual(len(stats), len(self.effective) - 1)
+
+    def feed(self) -> list:
+        """The corpus, followed by NOTAMRs and NOTAMCs of some of its NOTAMs."""
+        feed = list(self.notams)
+        for (i, n) in enumerate(self.effective[::5]):
+            update = copy.copy(n)
+            update.notam_id = 'Z{:04d}/24'.format(i + 1)
+            update.notam_type, update.ref_notam_id = ('REPLACE', 'CANCEL')[i % 2], n.notam_id
+            feed.append(update)
+        return feed
+
+    def test_merge(self) -> None:
+        feed = self.feed()
+        effective = NotamStore(feed).query(Query())
+        # The raw feed is partitioned, so that NOTAMRs and NOTAMCs mostly land in another part than the NOTAM they
+        # reference.
+        parts = [NotamStats(feed[i::3]) for i in range(3)]
+        parts = [pickle.loads(pickle.dumps(p)) for p in parts]  # as if returned by worker processes
+        merged = NotamStats.merged(parts)
+        self.assertEqual(len(merged), len(effective))
+        self.assertEqual(merged.snapshot(), NotamStats(feed).snapshot())
+        self.assertEqual(merged.snapshot(), recount(effective))
+        self.assertEqual(NotamStats.merged(reversed(parts)).snapshot(), recount(effective))
+        merged.merge(parts[0])  # merging again does not count twice
+        self.assertEqual(merged.snapshot(), recount(effective))
+
+    def test_merge_cancelled_elsewhere(self) -> None:
+        n = self.effective[0]
+        cancel = copy.copy(n)
+        cancel.notam_id, cancel.notam_type, cancel.ref_notam_id = 'Z0001/24', 'CANCEL', n.notam_id
+        self.assertEqual(len(NotamStats([n, cancel])), 0)
+        self.assertEqual(len(NotamStats.merged([NotamStats([n]), NotamStats([cancel])])), 0)
+        self.assertEqual(len(NotamStats.merged([NotamStats([cancel]), NotamStats([n])])), 0)
+
+    def test_retired_only_across_parts(self) -> None:
+        feed = self.feed()
+        local = NotamStats(feed)
+        # Only the references to NOTAMs that are not in the feed are kept for merging.
+        unknown = {n.ref_notam_id for n in feed if n.notam_type in ('REPLACE', 'CANCEL')} - \
+            {n.notam_id for n in feed if n.notam_type != 'CANCEL'}
+        self.assertEqual(local._retired, unknown)
+        parts = [NotamStats(feed[i::3]) for i in range(3)]
+        self.assertLess(len(NotamStats.merged(parts)._retired),
+                        sum(1 for n in feed if n.notam_type in ('REPLACE', 'CANCEL')))
+
+    def test_histogram(self) -> None:
+        stats = NotamStats(self.effective)
+        start, end = datetime(2023, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 1, tzinfo=timezone.utc)
+        hist = stats.histogram(start, end)
+        self.assertEqual([h for (h, _) in hist], sorted(h for (h, _) in hist))
+        self.assertEqual(sum(c for (_, c) in hist), sum(1 for n in self.effective if start <= n.valid_from < end))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import copy
+import unittest
+from datetime import datetime, timezone
+
+from .. import Notam
+from ..store import NotamStore, Query, ShardedNotamStore, shard_of
+from .test_helper import read_all_notams
+
+
+def ids(notams) -> list:
+    return [n.notam_id for n in notams]
+
+
+class TestNotamStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+        self.store = NotamStore(self.notams)
+        # The expected state: the last NOTAM for every id, minus those replaced or cancelled later on.
+        self.effective = {}
+        for n in self.notams:
+            if n.notam_type in ('REPLACE', 'CANCEL'):
+                self.effective.pop(n.ref_notam_id, None)
+            if n.notam_type != 'CANCEL':
+                self.effective[n.notam_id] = n
+
+    def scan(self, query: Query) -> list:
+        return sorted(i for (i, n) in self.effective.items() if query.matches(n))
+
+    def test_queries(self) -> None:
+        self.assertEqual(len(self.store), len(self.effective))
+        queries = [
+            Query(),
+            Query(locations=['LLBG', 'LLHA']),
+            Query(firs=['EDMM', 'EGTT']),
+            Query(locations=['EGTT'], firs=['EGTT']),
+            Query(code_prefix='QMR'),
+            Query(active_from=datetime(2023, 6, 1, tzinfo=timezone.utc),
+                  active_till=datetime(2023, 6, 2, tzinfo=timezone.utc)),
+        ]
+        for q in queries:
+            with self.subTest(query=q):
+                self.assertEqual(ids(self.store.query(q)), self.scan(q))
+        self.assertGreater(len(self.store.query(Query(firs=['LLLL']))), 0)
+
+    def test_replace_and_cancel(self) -> None:
+        n = copy.copy(self.notams[0])
+        replacement = copy.copy(n)
+        replacement.notam_id, replacement.notam_type, replacement.ref_notam_id = 'Z9999/99', 'REPLACE', n.notam_id
+        self.store.apply(replacement)
+        self.assertNotIn(n.notam_id, self.store)
+        self.assertIs(self.store.get('Z9999/99'), replacement)
+        cancel = copy.copy(n)
+        cancel.notam_id, cancel.notam_type, cancel.ref_notam_id = 'Z9998/99', 'CANCEL', 'Z9999/99'
+        self.store.apply(cancel)
+        self.assertNotIn('Z9999/99', self.store)
+        self.assertNotIn('Z9998/99', self.store)
+
+
+class TestShardedNotamStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.notams = [Notam.from_str(s) for s in read_all_notams()]
+        cls.reference = NotamStore(cls.notams)
+
+    def test_matches_single_store(self) -> None:
+        for by in ('fir', 'id'):
+            with self.subTest(by=by), ShardedNotamStore(shards=3, by=by) as store:
+                store.apply_many(self.notams)
+                self.assertEqual(len(store), len(self.reference))
+                self.assertEqual(sum(store.sizes()), len(self.reference))
+                for q in (Query(), Query(firs=['LLLL']), Query(locations=['EGTT', 'LLBG']), Query(code_prefix='QF')):
+                    self.assertEqual(ids(store.query(q)), ids(self.reference.query(q)))
+                n = self.notams[0]
+                self.assertEqual(store.get(n.notam_id), self.reference.get(n.notam_id))
+                self.assertIsNone(store.get('Z0000/00'))
+
+    def test_routing_across_shards(self) -> None:
+        with ShardedNotamStore(shards=4, by='fir') as store:
+            original = copy.copy(self.notams[0])
+            original.notam_id, original.fir = 'Z0001/24', 'EDMM'
+            store.apply(original)
+            # The replacement lies in another FIR, and so on another shard than the NOTAM it replaces.
+            replacement = copy.copy(original)
+            replacement.notam_id, replacement.notam_type, replacement.ref_notam_id = 'Z0002/24', 'REPLACE', 'Z0001/24'
+            replacement.fir = next(f for f in ('LLLL', 'EGTT', 'LOVV', 'EKDK') if shard_of(f, 4) != shard_of('EDMM', 4))
+            self.assertNotEqual(store._route(replacement), store._route(original))
+            store.apply(replacement)
+            self.assertEqual(sum(store.sizes()), 1)
+            self.assertEqual(ids(store.query(Query())), ['Z0002/24'])
+            self.assertEqual(store.query(Query(firs=['EDMM'])), [])
+
+            cancel = copy.copy(original)
+            cancel.notam_id, cancel.notam_type, cancel.ref_notam_id = 'Z0003/24', 'CANCEL', 'Z0002/24'
+            store.apply(cancel)
+            self.assertEqual(sum(store.sizes()), 0)
+            self.assertEqual(len(store), 0)
+
+    def test_failed_shard_keeps_map(self) -> None:
+        with ShardedNotamStore(shards=4, by='fir') as store:
+            original = copy.copy(self.notams[0])
+            original.notam_id, original.fir = 'Z0001/24', 'EDMM'
+            store.apply(original)
+            # The shard of the replacement fails to index it (it has no locations), after the shard of the
+            # replaced NOTAM has discarded it.
+            replacement = copy.copy(original)
+            replacement.notam_id, replacement.notam_type, replacement.ref_notam_id = 'Z0002/24', 'REPLACE', 'Z0001/24'
+            replacement.fir = next(f for f in ('LLLL', 'EGTT', 'LOVV', 'EKDK') if shard_of(f, 4) != shard_of('EDMM', 4))
+            setattr(replacement, 'location', None)
+            with self.assertRaises(TypeError):
+                store.apply(replacement)
+            self.assertNotIn('Z0002/24', store)
+            self.assertNotIn('Z0001/24', store)
+            self.assertEqual(len(store), sum(store.sizes()))
+
+    def test_errors_are_raised(self) -> None:
+        with ShardedNotamStore(shards=2) as store:
+            with self.assertRaises(ValueError):
+                store.apply(Notam())
+        with self.assertRaises(ValueError):
+            NotamStore().add(Notam())
+        with self.assertRaises(ValueError):
+            ShardedNotamStore(shards=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
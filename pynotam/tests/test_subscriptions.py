@@ -0,0 +1,74 @@
+import datetime
+import random
+import unittest
+from typing import Any, Dict, List, Sequence, cast
+
+from .. import Notam
+from ..subscriptions import Subscription, SubscriptionMatcher
+from .test_helper import read_all_notams
+
+UTC = datetime.timezone.utc
+
+
+def random_subscriptions(notams: Sequence[Notam], count: int, seed: int = 0) -> List[Subscription]:
+    rnd = random.Random(seed)
+    locations = sorted({loc for n in notams for loc in n.location})
+    codes = sorted({n.notam_code for n in notams if n.notam_code is not None})
+    subs: List[Subscription] = []
+    for i in range(count):
+        kind = i % 5
+        kwargs: Dict[str, Any] = {}
+        if kind == 0:
+            kwargs['locations'] = rnd.sample(locations, rnd.randint(1, 2))
+        elif kind == 1:
+            kwargs['center'] = (rnd.uniform(29, 52), rnd.uniform(-6, 36))
+            kwargs['radius_nm'] = rnd.choice([5, 20, 100])
+        elif kind == 2:
+            kwargs['firs'] = [rnd.choice(['LLLL', 'EDMM', 'EGXX'])]
+        elif kind == 3:
+            kwargs['code_prefix'] = rnd.choice(codes)[:rnd.randint(2, 5)]
+        if rnd.random() < 0.3:
+            kwargs['fl_lower'] = rnd.choice([0, 100, 200])
+        if rnd.random() < 0.3:
+            start = datetime.datetime(rnd.randint(1990, 2023), 1, 1, tzinfo=UTC)
+            kwargs.update(valid_from=start, valid_till=start + datetime.timedelta(days=365))
+        subs.append(Subscription(i, **kwargs))
+    return subs
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.notams = [Notam.from_str(s) for s in read_all_notams()]
+
+    def test_examples(self) -> None:
+        matcher = SubscriptionMatcher([
+            Subscription('runways-llbg', code_prefix='QMR', locations=['LLBG']),
+            Subscription('near-munich-above-fl10', center=(48.35, 11.78), radius_nm=20, fl_lower=10),
+        ])
+        for n in self.notams:
+            with self.subTest(notam=n.notam_id):
+                expected = set()
+                if 'LLBG' in n.location and (n.notam_code or '').startswith('QMR'):
+                    expected.add('runways-llbg')
+                if n.notam_id in ('A2464/23', 'C2557/23'):  # the latter has a radius of 999 NM
+                    expected.add('near-munich-above-fl10')
+                self.assertEqual(set(matcher.match(n)), expected)
+
+    def test_matches_linear_scan(self) -> None:
+        subs = random_subscriptions(self.notams, 2000)
+        matcher = SubscriptionMatcher(subs)
+        for n in self.notams:
+            self.assertEqual(sorted(cast(List[int], matcher.match(n))), [s.id for s in subs if s.matches(n)])
+            self.assertLess(len(matcher.candidates(n)), len(subs) // 2)
+
+    def test_remove_and_prune(self) -> None:
+        subs = random_subscriptions(self.notams, 200)
+        matcher = SubscriptionMatcher(subs)
+        for s in subs[:100]:
+            matcher.remove(s.id)
+        self.assertEqual(len(matcher), 100)
+        pruned = matcher.prune(datetime.datetime(2030, 1, 1, tzinfo=UTC))
+        self.assertEqual(pruned, sum(1 for s in subs[100:] if s.valid_till is not None))
+        for n in self.notams:
+            self.assertEqual(sorted(cast(List[int], matcher.match(n))),
+                             [s.id for s in subs[100:] if s.valid_till is None and s.matches(n)])
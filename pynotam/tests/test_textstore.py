@@ -0,0 +1,58 @@
+import pickle
+import unittest
+
+from .. import Notam
+from ..textstore import CompressedTextStore, ZlibCodec, ZstdCodec, is_zstd_available, train_codec
+from .test_helper import read_all_notams
+
+
+class TestCompressedTextStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.texts = read_all_notams()
+        codecs = [ZlibCodec(), ZlibCodec(b''), ZlibCodec.train(self.texts[::2]), train_codec(self.texts[::2])]
+        if is_zstd_available():
+            codecs += [ZstdCodec(), ZstdCodec.train(self.texts[::2])]
+        self.codecs = codecs
+
+    def test_roundtrip(self) -> None:
+        for codec in self.codecs:
+            with self.subTest(codec=codec.name):
+                store = CompressedTextStore(codec)
+                for (i, t) in enumerate(self.texts):
+                    store.put(str(i), t)
+                self.assertEqual([store.get(str(i)) for i in range(len(self.texts))], self.texts)
+                self.assertEqual(store.raw_size, sum(len(t.encode()) for t in self.texts))
+                self.assertLess(store.compressed_size, store.raw_size)
+                self.assertTrue(store.discard('0'))
+                self.assertIsNone(store.get('0'))
+                self.assertEqual(store.raw_size, sum(len(t.encode()) for t in self.texts[1:]))
+
+    def test_dictionary_helps(self) -> None:
+        sizes = {}
+        for (label, codec) in (('none', ZlibCodec(b'')), ('icao', ZlibCodec()), ('trained', train_codec(self.texts[::2]))):
+            store = CompressedTextStore(codec)
+            for (i, t) in enumerate(self.texts[1::2]):
+                store.put(str(i), t)
+            sizes[label] = store.compressed_size
+        self.assertLess(sizes['icao'], sizes['none'])
+        self.assertLess(sizes['trained'], sizes['icao'])
+
+    def test_detached_notams(self) -> None:
+        store = CompressedTextStore(train_codec(self.texts))
+        for text in self.texts:
+            n = Notam.from_str(text)
+            expected_e, expected_decoded = n.full_text[slice(*n.indices_item_e)], n.decoded()
+            store.detach(n)
+            self.assertIsNone(n.full_text)
+            self.assertEqual(store.item(n, 'e'), expected_e)
+            self.assertEqual(store.full_text(n), text)
+            self.assertEqual(store.attach(n).decoded(), expected_decoded)
+
+    def test_pickle(self) -> None:
+        for codec in self.codecs:
+            data = codec.compress(self.texts[0].encode())
+            self.assertEqual(pickle.loads(pickle.dumps(codec)).decompress(data).decode(), self.texts[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from .. import Notam
+from ..batch import iter_parse
+from .test_helper import read_all_notams
+
+
+class TestThreadSafety(unittest.TestCase):
+    def setUp(self) -> None:
+        self.texts = read_all_notams()
+        self.expected = [Notam.from_str(t) for t in self.texts]
+
+    def test_instances_do_not_share_containers(self) -> None:
+        a, b = Notam(), Notam()
+        a.location.append('EGLL')
+        a.traffic_type.add('IFR')
+        self.assertEqual((b.location, b.traffic_type, Notam.location), ([], set(), []))
+
+    def test_concurrent_parsing(self) -> None:
+        threads = 8
+        barrier = threading.Barrier(threads)
+
+        def worker(offset: int) -> List[Notam]:
+            _ = barrier.wait()  # maximize overlap between the threads
+            order = self.texts[offset:] + self.texts[:offset]
+            return [Notam.from_str(t) for t in order * 3]
+
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(worker, [i * 17 for i in range(threads)]))
+        for (i, parsed) in enumerate(results):
+            offset = i * 17
+            expected = (self.expected[offset:] + self.expected[:offset]) * 3
+            self.assertEqual([n.fingerprint() for n in parsed], [n.fingerprint() for n in expected])
+            self.assertEqual([n.created for n in parsed], [n.created for n in expected])
+
+    def test_thread_pool_batch(self) -> None:
+        items = [('corpus', i, t) for (i, t) in enumerate(self.texts)]
+        results = list(iter_parse(items, workers=4, chunk_size=5, use_threads=True))
+        self.assertEqual([r.value for r in results], self.expected)
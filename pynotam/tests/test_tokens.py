@@ -0,0 +1,60 @@
+import unittest
+from typing import Iterable, List, Tuple
+
+from .. import Notam
+from ..abbreviations import ICAO, AbbreviationDictionary
+from ..tokens import ABBREVIATION, COORDINATE, FLIGHT_LEVEL, NUMBER, WORD, Token, tokenize
+from .test_helper import read_all_notams
+
+
+def spans(text: str, stream: Iterable[Token]) -> List[Tuple[int, str]]:
+    return [(t.kind, text[t.start:t.end]) for t in stream]
+
+
+class TestTokenize(unittest.TestCase):
+    def test_kinds(self) -> None:
+        text = 'RWY 09L/27R CLSD FL 100 TO FL245 WI 482114N 0114530E 2.5NM RADIUS 1200-1500 A/G'
+        self.assertEqual(spans(text, tokenize(text)), [
+            (ABBREVIATION, 'RWY'), (WORD, '09L'), (WORD, '27R'), (ABBREVIATION, 'CLSD'), (FLIGHT_LEVEL, 'FL 100'),
+            (WORD, 'TO'), (FLIGHT_LEVEL, 'FL245'), (ABBREVIATION, 'WI'), (COORDINATE, '482114N 0114530E'),
+            (NUMBER, '2'), (WORD, '5NM'), (WORD, 'RADIUS'), (NUMBER, '1200'), (NUMBER, '1500'),
+            (ABBREVIATION, 'A/G')])
+
+    def test_abbreviations_win(self) -> None:
+        d = AbbreviationDictionary({'FL': 'flight level'})
+        stream = tokenize('FL 100', abbreviations=d)
+        self.assertEqual(spans('FL 100', stream), [(ABBREVIATION, 'FL'), (NUMBER, '100')])
+        self.assertEqual(stream.expansion(stream[0]), 'flight level')
+        self.assertEqual(stream[0].abbreviation, 0)
+        self.assertIsNone(stream.expansion(stream[1]))
+
+    def test_ranges(self) -> None:
+        text = 'RWY CLSD RWY WIP'
+        stream = tokenize(text, [(9, -1), (0, 3)])
+        self.assertEqual(spans(text, stream), [(ABBREVIATION, 'RWY'), (ABBREVIATION, 'RWY'), (ABBREVIATION, 'WIP')])
+        self.assertEqual(list(stream.between(4, 16)), [stream[1], stream[2]])
+        self.assertEqual(stream[-1], Token(ABBREVIATION, 13, 16, stream[-1].abbreviation))
+        self.assertEqual(len(stream[:2]), 2)
+
+    def test_decode_matches_dictionary(self) -> None:
+        for text in read_all_notams():
+            with self.subTest(text=text[:20]):
+                self.assertEqual(tokenize(text).decode(text), ICAO.decode(text))
+
+
+class TestNotamTokens(unittest.TestCase):
+    def test_cached(self) -> None:
+        n = Notam.from_str(read_all_notams()[0])
+        stream = n.tokens()
+        self.assertIs(n.tokens(), stream)
+        self.assertIs(n.tokens('icao'), stream)
+        ranges = [r for r in (n.indices_item_d, n.indices_item_e, n.indices_item_f, n.indices_item_g) if r]
+        self.assertTrue(all(any(s <= t.start < t.end <= e for (s, e) in ranges) for t in stream))
+
+        other = n.tokens(AbbreviationDictionary({'RWY': 'runway'}))
+        self.assertIsNot(other, stream)
+        n.full_text = n.full_text + ' '
+        self.assertIsNot(n.tokens(), stream)
+        n.full_text = None
+        with self.assertRaises(ValueError):
+            n.tokens()
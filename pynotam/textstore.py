@@ -0,0 +1,232 @@
+"""Compressed storage of the full texts of NOTAMs.
+
+NOTAM texts are short and highly repetitive, so compressing each one on its own only pays off with a dictionary
+of the strings they have in common. With the optional 'zstandard' dependency (install with the 'zstd' extra), a
+zstd dictionary can be trained on a sample of texts; without it, zlib is used with a preset dictionary, either
+built from the ICAO abbreviations and common NOTAM phrasing or taken from sample texts.
+
+Texts are compressed one record at a time, so any of them can be decompressed on its own. Decompression restores
+them exactly, so the indices_item_* of their NOTAMs remain valid."""
+from __future__ import annotations
+
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from typing_extensions import override
+
+from ._abbr import ICAO_abbr
+
+_zstd: Optional[ModuleType]
+try:
+    import zstandard as _zstandard
+except ImportError:  # pragma: no cover
+    _zstd = None
+else:
+    _zstd = _zstandard
+
+if TYPE_CHECKING:
+    from . import Notam
+
+DEFAULT_DICT_SIZE = 16 * 1024
+_ZLIB_MAX_DICT = 32 * 1024
+
+_COMMON = ('CREATED: ', 'SOURCE: ', ' NOTAMN\nQ) ', ' NOTAMR ', ' NOTAMC ', '/IV/NBO/A/000/999/', '/IV/BO/W/',
+           '/IV/M/AE/000/999/', '\nA) ', ' B) ', ' C) ', '\nD) ', '\nE) ', '\nF) SFC G) ', 'RWY ', 'TWY ', ' CLSD',
+           ' AVBL', ' U/S', ' WIP', ' PERM', ' EST', ' FL', ' FT AMSL', ' AGL', ' DUE TO ', ' NM RADIUS ')
+
+
+def is_zstd_available() -> bool:
+    return _zstd is not None
+
+
+def icao_dictionary() -> bytes:
+    """A zlib preset dictionary built from the ICAO abbreviations and fragments common to most NOTAMs. Strings
+    likely to occur most often come last, where zlib can refer to them most cheaply."""
+    abbrs = ' '.join(sorted(ICAO_abbr, key=len, reverse=True))
+    return (abbrs + ' ' + ''.join(_COMMON)).encode()[-_ZLIB_MAX_DICT:]
+
+
+def sample_dictionary(samples: Iterable[str], size: int = _ZLIB_MAX_DICT) -> bytes:
+    """A zlib preset dictionary made of the most frequent lines of the sample texts, most frequent last."""
+    counts: Counter[str] = Counter()
+    for s in samples:
+        counts.update(line + '\n' for line in s.split('\n'))
+    chosen: List[bytes] = []
+    total = 0
+    for (line, _) in counts.most_common():
+        b = line.encode()
+        if total + len(b) > size:
+            continue
+        chosen.append(b)
+        total += len(b)
+    return b''.join(reversed(chosen))
+
+
+class TextCodec(ABC):
+    """Compresses and decompresses individual texts."""
+
+    name = ''
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes: ...
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes: ...
+
+
+class ZlibCodec(TextCodec):
+    """zlib (deflate) with a preset dictionary; the ICAO dictionary if none is given."""
+
+    name = 'zlib'
+
+    def __init__(self, dictionary: Optional[bytes] = None, level: int = 9):
+        self.dictionary = icao_dictionary() if dictionary is None else dictionary[-_ZLIB_MAX_DICT:]
+        self.level = level
+
+    @classmethod
+    def train(cls, samples: Iterable[str], level: int = 9) -> ZlibCodec:
+        return cls(sample_dictionary(samples), level)
+
+    @override
+    def compress(self, data: bytes) -> bytes:
+        c = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=self.dictionary) \
+            if self.dictionary else zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return c.compress(data) + c.flush()
+
+    @override
+    def decompress(self, data: bytes) -> bytes:
+        d = zlib.decompressobj(-zlib.MAX_WBITS, zdict=self.dictionary) if self.dictionary \
+            else zlib.decompressobj(-zlib.MAX_WBITS)
+        return d.decompress(data) + d.flush()
+
+
+class ZstdCodec(TextCodec):
+    """zstd, optionally with a dictionary (raw bytes, or as trained by train()). Requires 'zstandard'."""
+
+    name = 'zstd'
+
+    def __init__(self, dictionary: Optional[bytes] = None, level: int = 19):
+        self._setup(dictionary, level)
+
+    def _setup(self, dictionary: Optional[bytes], level: int) -> None:
+        if _zstd is None:
+            raise ImportError("ZstdCodec requires the optional 'zstandard' dependency (pip install 'pynotam[zstd]')")
+        self._module: ModuleType = _zstd
+        self.dictionary = dictionary
+        self.level = level
+        self._dict = self._module.ZstdCompressionDict(dictionary) if dictionary else None
+        # zstandard's (de)compressor objects must not be used by several threads at once.
+        self._local = threading.local()
+
+    @classmethod
+    def train(cls, samples: Iterable[str], size: int = DEFAULT_DICT_SIZE, level: int = 19) -> ZstdCodec:
+        if _zstd is None:
+            raise ImportError("ZstdCodec requires the optional 'zstandard' dependency (pip install 'pynotam[zstd]')")
+        trained = _zstd.train_dictionary(size, [s.encode() for s in samples])
+        return cls(trained.as_bytes(), level)
+
+    def _objects(self) -> Any:
+        local = self._local
+        if not hasattr(local, 'compressor'):
+            kwargs = {'dict_data': self._dict} if self._dict is not None else {}
+            local.compressor = self._module.ZstdCompressor(level=self.level, write_checksum=False,
+                                                           write_dict_id=False, **kwargs)
+            local.decompressor = self._module.ZstdDecompressor(**kwargs)
+        return local
+
+    @override
+    def compress(self, data: bytes) -> bytes:
+        return self._objects().compressor.compress(data)
+
+    @override
+    def decompress(self, data: bytes) -> bytes:
+        return self._objects().decompressor.decompress(data)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {'dictionary': self.dictionary, 'level': self.level}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._setup(state['dictionary'], state['level'])
+
+
+def train_codec(samples: Iterable[str]) -> TextCodec:
+    """The best available codec for texts like the given samples: zstd with a trained dictionary if 'zstandard'
+    is installed, zlib with a dictionary of frequent sample lines otherwise."""
+    samples = list(samples)
+    if _zstd is not None:
+        try:
+            return ZstdCodec.train(samples)
+        except _zstd.ZstdError:  # too few samples to train on
+            pass
+    return ZlibCodec.train(samples)
+
+
+class CompressedTextStore(object):
+    """Compressed texts by key (e.g. notam_id), each decompressed on demand.
+
+    detach() moves a NOTAM's full text into the store, leaving the (much smaller) parsed fields in memory, and
+    full_text()/item()/attach() get it back when needed."""
+
+    def __init__(self, codec: Optional[TextCodec] = None):
+        self.codec = codec if codec is not None else ZlibCodec()
+        # key -> (compressed text, size of the uncompressed text)
+        self._texts: Dict[str, Tuple[bytes, int]] = {}
+        self.raw_size = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._texts
+
+    @property
+    def compressed_size(self) -> int:
+        """Total size of the compressed texts, in bytes."""
+        return sum(len(b) for (b, _) in self._texts.values())
+
+    def put(self, key: str, text: str) -> None:
+        _ = self.discard(key)
+        raw = text.encode()
+        self._texts[key] = (self.codec.compress(raw), len(raw))
+        self.raw_size += len(raw)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._texts.get(key)
+        return self.codec.decompress(entry[0]).decode() if entry is not None else None
+
+    def discard(self, key: str) -> bool:
+        entry = self._texts.pop(key, None)
+        if entry is None:
+            return False
+        self.raw_size -= entry[1]
+        return True
+
+    def detach(self, notam: "Notam") -> None:
+        """Stores the NOTAM's full text under its notam_id, and clears it from the NOTAM."""
+        if notam.notam_id is None or notam.full_text is None:
+            raise ValueError('cannot store the text of a NOTAM without a notam_id or full text')
+        self.put(notam.notam_id, notam.full_text)
+        notam.full_text = None
+
+    def full_text(self, notam: "Notam") -> Optional[str]:
+        """The NOTAM's full text: its own, or else the one stored under its notam_id."""
+        if notam.full_text is not None or notam.notam_id is None:
+            return notam.full_text
+        return self.get(notam.notam_id)
+
+    def item(self, notam: "Notam", item: str) -> Optional[str]:
+        """The text of one of the NOTAM's items 'a' through 'g', as delimited by its indices_item_*."""
+        rng = getattr(notam, 'indices_item_{}'.format(item))
+        text = self.full_text(notam)
+        if rng is None or text is None:
+            return None
+        return text[rng[0]:rng[1]]
+
+    def attach(self, notam: "Notam") -> "Notam":
+        """Restores the NOTAM's full text from the store (e.g. to call decoded() on it). Returns the NOTAM."""
+        notam.full_text = self.full_text(notam)
+        return notam
@@ -0,0 +1,177 @@
+"""Tokenization of the free-text items of NOTAMs, shared by everything that looks at their words.
+
+tokenize() scans the items D) to G) of a NOTAM once and classifies every token as an abbreviation (of a given
+dictionary), a number, a coordinate, a flight level or a plain word. The result is a TokenStream: a flat array of
+(kind, start, end, abbreviation id) records, with spans indexing into the NOTAM's full text, which Notam.tokens()
+computes once per NOTAM and dictionary and caches. Decoding, searching or highlighting then iterate over the
+tokens rather than scanning the text again.
+
+Tokens follow the word boundaries used for decoding (see pynotam.abbreviations), so that decoding the
+abbreviation tokens of a stream gives the same text as AbbreviationDictionary.decode."""
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union, overload
+
+from typing_extensions import override
+
+from .abbreviations import TOKEN_REGEX, AbbreviationDictionary, resolve, split_compound
+
+if TYPE_CHECKING:
+    from . import Notam
+
+WORD = 0
+ABBREVIATION = 1
+NUMBER = 2
+COORDINATE = 3
+FLIGHT_LEVEL = 4
+
+KIND_NAMES = ('word', 'abbreviation', 'number', 'coordinate', 'flight_level')
+
+ITEMS = ('d', 'e', 'f', 'g')
+
+_scan_regex = re.compile(r"""
+    (?P<coordinate>\b[0-9]{4,6}(?:\.[0-9]+)?[NS]\ ?[0-9]{5,7}(?:\.[0-9]+)?[EW]\b)
+  | (?P<flight_level>\bFL\ ?[0-9]{2,3}\b)
+  | (?P<number>\b[0-9]+\.[0-9]+\b)
+  | \w+(?:[/-]\w+)*
+""", re.VERBOSE)
+_KINDS = {'coordinate': COORDINATE, 'flight_level': FLIGHT_LEVEL, 'number': NUMBER}
+
+_FIELDS = 4
+
+
+class Token(NamedTuple):
+    """One of WORD, ABBREVIATION, NUMBER, COORDINATE or FLIGHT_LEVEL."""
+    kind: int
+    """[start, end) of the token in the full text of the NOTAM."""
+    start: int
+    end: int
+    """For an abbreviation, its rank in the dictionary (see AbbreviationDictionary.entry); -1 otherwise."""
+    abbreviation: int
+
+
+class TokenStream(Sequence[Token]):
+    """The tokens of a text, in order, as a compact array of four ints per token."""
+
+    __slots__ = ('dictionary', 'data', '_starts')
+
+    def __init__(self, data: array[int], dictionary: AbbreviationDictionary):
+        self.dictionary = dictionary
+        self.data = data
+        self._starts: Optional[array[int]] = None
+
+    @override
+    def __len__(self) -> int:
+        return len(self.data) // _FIELDS
+
+    @overload
+    def __getitem__(self, i: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[Token]: ...
+
+    @override
+    def __getitem__(self, i: Union[int, slice]) -> Union[Token, List[Token]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('token index out of range')
+        k = i * _FIELDS
+        return Token(*self.data[k:k + _FIELDS])
+
+    @override
+    def __iter__(self) -> Iterator[Token]:
+        data = self.data
+        for k in range(0, len(data), _FIELDS):
+            yield Token(data[k], data[k + 1], data[k + 2], data[k + 3])
+
+    def of_kind(self, kind: int) -> Iterator[Token]:
+        return (t for t in self if t.kind == kind)
+
+    def between(self, start: int, end: int) -> Iterator[Token]:
+        """The tokens that start within [start, end) of the text, e.g. those of one item."""
+        if self._starts is None:
+            self._starts = self.data[1::_FIELDS]
+        i = bisect_left(self._starts, start)
+        data = self.data
+        for k in range(i * _FIELDS, len(data), _FIELDS):
+            if data[k + 1] >= end:
+                break
+            yield Token(data[k], data[k + 1], data[k + 2], data[k + 3])
+
+    def expansion(self, token: Token) -> Optional[str]:
+        """The un-abbreviated form of an abbreviation token; None for other tokens."""
+        return self.dictionary.entry(token.abbreviation)[1] if token.abbreviation >= 0 else None
+
+    def decode(self, text: str) -> str:
+        """The text the tokens were taken from, with their abbreviations decoded."""
+        out: List[str] = []
+        last = 0
+        data = self.data
+        for k in range(0, len(data), _FIELDS):
+            if data[k] == ABBREVIATION:
+                out.append(text[last:data[k + 1]])
+                out.append(self.dictionary.entry(data[k + 3])[1])
+                last = data[k + 2]
+        out.append(text[last:])
+        return ''.join(out)
+
+
+def _word_kind(word: str) -> int:
+    return NUMBER if word.isdigit() else WORD
+
+
+def tokenize(text: str, ranges: Sequence[Tuple[int, int]] = ((0, -1),),
+             abbreviations: Union[None, str, AbbreviationDictionary] = None) -> TokenStream:
+    """Tokenizes the given [start, end) ranges of the text (by default all of it; an end of -1 stands for the end
+    of the text), recognizing the abbreviations of the given dictionary (default: ICAO)."""
+    dictionary = resolve(abbreviations)
+    (lookup, max_seps, _) = dictionary.table()
+    data = array('i')
+    for (start, end) in sorted(ranges):
+        txt = text[start:end] if end >= 0 else text[start:]
+        pos = 0
+        while True:
+            m = _scan_regex.search(txt, pos)
+            if m is None:
+                break
+            if m.lastgroup is not None:
+                # Coordinates, flight levels and decimals are only taken as such if they consist of whole words
+                # that are not abbreviations, so that they never hide an abbreviation from decoding.
+                words: List[re.Match[str]] = []
+                for w in TOKEN_REGEX.finditer(txt, m.start()):
+                    if w.start() >= m.end():
+                        break
+                    words.append(w)
+                if words[-1].end() == m.end() and not any(w.group() in lookup for w in words):
+                    data.extend((_KINDS[m.lastgroup], start + m.start(), start + m.end(), -1))
+                    pos = m.end()
+                    continue
+                m = words[0]
+            token = m.group()
+            offset = start + m.start()
+            if '/' not in token and '-' not in token:
+                hit = lookup.get(token)
+                if hit is not None:
+                    data.extend((ABBREVIATION, offset, offset + len(token), hit[0]))
+                else:
+                    data.extend((_word_kind(token), offset, offset + len(token), -1))
+            else:
+                for (s, e, hit) in split_compound(token, lookup, max_seps):
+                    if hit is not None:
+                        data.extend((ABBREVIATION, offset + s, offset + e, hit[0]))
+                    else:
+                        data.extend((_word_kind(token[s:e]), offset + s, offset + e, -1))
+            pos = m.end()
+    return TokenStream(data, dictionary)
+
+
+def item_ranges(notam: "Notam") -> List[Tuple[int, int]]:
+    """The [start, end) ranges of the NOTAM's free-text items D) to G) that it has, in order."""
+    ranges = [getattr(notam, 'indices_item_{}'.format(i)) for i in ITEMS]
+    return sorted(r for r in ranges if r is not None)